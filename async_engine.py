@@ -0,0 +1,535 @@
+"""Асинхронный движок опроса API и отправки сообщений в Telegram."""
+import asyncio
+import contextlib
+import json
+import logging
+import ssl
+import time
+import zlib
+from http import HTTPStatus
+from urllib.parse import urlencode, urlsplit
+
+import metrics
+from conditional import ResponseCache
+from digest import ErrorDigests
+from exceptions import (
+    ApiConnectionError, InvalidResponseCodeError, error_for_status,
+    error_policy, is_retriable
+)
+from retries import RetryBudget, RetryPolicy
+from scheduler import parse_retry_after
+from updates import delivery_plan, latest_statuses
+
+POLL_CONCURRENCY = 1000
+SEND_CONCURRENCY = 30
+REQUEST_TIMEOUT = 30
+POOL_SIZE = 100
+TELEGRAM_API = 'https://api.telegram.org'
+
+logger = logging.getLogger(__name__)
+
+_ssl_context = None
+
+
+class HttpResponse:
+    """Ответ HTTP-сервера, полностью прочитанный в память."""
+
+    __slots__ = ('status_code', 'reason', 'headers', 'content', 'reusable')
+
+    def __init__(self, status_code, reason, headers, content, reusable=False):
+        """Сохраняет код, заголовки и тело ответа.
+
+        reusable — можно ли отправить по тому же соединению следующий
+        запрос: тело ограничено длиной, и сервер не просил закрыть его.
+        """
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.reusable = reusable
+
+    @property
+    def text(self):
+        """Тело ответа как строка."""
+        return self.content.decode('UTF-8', errors='replace')
+
+    def json(self):
+        """Разбирает тело ответа как JSON."""
+        return json.loads(self.content)
+
+
+def get_ssl_context():
+    """Возвращает общий SSL-контекст с проверкой сертификатов."""
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+class ConnectionPool:
+    """Keep-alive соединения asyncio, сгруппированные по хосту.
+
+    После полностью прочитанного ответа без Connection: close соединение
+    возвращается в пул, и следующий запрос к тому же хосту не платит за
+    TCP и TLS. Пул принадлежит циклу событий, в котором создан; больше
+    max_idle простаивающих соединений на хост не хранится.
+    """
+
+    def __init__(self, max_idle=POOL_SIZE):
+        """Создаёт пустой пул для текущего цикла событий."""
+        self.max_idle = max_idle
+        self.loop = asyncio.get_running_loop()
+        self._idle = {}
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self, host, port, is_https, timeout):
+        """Возвращает (reader, writer, reused) — живое или новое соединение."""
+        idle = self._idle.get((host, port, is_https))
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.reused += 1
+                return reader, writer, True
+            writer.close()
+        reader, writer = await open_connection(host, port, is_https, timeout)
+        self.opened += 1
+        return reader, writer, False
+
+    def release(self, host, port, is_https, reader, writer):
+        """Возвращает соединение в пул или закрывает лишнее."""
+        idle = self._idle.setdefault((host, port, is_https), [])
+        if len(idle) < self.max_idle and not writer.is_closing():
+            idle.append((reader, writer))
+        else:
+            writer.close()
+
+    def close(self):
+        """Закрывает все простаивающие соединения."""
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+    def stats(self):
+        """Возвращает число открытых и переиспользованных соединений."""
+        idle = sum(len(connections) for connections in self._idle.values())
+        return {'opened': self.opened, 'reused': self.reused, 'idle': idle}
+
+
+async def open_connection(host, port, is_https, timeout):
+    """Открывает TCP- или TLS-соединение не дольше timeout секунд."""
+    return await asyncio.wait_for(
+        asyncio.open_connection(
+            host, port, ssl=get_ssl_context() if is_https else None
+        ),
+        timeout
+    )
+
+
+async def fetch(
+    method, url, headers=None, params=None, json_body=None,
+    timeout=REQUEST_TIMEOUT, pool=None, connect_timeout=None
+):
+    """Выполняет HTTP-запрос на asyncio-потоках без сторонних библиотек.
+
+    С pool соединения берутся из пула и возвращаются в него. Если
+    переиспользованное соединение оказалось закрытым сервером до ответа,
+    запрос идёт по следующему, в конце концов по новому соединению;
+    ошибка нового соединения передаётся вызывающему коду.
+    """
+    parts = urlsplit(url)
+    is_https = parts.scheme == 'https'
+    port = parts.port or (443 if is_https else 80)
+    address = (parts.hostname, port, is_https)
+    request = build_request(
+        method, parts, headers, params, json_body, keep_alive=pool is not None
+    )
+    connect_timeout = timeout if connect_timeout is None else connect_timeout
+
+    while True:
+        if pool is None:
+            reader, writer = await open_connection(*address, connect_timeout)
+            reused = False
+        else:
+            reader, writer, reused = await pool.acquire(
+                *address, connect_timeout
+            )
+        try:
+            writer.write(request)
+            await writer.drain()
+            response = await asyncio.wait_for(read_response(reader), timeout)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+            if reused:
+                continue
+            raise
+        except BaseException:
+            writer.close()
+            raise
+        if pool is not None and response.reusable:
+            pool.release(*address, reader, writer)
+        else:
+            writer.close()
+        return response
+
+
+def build_request(method, parts, headers, params, json_body, keep_alive):
+    """Собирает байты HTTP/1.1-запроса к адресу, разобранному urlsplit."""
+    target = parts.path or '/'
+    query = urlencode(params) if params else parts.query
+    if query:
+        target = f'{target}?{query}'
+    body = b'' if json_body is None else json.dumps(json_body).encode()
+    lines = [
+        f'{method} {target} HTTP/1.1',
+        f'Host: {parts.netloc}',
+        'Accept: application/json',
+        'Accept-Encoding: gzip, deflate',
+    ]
+    if not keep_alive:
+        lines.append('Connection: close')
+    lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+    if json_body is not None:
+        lines.append('Content-Type: application/json')
+    lines.append(f'Content-Length: {len(body)}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+async def read_response(reader):
+    """Читает статус, заголовки и тело HTTP/1.1-ответа."""
+    status_line = (await reader.readline()).decode('latin-1')
+    if not status_line:
+        raise ConnectionResetError('Соединение закрыто до ответа')
+    _, status_code, *reason = status_line.split(' ', 2)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    framed = True
+    if int(status_code) in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED):
+        # У 204 и 304 тела нет, даже без Content-Length.
+        content = b''
+    elif headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if not size:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        content = b''.join(chunks)
+    elif 'content-length' in headers:
+        content = await reader.readexactly(int(headers['content-length']))
+    else:
+        content = await reader.read()
+        framed = False
+    if headers.get('content-encoding', '').lower() in ('gzip', 'deflate'):
+        # wbits=47 распознаёт и gzip, и zlib-обёртку deflate.
+        content = zlib.decompress(content, 47)
+    return HttpResponse(
+        int(status_code), ''.join(reason).strip(), headers, content,
+        framed and headers.get('connection', '').lower() != 'close'
+    )
+
+
+class AsyncEngine:
+    """Опрашивает получателей и отправляет сообщения корутинами.
+
+    Проверка и разбор ответа выполняются переданными чистыми функциями
+    check_response и parse_status, а порядок уведомлений, дедупликацию
+    и сдвиг курсора задаёт общий с синхронным циклом delivery_plan.
+    Об ошибках опроса сообщают через digests, повторы запросов к API
+    ограничены retry_policy и retry_budget, условные запросы ведёт
+    cache — те же объекты, что и в синхронном цикле. Без них каждая
+    новая ошибка даёт отдельное сообщение, запросы не повторяются,
+    а кэш валидаторов у движка свой. Число одновременных
+    запросов к API и к Telegram ограничено семафорами, а соединения
+    с каждым хостом переиспользуются через ConnectionPool.
+    """
+
+    def __init__(
+        self, endpoint, telegram_token, check_response, parse_status,
+        poll_limit=POLL_CONCURRENCY, send_limit=SEND_CONCURRENCY,
+        telegram_api=TELEGRAM_API, digests=None,
+        connect_timeout=REQUEST_TIMEOUT, read_timeout=REQUEST_TIMEOUT,
+        retry_policy=None, retry_budget=None, cache=None
+    ):
+        """Запоминает адреса, токен бота и функции обработки ответа.
+
+        connect_timeout ограничивает установку соединения с API,
+        read_timeout — ожидание и чтение ответа.
+        """
+        self.endpoint = endpoint
+        self.send_url = f'{telegram_api}/bot{telegram_token}/sendMessage'
+        self.check_response = check_response
+        self.parse_status = parse_status
+        self.digests = ErrorDigests(0) if digests is None else digests
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retry_policy = (
+            RetryPolicy(0) if retry_policy is None else retry_policy
+        )
+        self.retry_budget = (
+            RetryBudget() if retry_budget is None else retry_budget
+        )
+        self.cache = ResponseCache() if cache is None else cache
+        self.poll_limit = poll_limit
+        self.send_limit = send_limit
+        self._poll_slots = None
+        self._send_slots = None
+        self._pool = None
+
+    async def get_api_answer(self, tenant):
+        """Запрашивает статусы работ получателя, повторяя сбои сервера.
+
+        Повторы следуют тем же правилам, что request_with_retries
+        синхронного цикла: обрыв соединения, таймаут и 5xx без
+        Retry-After повторяются, пока позволяют политика и бюджет.
+        """
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return await self.request_api(
+                    tenant, 'retry' if attempt else 'first'
+                )
+            except (ApiConnectionError, InvalidResponseCodeError) as error:
+                if not is_retriable(error) or (
+                    attempt >= self.retry_policy.retries
+                ) or not self.retry_budget.withdraw():
+                    raise
+                attempt += 1
+                delay = self.retry_policy.delay(attempt)
+                logger.warning(
+                    f'Повтор запроса к API через {delay:.2f} с: {error}'
+                )
+                await asyncio.sleep(delay)
+
+    async def request_api(self, tenant, kind):
+        """Делает одну попытку условного запроса к API.
+
+        На 304 возвращает пустой список работ. Валидаторы ответа
+        откладываются в cache и становятся основой следующего запроса
+        только после того, как ответ обработан.
+        """
+        metrics.API_ATTEMPTS.labels(kind).inc()
+        key = tenant.headers.get('Authorization')
+        started = time.perf_counter()
+        try:
+            response = await fetch(
+                'GET', self.endpoint, headers={
+                    **tenant.headers,
+                    **self.cache.conditional_headers(key, tenant.timestamp),
+                },
+                params={'from_date': tenant.timestamp},
+                timeout=self.read_timeout,
+                connect_timeout=self.connect_timeout, pool=self._pool
+            )
+        except (OSError, asyncio.TimeoutError) as error:
+            metrics.API_RESPONSES.labels('error').inc()
+            raise ApiConnectionError(
+                f'Ошибка при запросе к API: {self.endpoint}, '
+                f'{type(error).__name__}.'
+            )
+        finally:
+            metrics.API_LATENCY.observe(time.perf_counter() - started)
+        metrics.API_RESPONSES.labels(response.status_code).inc()
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            saved = self.cache.record_not_modified(key, tenant.timestamp)
+            metrics.API_SKIPPED.labels('not_modified').inc()
+            metrics.API_BYTES_SAVED.labels('not_modified').inc(saved)
+            logger.debug(
+                f'Ответ API не изменился (304), сэкономлено {saved} Б.'
+            )
+            return {'homeworks': []}
+        if response.status_code != HTTPStatus.OK:
+            raise error_for_status(response.status_code)(
+                f'Статус не равен 200: {response.status_code}. '
+                f'{response.reason}'
+                f'{response.text}',
+                retry_after=parse_retry_after(
+                    response.headers.get('retry-after')
+                ),
+                status_code=response.status_code
+            )
+        self.cache.stage(key, tenant.timestamp, {
+            'ETag': response.headers.get('etag'),
+            'Last-Modified': response.headers.get('last-modified'),
+        }, len(response.content))
+        return response.json()
+
+    async def send_message(self, chat_id, message):
+        """Отправляет сообщение в Telegram-чат через Bot API."""
+        async with self._send_slots:
+            started = time.perf_counter()
+            try:
+                response = await fetch(
+                    'POST', self.send_url,
+                    json_body={'chat_id': chat_id, 'text': message},
+                    pool=self._pool
+                )
+            except (OSError, asyncio.TimeoutError) as error:
+                metrics.SEND_FAILURES.inc()
+                logger.error(
+                    f'Ошибка при отправке сообщения в Telegram: {error!r}'
+                )
+                return False
+            finally:
+                metrics.SEND_LATENCY.observe(time.perf_counter() - started)
+        if response.status_code != HTTPStatus.OK:
+            metrics.SEND_FAILURES.inc()
+            logger.error(
+                'Ошибка при отправке сообщения в Telegram: '
+                f'{response.status_code} {response.text}'
+            )
+            return False
+        logger.debug(f'Бот отправил сообщение: "{message}"')
+        return True
+
+    async def notify_tenant(self, tenant, message):
+        """Рассылает сообщение по всем чатам получателя."""
+        results = await asyncio.gather(*(
+            self.send_message(chat_id, message) for chat_id in tenant.chat_ids
+        ))
+        return all(results)
+
+    async def poll_tenant(self, tenant, scheduler=None):
+        """Опрашивает API для одного получателя и планирует следующий опрос."""
+        failure = None
+        try:
+            statuses = await self.process_tenant(tenant)
+        except Exception as error:
+            failure = error
+            await self.report_error(tenant, error)
+
+        if scheduler is None:
+            return
+        if failure is None:
+            scheduler.record_success(tenant, statuses, time.time())
+        else:
+            scheduler.record_error(
+                tenant, time.time(), getattr(failure, 'retry_after', None),
+                error_policy(failure)
+            )
+
+    async def report_error(self, tenant, error):
+        """Сообщает об ошибке опроса так же, как синхронный report_error."""
+        now = time.time()
+        message = self.digests.notice(tenant, error, now)
+        logger.error(f'Ошибка опроса {tenant!r}: {error}')
+        if message is not None and await self.notify_tenant(tenant, message):
+            self.digests.noticed(tenant, message, now)
+
+    async def report_recovery(self, tenant):
+        """Отправляет итоговую сводку ошибок, когда опрос снова прошёл."""
+        message = self.digests.recovered(tenant.key)
+        if message is None or await self.notify_tenant(tenant, message):
+            self.digests.resolved(tenant, message)
+
+    async def process_tenant(self, tenant):
+        """Запрашивает статусы получателя, рассылает новый и возвращает их."""
+        async with self._poll_slots:
+            response = await self.get_api_answer(tenant)
+        homeworks = self.check_response(response)
+        metrics.mark_poll_success()
+        await self.report_recovery(tenant)
+        if not homeworks:
+            logger.debug('Нет новых статусов для отправки.')
+            self.cache.commit(tenant.headers.get('Authorization'))
+            return {}
+        if await self.deliver_updates(tenant, response, homeworks):
+            self.cache.commit(tenant.headers.get('Authorization'))
+        return latest_statuses(homeworks)
+
+    async def deliver_updates(self, tenant, response, homeworks):
+        """Рассылает новые статусы по плану доставки синхронного цикла."""
+        plan = delivery_plan(tenant, response, homeworks, self.parse_status)
+        try:
+            message = next(plan)
+            while True:
+                message = plan.send(
+                    await self.notify_tenant(tenant, message)
+                )
+        except StopIteration as stop:
+            return stop.value
+
+    async def run_cycle(self, tenants, scheduler=None):
+        """Опрашивает переданных получателей одновременно."""
+        loop = asyncio.get_running_loop()
+        if self._poll_slots is None:
+            self._poll_slots = asyncio.Semaphore(self.poll_limit)
+            self._send_slots = asyncio.Semaphore(self.send_limit)
+        if self._pool is None or self._pool.loop is not loop:
+            # Соединения привязаны к циклу событий, в котором открыты.
+            self._pool = ConnectionPool()
+        await asyncio.gather(*(
+            self.poll_tenant(tenant, scheduler) for tenant in tenants
+        ))
+
+    async def run_forever(
+        self, scheduler, store=None, stop=None, timeout=None
+    ):
+        """Опрашивает получателей в моменты, назначенные расписанием.
+
+        Установка события stop прерывает ожидание следующего цикла.
+        Когда в расписании не осталось получателей, движок ждёт
+        обычный период расписания.
+        Начатый цикл получает timeout секунд на то, чтобы дослать
+        сообщения, после чего отменяется; курсоры сохраняются в любом
+        случае.
+        """
+        if stop is None:
+            stop = asyncio.Event()
+        try:
+            await self._serve(scheduler, store, stop, timeout)
+        finally:
+            if self._pool is not None:
+                self._pool.close()
+
+    async def _serve(self, scheduler, store, stop, timeout):
+        """Проводит циклы опроса, пока не установлено событие stop."""
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                await self.run_cycle_until(
+                    scheduler.due(time.time()), scheduler, stop, timeout
+                )
+            finally:
+                metrics.CYCLE_DURATION.observe(time.perf_counter() - started)
+                if store is not None:
+                    store.flush()
+            next_due = scheduler.next_due()
+            if next_due is None:
+                next_due = time.time() + scheduler.period
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    stop.wait(), max(next_due - time.time(), 1)
+                )
+
+    async def run_cycle_until(self, tenants, scheduler, stop, timeout=None):
+        """Проводит цикл, отменяя его через timeout секунд после stop."""
+        cycle = asyncio.ensure_future(self.run_cycle(tenants, scheduler))
+        stopping = asyncio.ensure_future(stop.wait())
+        try:
+            await asyncio.wait(
+                (cycle, stopping), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not cycle.done():
+                await asyncio.wait((cycle,), timeout=timeout)
+        finally:
+            stopping.cancel()
+            if not cycle.done():
+                logger.warning(
+                    f'Цикл опроса не завершился за {timeout} с и отменён.'
+                )
+                cycle.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await cycle
+        if not cycle.cancelled():
+            cycle.result()
@@ -0,0 +1,233 @@
+"""Сквозной бенчмарк цикла опрос → разбор → отправка на локальных заглушках.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_e2e --tenants 200 --cycles 5 --latency 0.02 \
+        --error-rate 0.01 --homeworks 3 --output e2e.json
+
+Заглушки работают в отдельном процессе, поэтому RSS и задержки
+относятся только к боту. С --baseline результаты сравниваются с JSON
+предыдущего запуска.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+
+from telebot import TeleBot, apihelper
+
+import homework
+from async_engine import AsyncEngine
+from benchmarks.bench_engines import make_tenants
+from benchmarks.stubs import StubProcess
+from conditional import ResponseCache
+from tenants import TenantPoller
+
+COMPARED = (
+    ('cycles_per_sec', 'циклов/с'),
+    ('polls_per_sec', 'опросов/с'),
+    ('poll_p50_ms', 'p50 опроса, мс'),
+    ('poll_p99_ms', 'p99 опроса, мс'),
+    ('peak_rss_kb', 'пиковый RSS, КБ'),
+)
+
+
+def percentile(values, fraction):
+    """Возвращает перцентиль по методу ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(fraction * len(ordered)), len(ordered) - 1)
+    return ordered[index]
+
+
+def rss_kb():
+    """Возвращает текущий и пиковый RSS процесса в килобайтах.
+
+    Оба значения берутся из /proc/self/status (VmRSS и VmHWM), чтобы
+    текущее не превышало пиковое из-за разного учёта. Без /proc
+    известен только пик из getrusage, текущее значение — None.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            fields = dict(
+                line.split(':', 1) for line in status if ':' in line
+            )
+        return (
+            int(fields['VmRSS'].split()[0]), int(fields['VmHWM'].split()[0])
+        )
+    except (OSError, KeyError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return None, peak // 1024 if sys.platform == 'darwin' else peak
+
+
+@contextlib.contextmanager
+def pointed_to(server):
+    """Направляет синхронный движок и TeleBot на заглушку."""
+    endpoint, api_url = homework.ENDPOINT, apihelper.API_URL
+    cache = homework.response_cache
+    homework.ENDPOINT = f'{server.url}/api/user_api/homework_statuses/'
+    apihelper.API_URL = f'{server.url}/bot{{0}}/{{1}}'
+    try:
+        yield
+    finally:
+        homework.ENDPOINT, apihelper.API_URL = endpoint, api_url
+        homework.response_cache = cache
+
+
+def run_sync(server, args):
+    """Прогоняет циклы пулом потоков и возвращает длительности."""
+    bot = TeleBot('1234:stub')
+    latencies = []
+
+    def poll(tenant):
+        started = time.perf_counter()
+        homework.poll_tenant(bot, tenant)
+        latencies.append(time.perf_counter() - started)
+
+    poller = TenantPoller(poll, max_workers=args.workers)
+    cycles = []
+    with pointed_to(server):
+        try:
+            for _ in range(args.cycles):
+                # Новые получатели и пустой кэш ответов в каждом цикле,
+                # чтобы он проходил весь путь, а не отсекался отпечатком.
+                tenants = make_tenants(args.tenants)
+                homework.response_cache = ResponseCache()
+                started = time.perf_counter()
+                poller.run_cycle(tenants)
+                cycles.append(time.perf_counter() - started)
+        finally:
+            poller.shutdown()
+    return cycles, latencies
+
+
+def run_async(server, args):
+    """Прогоняет циклы asyncio-движком и возвращает длительности."""
+    engine = AsyncEngine(
+        f'{server.url}/api/user_api/homework_statuses/', '1234:stub',
+        homework.check_response, homework.parse_status,
+        poll_limit=args.concurrency, send_limit=args.concurrency,
+        telegram_api=server.url
+    )
+    latencies = []
+    poll_tenant = engine.poll_tenant
+
+    async def timed_poll(tenant, scheduler=None):
+        started = time.perf_counter()
+        await poll_tenant(tenant, scheduler)
+        latencies.append(time.perf_counter() - started)
+
+    engine.poll_tenant = timed_poll
+
+    async def run_cycles():
+        cycles = []
+        for _ in range(args.cycles):
+            tenants = make_tenants(args.tenants)
+            started = time.perf_counter()
+            await engine.run_cycle(tenants)
+            cycles.append(time.perf_counter() - started)
+        return cycles
+
+    return asyncio.run(run_cycles()), latencies
+
+
+def run(args):
+    """Запускает заглушки, прогоняет циклы и возвращает сводку."""
+    runner = run_async if args.engine == 'async' else run_sync
+    with StubProcess(
+        latency=args.latency, homeworks=args.homeworks,
+        comment_size=args.payload_bytes, error_rate=args.error_rate,
+        seed=args.seed
+    ) as server:
+        cycles, latencies = runner(server, args)
+        requests = server.stats()
+    current_rss, peak_rss = rss_kb()
+    elapsed = sum(cycles)
+    return {
+        'engine': args.engine,
+        'params': {
+            name: value for name, value in vars(args).items()
+            if name not in ('output', 'baseline')
+        },
+        'python': platform.python_version(),
+        'timestamp': int(time.time()),
+        'cycles': len(cycles),
+        'polls': len(latencies),
+        'cycles_per_sec': round(len(cycles) / elapsed, 3),
+        'polls_per_sec': round(len(latencies) / elapsed, 1),
+        'cycle_p50_s': round(percentile(cycles, 0.5), 4),
+        'cycle_max_s': round(max(cycles), 4),
+        'poll_p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+        'poll_p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'requests': requests,
+        'rss_kb': current_rss,
+        'peak_rss_kb': peak_rss,
+    }
+
+
+def compare(result, baseline):
+    """Возвращает строки с изменением метрик относительно baseline."""
+    lines = []
+    for key, title in COMPARED:
+        before, after = baseline.get(key), result[key]
+        if not before:
+            continue
+        change = (after - before) / before * 100
+        lines.append(
+            f'{title:<18} {before:>12} → {after:<12} ({change:+.1f}%)'
+        )
+    return lines
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--engine', choices=('sync', 'async'), default='sync')
+    parser.add_argument('--tenants', type=int, default=200)
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument(
+        '--latency', type=float, default=0.02,
+        help='задержка ответа заглушек, с'
+    )
+    parser.add_argument(
+        '--error-rate', type=float, default=0.0,
+        help='доля ответов 500 от API и Telegram'
+    )
+    parser.add_argument(
+        '--homeworks', type=int, default=1,
+        help='число разных работ в ответе API'
+    )
+    parser.add_argument(
+        '--payload-bytes', type=int, default=0,
+        help='длина reviewer_comment каждой работы'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='файл для результатов в JSON')
+    parser.add_argument('--baseline', help='JSON предыдущего запуска')
+    return parser.parse_args(argv)
+
+
+def main():
+    """Печатает сводку, сохраняет её и сравнивает с предыдущим запуском."""
+    args = parse_args()
+    logging.disable(logging.CRITICAL)
+    result = run(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(result, output, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline:
+            print('\n'.join(compare(result, json.load(baseline))))
+
+
+if __name__ == '__main__':
+    main()
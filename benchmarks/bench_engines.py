@@ -0,0 +1,86 @@
+"""Сравнение синхронного и асинхронного движков на локальных заглушках.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_engines --tenants 2000 --latency 0.05
+
+Заглушки работают в отдельном процессе и не делят GIL с движками.
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from telebot import TeleBot, apihelper
+
+import homework
+from async_engine import AsyncEngine
+from benchmarks.stubs import StubProcess
+from tenants import Tenant, TenantPoller
+
+
+def make_tenants(count):
+    """Создаёт получателей с уникальными токенами и чатами."""
+    return [Tenant(f'token-{number}', [number]) for number in range(count)]
+
+
+def bench_sync(server, count, workers):
+    """Один цикл опроса синхронным пулом потоков."""
+    homework.ENDPOINT = f'{server.url}/api/user_api/homework_statuses/'
+    apihelper.API_URL = f'{server.url}/bot{{0}}/{{1}}'
+    bot = TeleBot('1234:stub')
+    poller = TenantPoller(
+        lambda tenant: homework.poll_tenant(bot, tenant), max_workers=workers
+    )
+    tenants = make_tenants(count)
+    started = time.perf_counter()
+    poller.run_cycle(tenants)
+    elapsed = time.perf_counter() - started
+    poller.shutdown()
+    return elapsed
+
+
+def bench_async(server, count, concurrency):
+    """Один цикл опроса asyncio-движком."""
+    engine = AsyncEngine(
+        f'{server.url}/api/user_api/homework_statuses/', '1234:stub',
+        homework.check_response, homework.parse_status,
+        poll_limit=concurrency, send_limit=concurrency,
+        telegram_api=server.url
+    )
+    tenants = make_tenants(count)
+    started = time.perf_counter()
+    asyncio.run(engine.run_cycle(tenants))
+    return time.perf_counter() - started
+
+
+def main():
+    """Запускает оба движка и печатает пропускную способность."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--concurrency', type=int, default=1000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with StubProcess(latency=args.latency) as server:
+        results = {
+            f'sync ({args.workers} потоков)': bench_sync(
+                server, args.tenants, args.workers
+            ),
+            f'async (до {args.concurrency} корутин)': bench_async(
+                server, args.tenants, args.concurrency
+            ),
+        }
+        counters = server.stats()
+        print(f'Запросов к API: {counters["api"]}, '
+              f'сообщений: {counters["telegram"]}')
+
+    for name, elapsed in results.items():
+        print(f'{name:<28} {elapsed:8.2f} с  '
+              f'{args.tenants / elapsed:10.1f} получателей/с')
+
+
+if __name__ == '__main__':
+    main()
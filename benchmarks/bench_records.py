@@ -0,0 +1,132 @@
+"""Память и скорость разбора работ: записи Homework против словарей.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_records --homeworks 1000000
+
+Синтетические работы строятся так же, как их отдаёт json: у каждой
+свои строки ключей-значений, названия повторяются по --lessons уроков.
+Путь словарей — check_response и parse_status, которыми бот разбирает
+каждый ответ, путь записей — parse_homeworks и parse_record, то есть
+записи Homework, в которых хранится история догона. Память на работу
+считается tracemalloc по тому, что остаётся после разбора: список
+словарей из ответа или список записей, словари которых уже выброшены.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import homework
+from records import Homework, parse_homeworks
+
+STATUSES = ('reviewing', 'rejected', 'approved')
+
+
+def make_homework(number, lessons):
+    """Строит работу в том виде, в каком её возвращает API."""
+    lesson = number % lessons
+    return {
+        'id': number,
+        'status': STATUSES[number % len(STATUSES)],
+        'homework_name': f'student_{lesson}__hw{lesson:02d}.zip',
+        'reviewer_comment': f'Замечания к уроку {lesson}',
+        'date_updated': f'2024-01-{number % 28 + 1:02d}T10:00:00Z',
+        'lesson_name': f'Урок {lesson}',
+    }
+
+
+def make_homeworks(count, lessons):
+    """Возвращает count синтетических работ."""
+    return [make_homework(number, lessons) for number in range(count)]
+
+
+def retained_bytes(build):
+    """Возвращает объём памяти, который держит результат build()."""
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def parse_dicts(homeworks):
+    """Разбирает ответ словарями: check_response и parse_status."""
+    for item in homework.check_response({'homeworks': homeworks}):
+        homework.parse_status(item)
+
+
+def parse_records(homeworks):
+    """Разбирает ответ через записи: parse_homeworks и parse_record."""
+    for record in parse_homeworks(homeworks):
+        homework.parse_record(record)
+
+
+def timed(function, homeworks):
+    """Возвращает время одного прохода function по работам."""
+    started = time.perf_counter()
+    function(homeworks)
+    return time.perf_counter() - started
+
+
+def measure(count, memory, seconds):
+    """Собирает замеры одного пути разбора."""
+    return {
+        'bytes_per_homework': round(memory / count, 1),
+        'parse_ms': round(seconds * 1000, 1),
+        'homeworks_per_second': round(count / seconds),
+    }
+
+
+def run(args):
+    """Сравнивает словари и записи на одних и тех же работах."""
+    dict_memory = retained_bytes(
+        lambda: make_homeworks(args.homeworks, args.lessons)
+    )
+    record_memory = retained_bytes(lambda: [
+        Homework.from_dict(make_homework(number, args.lessons))
+        for number in range(args.homeworks)
+    ])
+    homeworks = make_homeworks(args.homeworks, args.lessons)
+    dict_seconds = min(
+        timed(parse_dicts, homeworks) for _ in range(args.repeats)
+    )
+    record_seconds = min(
+        timed(parse_records, homeworks) for _ in range(args.repeats)
+    )
+    return {
+        'homeworks': args.homeworks,
+        'lessons': args.lessons,
+        'dict': measure(args.homeworks, dict_memory, dict_seconds),
+        'record': measure(args.homeworks, record_memory, record_seconds),
+    }
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--homeworks', type=int, default=1_000_000)
+    parser.add_argument(
+        '--lessons', type=int, default=50,
+        help='число разных названий работ'
+    )
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='файл для результатов в JSON')
+    return parser.parse_args(argv)
+
+
+def main():
+    """Печатает замеры обоих путей разбора."""
+    args = parse_args()
+    result = run(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(result, output, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""Накладные расходы расписания опросов на сотне тысяч получателей.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_scheduler --tenants 100000 --hours 1 \
+        --spread 600
+
+Расписание из scheduler.py прогоняется на виртуальном времени дважды:
+с колесом таймеров и с прежней кучей с ленивым удалением. Замеряется
+только время вызовов расписания (add, due, record_success, next_due),
+сеть и обработка ответов не участвуют. Пиковое число опросов за одну
+секунду показывает, насколько первые опросы разнесены по окну --spread,
+а пиковое число хранимых таймеров — сколько места занимают устаревшие
+записи кучи.
+"""
+import argparse
+import heapq
+import itertools
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import homework
+import scheduler as scheduler_module
+from clock import VirtualClock
+from timing_wheel import TimingWheel
+
+
+class HeapTimers:
+    """Прежняя очередь опросов: куча с ленивым удалением."""
+
+    def __init__(self):
+        """Создаёт пустую кучу."""
+        self._queue = []
+        self._deadlines = {}
+        self._order = itertools.count()
+
+    def start(self, now):
+        """Куче начало отсчёта не нужно."""
+
+    def schedule(self, key, at):
+        """Ставит таймер key на момент at, заменяя прежний."""
+        self._deadlines[key] = at
+        heapq.heappush(self._queue, (at, next(self._order), key))
+
+    def __len__(self):
+        """Возвращает число записей в куче вместе с устаревшими."""
+        return len(self._queue)
+
+    def cancel(self, key):
+        """Снимает таймер key; запись в куче остаётся до извлечения."""
+        self._deadlines.pop(key, None)
+
+    def advance(self, now):
+        """Возвращает ключи, чей срок наступил к моменту now."""
+        expired = []
+        while self._queue and self._queue[0][0] <= now:
+            at, _, key = heapq.heappop(self._queue)
+            if self._deadlines.get(key) == at:
+                del self._deadlines[key]
+                expired.append(key)
+        return expired
+
+    def next_expiry(self):
+        """Возвращает ближайший срок, выбрасывая устаревшие записи."""
+        while self._queue:
+            at, _, key = self._queue[0]
+            if self._deadlines.get(key) == at:
+                return at
+            heapq.heappop(self._queue)
+        return None
+
+
+class Key:
+    """Лёгкий заместитель получателя: расписанию нужен только key."""
+
+    __slots__ = ('key',)
+
+    def __init__(self, number):
+        """Задаёт постоянный ключ получателя."""
+        self.key = f'tenant-{number}'
+
+
+@contextmanager
+def timers_of(timers):
+    """Подменяет очередь таймеров, которую создаёт PollScheduler."""
+    original = scheduler_module.TimingWheel
+    scheduler_module.TimingWheel = timers
+    try:
+        yield
+    finally:
+        scheduler_module.TimingWheel = original
+
+
+def run_scheduler(timers, tenants, spread, hours):
+    """Прогоняет расписание и возвращает замеры одного варианта."""
+    now = time.time()
+    started = time.perf_counter()
+    with timers_of(timers):
+        scheduler = homework.create_scheduler(
+            tenants, VirtualClock(now), spread
+        )
+    setup = time.perf_counter() - started
+    until = now + hours * 60 * 60
+    per_second = Counter()
+    stored = 0
+    operations = 0
+    spent = 0.0
+    while now <= until:
+        started = time.perf_counter()
+        due = scheduler.due(now)
+        for tenant in due:
+            scheduler.record_success(tenant, [], now)
+        next_due = scheduler.next_due()
+        spent += time.perf_counter() - started
+        stored = max(stored, len(scheduler._wheel))
+        per_second[int(now)] += len(due)
+        operations += 2 * len(due) + 2
+        now = max(next_due, now + homework.MIN_WAIT)
+    return {
+        'setup_ms': round(setup * 1000, 1),
+        'polls': sum(per_second.values()),
+        'operations': operations,
+        'total_ms': round(spent * 1000, 1),
+        'us_per_operation': round(spent / operations * 1e6, 3),
+        'peak_polls_per_second': max(per_second.values()),
+        'peak_stored_timers': stored,
+    }
+
+
+def run(args):
+    """Сравнивает колесо таймеров и кучу при одной нагрузке."""
+    tenants = [Key(number) for number in range(args.tenants)]
+    return {
+        'tenants': args.tenants,
+        'hours': args.hours,
+        'spread': args.spread,
+        'wheel': run_scheduler(
+            TimingWheel, tenants, args.spread, args.hours
+        ),
+        'heap': run_scheduler(
+            HeapTimers, tenants, args.spread, args.hours
+        ),
+    }
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tenants', type=int, default=100_000)
+    parser.add_argument('--hours', type=float, default=1)
+    parser.add_argument(
+        '--spread', type=float, default=homework.RETRY_PERIOD,
+        help='окно первых опросов в секундах, 0 — все сразу'
+    )
+    parser.add_argument('--output', help='файл для результатов в JSON')
+    return parser.parse_args(argv)
+
+
+def main():
+    """Печатает замеры обоих вариантов расписания."""
+    args = parse_args()
+    result = run(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(result, output, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Время холодного старта: импорт homework.py и один проход --once.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_startup --repeats 10 \
+        --max-import-ms 250 --max-once-ms 600
+
+Каждый замер — отдельный процесс интерпретатора. Проход --once идёт
+против локальной заглушки API без новых статусов, поэтому telebot
+импортироваться не должен. С порогами --max-* бенчмарк завершается
+с кодом 1, если медиана их превысила.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.stubs import StubServer
+
+DEFERRED = ('telebot', 'asyncio', 'async_engine')
+IMPORT_SCRIPT = 'import homework'
+ONCE_SCRIPT = (
+    'import json, sys, homework\n'
+    'homework.ENDPOINT = sys.argv[1]\n'
+    'code = homework.run_once()\n'
+    'loaded = [name for name in sys.argv[2:] if name in sys.modules]\n'
+    'print(json.dumps(loaded))\n'
+    'sys.exit(code)\n'
+)
+
+
+def timed_run(script, *args, env=None):
+    """Запускает script в новом интерпретаторе и возвращает время и вывод."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', script, *args],
+        capture_output=True, text=True, env=env, check=True
+    )
+    return (time.perf_counter() - started) * 1000, result.stdout
+
+
+def median_ms(script, repeats, *args, env=None):
+    """Возвращает медиану времени запуска script в миллисекундах."""
+    return statistics.median(
+        timed_run(script, *args, env=env)[0] for _ in range(repeats)
+    )
+
+
+def run(args):
+    """Замеряет старт интерпретатора, импорт и проход --once."""
+    interpreter_ms = median_ms('pass', args.repeats)
+    import_ms = median_ms(IMPORT_SCRIPT, args.repeats)
+    with tempfile.TemporaryDirectory() as directory, StubServer(
+        homeworks=()
+    ) as server:
+        env = {
+            **os.environ,
+            'FIRST_TOKEN': 'stub', 'SECOND_TOKEN': '1234:stub',
+            'TELEGRAM_CHAT_ID': '1',
+            'STATE_DB': os.path.join(directory, 'state.db'),
+        }
+        endpoint = f'{server.url}/api/user_api/homework_statuses/'
+        once_ms = median_ms(
+            ONCE_SCRIPT, args.repeats, endpoint, env=env
+        )
+        _, output = timed_run(ONCE_SCRIPT, endpoint, *DEFERRED, env=env)
+    return {
+        'python': platform.python_version(),
+        'repeats': args.repeats,
+        'interpreter_ms': round(interpreter_ms, 1),
+        'import_ms': round(import_ms - interpreter_ms, 1),
+        'once_ms': round(once_ms - interpreter_ms, 1),
+        'deferred_but_imported': json.loads(output),
+    }
+
+
+def regressions(result, args):
+    """Возвращает описания превышенных порогов."""
+    problems = [
+        f'{key}: {result[key]} > {limit}'
+        for key, limit in (
+            ('import_ms', args.max_import_ms), ('once_ms', args.max_once_ms)
+        )
+        if limit is not None and result[key] > limit
+    ]
+    if result['deferred_but_imported']:
+        problems.append(
+            'импортированы заранее: '
+            + ', '.join(result['deferred_but_imported'])
+        )
+    return problems
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument(
+        '--max-import-ms', type=float,
+        help='порог медианы импорта homework.py сверх старта интерпретатора'
+    )
+    parser.add_argument(
+        '--max-once-ms', type=float,
+        help='порог медианы прохода --once сверх старта интерпретатора'
+    )
+    parser.add_argument('--output', help='файл для результатов в JSON')
+    return parser.parse_args(argv)
+
+
+def main():
+    """Печатает замеры и завершается с кодом 1 при регрессии."""
+    args = parse_args()
+    result = run(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(result, output, ensure_ascii=False, indent=2)
+    problems = regressions(result, args)
+    if problems:
+        print('\n'.join(problems), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""Детерминированная симуляция расписания опросов на виртуальных часах.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.simulate --tenants 1000 --days 7 --seed 1 \
+        --outage 30:2:600
+
+Цикл опроса, адаптивное расписание, check_response и доставка статусов
+берутся из homework.py, API Практикума заменяется шкалой событий, а
+ожидание — виртуальными часами, поэтому неделя опроса тысячи
+получателей проигрывается за секунды.
+"""
+import argparse
+import json
+import logging
+import random
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+import homework
+from benchmarks.bench_e2e import percentile
+from clock import VirtualClock
+from exceptions import BotError, ServerError
+from tenants import Tenant
+from updates import latest_statuses
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+START = 1_700_000_000
+REVIEW_WAIT = 6 * HOUR
+REVIEW_TIME = HOUR
+FIX_TIME = 12 * HOUR
+REJECT_RATE = 0.5
+
+
+def make_timeline(rng, works, start, duration):
+    """Создаёт события ревью для works работ одного студента.
+
+    Работа уходит на ревью, получает вердикт и после замечаний
+    отправляется снова, пока не будет принята или не кончится время.
+    """
+    events = []
+    end = start + duration
+    for homework_id in range(1, works + 1):
+        moment = start + rng.uniform(0, duration)
+        while True:
+            moment += rng.expovariate(1 / REVIEW_WAIT)
+            if moment >= end:
+                break
+            events.append((moment, homework_id, 'reviewing'))
+            moment += rng.expovariate(1 / REVIEW_TIME)
+            if moment >= end:
+                break
+            rejected = rng.random() < REJECT_RATE
+            events.append(
+                (moment, homework_id, 'rejected' if rejected else 'approved')
+            )
+            if not rejected:
+                break
+            moment += rng.expovariate(1 / FIX_TIME)
+    return sorted(events)
+
+
+class ScriptedApi:
+    """API Практикума, отвечающее по заранее заданной шкале событий.
+
+    timelines сопоставляет токену отсортированный список событий
+    (время, id работы, статус). В интервалы outages (начало, конец,
+    retry_after) API отвечает ошибкой 503.
+    """
+
+    def __init__(self, timelines, outages=()):
+        """Готовит для каждого токена индекс событий по времени."""
+        self.outages = list(outages)
+        self.requests = 0
+        self.errors = 0
+        self._times = {}
+        self._homeworks = {}
+        for token, events in timelines.items():
+            self._times[token] = [moment for moment, _, _ in events]
+            self._homeworks[token] = [
+                {
+                    'id': homework_id,
+                    'homework_name': f'hw{homework_id}.zip',
+                    'status': status,
+                    'date_updated': datetime.fromtimestamp(
+                        moment, timezone.utc
+                    ).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'timestamp': moment,
+                }
+                for moment, homework_id, status in events
+            ]
+
+    def answer(self, token, from_date, now):
+        """Возвращает изменения статусов в интервале [from_date, now)."""
+        self.requests += 1
+        for start, end, retry_after in self.outages:
+            if start <= now < end:
+                self.errors += 1
+                raise ServerError(
+                    'Статус не равен 200: 503. Service Unavailable',
+                    retry_after=retry_after, status_code=503
+                )
+        times = self._times.get(token, ())
+        first = bisect_left(times, from_date)
+        last = bisect_left(times, now)
+        return {
+            'homeworks': self._homeworks.get(token, [])[first:last],
+            'current_date': now,
+        }
+
+
+class Simulation:
+    """Прогон цикла опроса бота против ScriptedApi на виртуальных часах."""
+
+    def __init__(self, api, tenants, clock):
+        """Ставит всех получателей в расписание на текущее время часов."""
+        self.api = api
+        self.tenants = tenants
+        self.clock = clock
+        self.scheduler = homework.create_scheduler(tenants, clock)
+        self.polls = 0
+        self.notifications = 0
+        self.latencies = []
+
+    def send(self, message):
+        """Считает уведомление доставленным."""
+        self.notifications += 1
+        return True
+
+    def poll(self, tenant):
+        """Опрашивает API за одного получателя и планирует следующий опрос."""
+        now = self.clock.time()
+        self.polls += 1
+        statuses, failure = None, None
+        try:
+            response = self.api.answer(tenant.token, tenant.timestamp, now)
+            homeworks = homework.check_response(response)
+            if homeworks:
+                homework.deliver_updates(
+                    tenant, response, homeworks, self.send
+                )
+                self.latencies.extend(
+                    now - update['timestamp'] for update in homeworks
+                )
+            statuses = latest_statuses(homeworks)
+        except BotError as error:
+            failure = error
+        homework.reschedule(self.scheduler, tenant, statuses, failure, now)
+
+    def run_cycle(self, due):
+        """Опрашивает получателей, чей опрос наступил."""
+        for tenant in due:
+            self.poll(tenant)
+
+    def run(self, duration):
+        """Проигрывает duration секунд и возвращает сводку."""
+        started = time.perf_counter()
+        until = self.clock.time() + duration
+        cycles = homework.run_schedule(
+            self.scheduler, self.run_cycle, self.clock, until
+        )
+        wall = time.perf_counter() - started
+        tenant_days = len(self.tenants) * duration / DAY
+        return {
+            'tenants': len(self.tenants),
+            'simulated_days': round(duration / DAY, 3),
+            'wall_seconds': round(wall, 3),
+            'cycles': cycles,
+            'polls': self.polls,
+            'polls_per_wall_second': round(self.polls / wall),
+            'requests_per_tenant_day': round(
+                self.api.requests / tenant_days, 1
+            ),
+            'api_errors': self.api.errors,
+            'notifications': self.notifications,
+            'latency_p50_s': round(percentile(self.latencies, 0.5), 1),
+            'latency_p99_s': round(percentile(self.latencies, 0.99), 1),
+            'latency_max_s': round(max(self.latencies, default=0), 1),
+        }
+
+
+def parse_outage(value):
+    """Разбирает сбой API вида 'начало:длительность[:retry_after]' в часах."""
+    start, duration, *retry_after = value.split(':')
+    begin = START + float(start) * HOUR
+    return (
+        begin, begin + float(duration) * HOUR,
+        int(retry_after[0]) if retry_after else None
+    )
+
+
+def simulate(tenants=100, days=1, works=3, seed=0, outages=()):
+    """Создаёт шкалы событий и проигрывает опрос всех получателей."""
+    rng = random.Random(seed)
+    duration = days * DAY
+    tokens = [f'token-{number}' for number in range(tenants)]
+    api = ScriptedApi(
+        {
+            token: make_timeline(rng, works, START, duration)
+            for token in tokens
+        },
+        outages
+    )
+    clock = VirtualClock(START)
+    simulation = Simulation(
+        api, [Tenant(token, [token], START) for token in tokens], clock
+    )
+    return simulation.run(duration)
+
+
+def main():
+    """Печатает сводку симуляции в JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument(
+        '--works', type=int, default=3, help='работ на одного студента'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--outage', action='append', type=parse_outage, default=[],
+        help='сбой API: начало:длительность[:retry_after], часы от старта'
+    )
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    print(json.dumps(simulate(
+        args.tenants, args.days, args.works, args.seed, args.outage
+    ), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""Локальные заглушки API Практикума и Telegram Bot API для бенчмарков.
+
+Заглушку можно запустить отдельным процессом:
+
+    python -m benchmarks.stubs --latency 0.02 --homeworks 3
+
+Процесс печатает порт и работает, пока открыт его stdin.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+DEFAULT_HOMEWORK = {
+    'id': 1,
+    'homework_name': 'hw.zip',
+    'status': 'approved',
+    'reviewer_comment': 'Принято!',
+    'date_updated': '2021-04-11T10:31:09Z',
+    'lesson_name': 'Проект спринта',
+}
+STATUSES = ('approved', 'reviewing', 'rejected')
+STATS_PATH = '/_stats'
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REASONS = {200: 'OK', 500: 'Internal Server Error'}
+TELEGRAM_MESSAGE = {
+    'message_id': 1,
+    'date': 0,
+    'chat': {'id': 1, 'type': 'private'},
+    'text': '',
+}
+
+
+def make_homeworks(count, comment_size=0):
+    """Создаёт count разных работ с комментарием длиной comment_size."""
+    return [
+        {
+            **DEFAULT_HOMEWORK,
+            'id': number,
+            'homework_name': f'hw{number}.zip',
+            'status': STATUSES[number % len(STATUSES)],
+            'reviewer_comment': 'x' * comment_size,
+        }
+        for number in range(1, count + 1)
+    ]
+
+
+class StubServer:
+    """HTTP-сервер на asyncio в отдельном потоке.
+
+    Запросы к /bot<token>/<method> обслуживаются как Telegram Bot API,
+    /_stats возвращает счётчики запросов, остальные — как эндпоинт
+    статусов домашних работ. Задержка ответа
+    задаётся параметром latency, keep-alive соединения поддерживаются.
+    С вероятностью error_rate запрос получает ответ 500.
+    """
+
+    def __init__(
+        self, latency=0.0, homeworks=(DEFAULT_HOMEWORK,), error_rate=0.0,
+        seed=None
+    ):
+        """Готовит заглушку с заданной задержкой, работами и долей ошибок."""
+        self.latency = latency
+        self.homeworks = list(homeworks)
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.counters = {'api': 0, 'telegram': 0}
+        self.errors = 0
+        self.port = None
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """Базовый адрес заглушки."""
+        return f'http://127.0.0.1:{self.port}'
+
+    def stats(self):
+        """Возвращает число запросов к API и Telegram и ответов 500."""
+        return {**self.counters, 'errors': self.errors}
+
+    def start(self):
+        """Запускает сервер и ждёт готовности к приёму соединений."""
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._serve, args=(ready,), daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        """Останавливает сервер и его поток."""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self):
+        """Запускает сервер в контекстном менеджере."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Останавливает сервер при выходе из контекста."""
+        self.stop()
+
+    def _serve(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(asyncio.start_server(
+            self._handle, '127.0.0.1', 0, backlog=4096
+        ))
+        self.port = self._server.sockets[0].getsockname()[1]
+        ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            # Открытые keep-alive соединения закрываем до остановки цикла.
+            handlers = asyncio.all_tasks(self._loop)
+            for handler in handlers:
+                handler.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*handlers, return_exceptions=True)
+            )
+            self._loop.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode('latin-1')
+                    if not line.strip():
+                        break
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length:
+                    await reader.readexactly(length)
+                path = request_line.decode('latin-1').split(' ')[1]
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, body = self._route(path)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(self._render(status, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _route(self, path):
+        if path == STATS_PATH:
+            return 200, self.stats()
+        telegram = path.startswith('/bot')
+        self.counters['telegram' if telegram else 'api'] += 1
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return 500, {
+                'ok': False, 'error_code': 500,
+                'description': 'Internal Server Error',
+            }
+        if telegram:
+            return 200, {'ok': True, 'result': TELEGRAM_MESSAGE}
+        return 200, {
+            'homeworks': self.homeworks,
+            'current_date': int(time.time()),
+        }
+
+    @staticmethod
+    def _render(status, body, keep_alive):
+        content = json.dumps(body).encode()
+        head = (
+            f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(content)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+        )
+        return head.encode('latin-1') + content
+
+
+class StubProcess:
+    """Та же заглушка в отдельном процессе интерпретатора.
+
+    Бенчмарк не делит с заглушкой ни GIL, ни память, поэтому замеры
+    RSS и задержек относятся только к боту. Счётчики запросов читаются
+    по HTTP из /_stats.
+    """
+
+    def __init__(
+        self, latency=0.0, homeworks=1, comment_size=0, error_rate=0.0,
+        seed=None
+    ):
+        """Запоминает параметры заглушки."""
+        self.args = [
+            '--latency', str(latency), '--homeworks', str(homeworks),
+            '--comment-size', str(comment_size),
+            '--error-rate', str(error_rate),
+        ]
+        if seed is not None:
+            self.args += ['--seed', str(seed)]
+        self.port = None
+        self._process = None
+
+    @property
+    def url(self):
+        """Базовый адрес заглушки."""
+        return f'http://127.0.0.1:{self.port}'
+
+    def stats(self):
+        """Возвращает число запросов к API и Telegram и ответов 500."""
+        with urllib.request.urlopen(self.url + STATS_PATH) as response:
+            return json.load(response)
+
+    def start(self):
+        """Запускает процесс и ждёт, пока он напечатает порт."""
+        self._process = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.stubs', *self.args],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=ROOT
+        )
+        line = self._process.stdout.readline()
+        if not line:
+            self._process.wait()
+            raise RuntimeError('Заглушка не запустилась')
+        self.port = int(line)
+        return self
+
+    def stop(self):
+        """Закрывает stdin процесса и ждёт его завершения."""
+        self._process.stdin.close()
+        try:
+            self._process.wait(5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process.stdout.close()
+
+    def __enter__(self):
+        """Запускает процесс в контекстном менеджере."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Останавливает процесс при выходе из контекста."""
+        self.stop()
+
+
+def main():
+    """Запускает заглушку и держит её, пока открыт stdin."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--homeworks', type=int, default=1)
+    parser.add_argument('--comment-size', type=int, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    with StubServer(
+        latency=args.latency,
+        homeworks=make_homeworks(args.homeworks, args.comment_size),
+        error_rate=args.error_rate, seed=args.seed
+    ) as server:
+        print(server.port, flush=True)
+        sys.stdin.read()
+
+
+if __name__ == '__main__':
+    main()
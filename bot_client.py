@@ -0,0 +1,29 @@
+"""Бот Telegram с отложенным импортом pyTelegramBotAPI."""
+
+
+class TeleBot:
+    """Заместитель telebot.TeleBot, создающий бота при первом обращении.
+
+    Импорт telebot занимает заметную часть холодного старта, а запуску
+    с --once сообщение нужно далеко не каждый раз. Атрибуты и методы
+    настоящего бота доступны через заместителя как обычно.
+    """
+
+    def __init__(self, token, **kwargs):
+        """Запоминает токен и параметры бота без импорта telebot."""
+        self._token = token
+        self._kwargs = kwargs
+        self._bot = None
+
+    @property
+    def bot(self):
+        """Настоящий telebot.TeleBot, созданный при первом обращении."""
+        if self._bot is None:
+            from telebot import TeleBot
+
+            self._bot = TeleBot(self._token, **self._kwargs)
+        return self._bot
+
+    def __getattr__(self, name):
+        """Передаёт обращение настоящему боту."""
+        return getattr(self.bot, name)
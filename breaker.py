@@ -0,0 +1,139 @@
+"""Автоматические выключатели для внешних зависимостей бота."""
+import logging
+import threading
+import time
+
+import metrics
+from exceptions import CircuitOpenError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30
+HALF_OPEN_CALLS = 1
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Выключатель с состояниями closed, open и half_open.
+
+    После failure_threshold ошибок подряд выключатель размыкается, и
+    вызовы сразу отклоняются без обращения к зависимости. Через
+    reset_timeout пропускается не больше half_open_calls пробных
+    вызовов: успех замыкает цепь, ошибка снова размыкает её. Выключенный
+    (enabled=False) выключатель пропускает все вызовы.
+    """
+
+    def __init__(
+        self, name, failure_threshold=FAILURE_THRESHOLD,
+        reset_timeout=RESET_TIMEOUT, half_open_calls=HALF_OPEN_CALLS,
+        enabled=True, clock=time.monotonic
+    ):
+        """Задаёт порог ошибок, время размыкания и число пробных вызовов."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        metrics.CIRCUIT_STATE.labels(name).set_function(self.state_code)
+
+    def allow(self):
+        """Решает, можно ли сейчас обратиться к зависимости."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self.state == OPEN and self.retry_after() == 0:
+                self.state = HALF_OPEN
+                self._probes = 0
+                logger.info(f'Пробный вызов зависимости {self.name}')
+            if self.state == CLOSED:
+                return True
+            if (
+                self.state == HALF_OPEN
+                and self._probes < self.half_open_calls
+            ):
+                self._probes += 1
+                return True
+            self.rejected += 1
+        metrics.CIRCUIT_REJECTED.labels(self.name).inc()
+        return False
+
+    def retry_after(self):
+        """Возвращает, сколько секунд цепь ещё будет разомкнута."""
+        if self.state != OPEN:
+            return 0
+        return max(self._opened_at + self.reset_timeout - self._clock(), 0)
+
+    def record_success(self):
+        """Учитывает успешный ответ зависимости."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                logger.warning(f'Зависимость {self.name} снова доступна')
+
+    def record_failure(self):
+        """Учитывает ошибку зависимости и размыкает цепь по порогу."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED
+                and self.failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self.opened += 1
+                self._opened_at = self._clock()
+                logger.error(
+                    f'Зависимость {self.name} недоступна после '
+                    f'{self.failures} ошибок подряд, вызовы пропускаются '
+                    f'{self.reset_timeout} с'
+                )
+
+    def call(self, function, *args, is_failure=None, **kwargs):
+        """Вызывает function через выключатель.
+
+        is_failure(error) решает, считать ли исключение отказом
+        зависимости; по умолчанию отказом считается любое исключение.
+        Если цепь разомкнута, выбрасывает CircuitOpenError.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+        try:
+            result = function(*args, **kwargs)
+        except Exception as error:
+            if is_failure is None or is_failure(error):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def state_code(self):
+        """Возвращает состояние числом: 0 — closed, 1 — half_open, 2 — open."""
+        return STATE_CODES[self.state]
+
+    def stats(self):
+        """Возвращает состояние и счётчики выключателя."""
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'opened': self.opened,
+            }
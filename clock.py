@@ -0,0 +1,61 @@
+"""Источники времени для цикла опроса: системный и виртуальный."""
+import time
+
+
+class SystemClock:
+    """Настоящее время и настоящее ожидание."""
+
+    def time(self):
+        """Возвращает текущее время Unix."""
+        return time.time()
+
+    def monotonic(self):
+        """Возвращает показания монотонных часов."""
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        """Приостанавливает поток на seconds секунд."""
+        time.sleep(seconds)
+
+    def wait(self, event, seconds):
+        """Ждёт установки event не дольше seconds секунд."""
+        return event.wait(seconds)
+
+
+class VirtualClock:
+    """Часы, время которых сдвигается только вызовами sleep и advance.
+
+    Ожидание не занимает реального времени, поэтому сутки опроса
+    многих получателей проигрываются за доли секунды и детерминированно.
+    """
+
+    def __init__(self, start=0.0):
+        """Устанавливает начальное время."""
+        self.now = start
+        self.sleeps = 0
+
+    def time(self):
+        """Возвращает виртуальное время."""
+        return self.now
+
+    monotonic = time
+
+    def sleep(self, seconds):
+        """Мгновенно сдвигает время на seconds секунд."""
+        if seconds < 0:
+            raise ValueError('Время ожидания не может быть отрицательным')
+        self.sleeps += 1
+        self.now += seconds
+
+    def wait(self, event, seconds):
+        """Сдвигает время на seconds секунд, если event не установлено."""
+        if not event.is_set():
+            self.sleep(seconds)
+        return event.is_set()
+
+    def advance(self, until):
+        """Сдвигает время вперёд до момента until."""
+        self.now = max(self.now, until)
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,88 @@
+"""Условные запросы к API по валидаторам уже обработанных ответов."""
+import threading
+
+
+class CacheEntry:
+    """Валидаторы ответа на запрос с одним from_date."""
+
+    __slots__ = ('from_date', 'etag', 'last_modified', 'size')
+
+    def __init__(self, from_date, etag, last_modified, size):
+        """Запоминает валидаторы ответа."""
+        self.from_date = from_date
+        self.etag = etag
+        self.last_modified = last_modified
+        self.size = size
+
+
+class ResponseCache:
+    """Последние успешно обработанные ответы API по токенам.
+
+    Ответ сначала откладывается через stage(), а валидаторами для
+    следующего запроса становится только после commit(), то есть
+    когда цикл обработал его без ошибок. Иначе неудачная доставка
+    не повторилась бы: сервер ответил бы 304 на тот же запрос.
+
+    Валидаторы действуют только для того же from_date, а доставленная
+    непустая пачка сдвигает курсор, поэтому 304 приходит на повторные
+    пустые ответы. Экономятся байты тела, а не разбор: пустой список
+    разбирается почти даром.
+    """
+
+    def __init__(self):
+        """Создаёт пустой кэш."""
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._staged = {}
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    def conditional_headers(self, key, from_date):
+        """Возвращает заголовки If-None-Match и If-Modified-Since."""
+        entry = self._lookup(key, from_date)
+        headers = {}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def record_not_modified(self, key, from_date):
+        """Учитывает ответ 304 и возвращает размер нескачанного тела."""
+        entry = self._lookup(key, from_date)
+        size = entry.size if entry is not None else 0
+        with self._lock:
+            self._staged.pop(key, None)
+            self.not_modified += 1
+            self.bytes_saved += size
+        return size
+
+    def stage(self, key, from_date, headers, size):
+        """Откладывает валидаторы ответа с телом size байт."""
+        with self._lock:
+            self._staged[key] = CacheEntry(
+                from_date, headers.get('ETag'), headers.get('Last-Modified'),
+                size
+            )
+
+    def commit(self, key):
+        """Делает отложенный ответ валидатором следующего запроса."""
+        with self._lock:
+            entry = self._staged.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+
+    def stats(self):
+        """Возвращает число ответов 304 и сэкономленных байт."""
+        with self._lock:
+            return {
+                'not_modified': self.not_modified,
+                'bytes_saved': self.bytes_saved,
+            }
+
+    def _lookup(self, key, from_date):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.from_date != from_date:
+            return None
+        return entry
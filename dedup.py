@@ -0,0 +1,80 @@
+"""Ограниченный по памяти индекс уже отправленных статусов работ."""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = 100_000
+TTL = 30 * 24 * 60 * 60
+
+
+class DedupIndex:
+    """LRU-индекс изменений статуса работ со сроком жизни.
+
+    Ключ — получатель, работа, статус и date_updated изменения, поэтому
+    повторная отправка работы на проверку с уже знакомым статусом
+    считается новым изменением. Индекс проверяется до вызова
+    parse_status, поэтому повтор изменения не требует рендера
+    сообщения. При переполнении вытесняются давно не
+    использованные записи, записи старше ttl считаются отсутствующими.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL, clock=time.monotonic):
+        """Задаёт размер индекса, срок жизни записей и источник времени."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        """Возвращает число записей в индексе."""
+        return len(self._entries)
+
+    def contains(self, tenant, homework_id, status, updated=''):
+        """Проверяет наличие ключа и продлевает его срок жизни."""
+        key = (tenant, homework_id, status, updated)
+        now = self._clock()
+        with self._lock:
+            seen_at = self._entries.get(key)
+            if seen_at is None or now - seen_at > self.ttl:
+                if seen_at is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return False
+            self._entries[key] = now
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+    def add(self, tenant, homework_id, status, updated=''):
+        """Добавляет ключ, вытесняя устаревшие и лишние записи."""
+        key = (tenant, homework_id, sys.intern(status), updated)
+        now = self._clock()
+        with self._lock:
+            self._entries[key] = now
+            self._entries.move_to_end(key)
+            self._evict(now)
+
+    def stats(self):
+        """Возвращает размер индекса и счётчики попаданий и вытеснений."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _evict(self, now):
+        entries = self._entries
+        while entries and (
+            len(entries) > self.max_entries
+            or now - next(iter(entries.values())) > self.ttl
+        ):
+            entries.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,150 @@
+"""Сводки ошибок опроса вместо сообщения о каждом сбое."""
+import threading
+import time
+
+DIGEST_INTERVAL = 60 * 60
+SAMPLE_LENGTH = 200
+TIME_FORMAT = '%d.%m %H:%M'
+
+
+def error_fingerprint(error):
+    """Возвращает группу ошибки: класс и код ответа, если он есть."""
+    code = getattr(error, 'status_code', None) or getattr(
+        error, 'error_code', None
+    )
+    name = type(error).__name__
+    return f'{name} {code}' if code is not None else name
+
+
+class ErrorGroup:
+    """Ошибки одной группы: число, первое и последнее появление."""
+
+    __slots__ = ('count', 'unreported', 'first_seen', 'last_seen', 'sample')
+
+    def __init__(self, now):
+        """Создаёт пустую группу, впервые замеченную в момент now."""
+        self.count = 0
+        self.unreported = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.sample = ''
+
+    def __str__(self):
+        """Описывает группу одной строкой сводки."""
+        first = time.strftime(TIME_FORMAT, time.localtime(self.first_seen))
+        last = time.strftime(TIME_FORMAT, time.localtime(self.last_seen))
+        return (
+            f'{self.count} раз, с {first} по {last}; '
+            f'последняя: {self.sample}'
+        )
+
+
+class DigestState:
+    """Группы ошибок получателя и время последнего сообщения о них."""
+
+    __slots__ = ('groups', 'last_sent')
+
+    def __init__(self):
+        """Создаёт состояние без ошибок."""
+        self.groups = {}
+        self.last_sent = None
+
+
+class ErrorDigests:
+    """Группирует ошибки опроса и сообщает о них не чаще interval.
+
+    Первая ошибка сбоя сообщается сразу прежним текстом. Дальше ошибки
+    копятся по группам (класс исключения и код ответа), и не чаще раза
+    в interval секунд получатель узнаёт сводку: сколько раз случилась
+    каждая группа, когда впервые и когда последний раз. Когда опрос
+    снова проходит, несообщённые ошибки отправляются итоговой сводкой
+    сразу. С interval=0 сводки выключены и каждая ошибка даёт прежнее
+    сообщение. Сообщение считается отправленным только после вызова
+    reported().
+    """
+
+    def __init__(self, interval=DIGEST_INTERVAL):
+        """Задаёт минимальный промежуток между сводками одному получателю."""
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._states = {}
+
+    @property
+    def enabled(self):
+        """Включены ли сводки."""
+        return self.interval > 0
+
+    def record(self, key, error, now):
+        """Учитывает ошибку получателя и возвращает сообщение или None."""
+        if not self.enabled:
+            return f'Сбой в работе : {error}'
+        with self._lock:
+            state = self._states.setdefault(key, DigestState())
+            group = state.groups.setdefault(
+                error_fingerprint(error), ErrorGroup(now)
+            )
+            group.count += 1
+            group.unreported += 1
+            group.last_seen = now
+            group.sample = str(error)[:SAMPLE_LENGTH]
+            if state.last_sent is None:
+                return f'Сбой в работе : {error}'
+            if now - state.last_sent < self.interval:
+                return None
+            return self._render(state, 'Сводка ошибок опроса:')
+
+    def recovered(self, key):
+        """Возвращает итоговую сводку, если есть несообщённые ошибки."""
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or not any(
+                group.unreported for group in state.groups.values()
+            ):
+                return None
+            return self._render(state, 'Опрос снова работает. Ошибки сбоя:')
+
+    def reported(self, key, now):
+        """Отмечает, что получатель узнал о всех накопленных ошибках."""
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return
+            state.last_sent = now
+            for group in state.groups.values():
+                group.unreported = 0
+
+    def notice(self, tenant, error, now):
+        """Учитывает ошибку получателя и возвращает текст для отправки.
+
+        None — отправлять нечего: сводка ещё копится или получатель
+        уже видел ровно этот текст.
+        """
+        message = self.record(tenant.key, error, now)
+        if message is not None and message == tenant.last_message:
+            self.reported(tenant.key, now)
+            return None
+        return message
+
+    def noticed(self, tenant, message, now):
+        """Отмечает, что сообщение об ошибках дошло до получателя."""
+        tenant.last_message = message
+        self.reported(tenant.key, now)
+
+    def resolved(self, tenant, message):
+        """Отмечает восстановление опроса после итоговой сводки message."""
+        if message is not None:
+            tenant.last_message = message
+        self.clear(tenant.key)
+
+    def clear(self, key):
+        """Забывает ошибки получателя после восстановления опроса."""
+        with self._lock:
+            self._states.pop(key, None)
+
+    @staticmethod
+    def _render(state, title):
+        return '\n'.join([title] + [
+            f'- {fingerprint}: {group}'
+            for fingerprint, group in state.groups.items()
+            if group.unreported
+        ])
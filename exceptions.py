@@ -1,4 +1,111 @@
-class InvalidResponseCodeError(Exception):
+from enum import Enum
+from http import HTTPStatus
+
+
+class ErrorPolicy(Enum):
+    """Что делать с опросом после ошибки."""
+
+    RETRY_SOON = 'retry_soon'
+    BACKOFF = 'backoff'
+    STOP = 'stop'
+
+
+class BotError(Exception):
+    """Базовое исключение бота с политикой повтора опроса."""
+
+    policy = ErrorPolicy.BACKOFF
+    retry_after = None
+
+
+class ApiConnectionError(BotError, ConnectionError):
+    """Исключение для обрыва соединения или таймаута запроса к API."""
+
+    policy = ErrorPolicy.RETRY_SOON
+
+
+class InvalidResponseCodeError(BotError):
     """Исключение для неверного кода ответа."""
 
-    pass
+    def __init__(self, message, retry_after=None, status_code=None):
+        """Сохраняет код ответа и паузу из заголовка Retry-After."""
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class AuthError(InvalidResponseCodeError):
+    """Исключение для отозванного или неверного токена (401, 403)."""
+
+    policy = ErrorPolicy.STOP
+
+
+class ThrottledError(InvalidResponseCodeError):
+    """Исключение для превышения частоты запросов (429)."""
+
+
+class ServerError(InvalidResponseCodeError):
+    """Исключение для сбоя на стороне API (5xx)."""
+
+    policy = ErrorPolicy.RETRY_SOON
+
+
+class MalformedResponseError(BotError):
+    """Исключение для ответа API, не соответствующего документации."""
+
+
+class ResponseTypeError(MalformedResponseError, TypeError):
+    """Исключение для значения неожиданного типа в ответе API."""
+
+
+class ResponseKeyError(MalformedResponseError, KeyError):
+    """Исключение для отсутствующего ключа в ответе API."""
+
+    def __str__(self):
+        """Возвращает текст без кавычек, которые добавляет KeyError."""
+        return str(self.args[0]) if self.args else ''
+
+
+class UnknownStatusError(BotError, ValueError):
+    """Исключение для недокументированного статуса домашней работы."""
+
+
+class CircuitOpenError(BotError):
+    """Исключение для вызова, пропущенного разомкнутым выключателем."""
+
+    def __init__(self, name, retry_after):
+        """Сохраняет имя зависимости и время до пробного вызова."""
+        super().__init__(f'Зависимость {name} недоступна, вызов пропущен.')
+        self.name = name
+        self.retry_after = retry_after
+
+
+class ShutdownRequested(BaseException):
+    """Исключение, прерывающее ожидание бота сигналом остановки.
+
+    Наследуется от BaseException, как KeyboardInterrupt, чтобы его не
+    перехватывали обработчики ошибок опроса.
+    """
+
+
+def error_for_status(status_code):
+    """Возвращает класс исключения для кода ответа API."""
+    if status_code in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+        return AuthError
+    if status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        return ThrottledError
+    if status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        return ServerError
+    return InvalidResponseCodeError
+
+
+def error_policy(error):
+    """Возвращает политику повтора для любого исключения."""
+    return getattr(error, 'policy', ErrorPolicy.BACKOFF)
+
+
+def is_retriable(error):
+    """Проверяет, имеет ли смысл повторить запрос в этом же цикле."""
+    return (
+        error_policy(error) is ErrorPolicy.RETRY_SOON
+        and getattr(error, 'retry_after', None) is None
+    )
@@ -1,14 +1,41 @@
+import argparse
 import logging
 import os
+import threading
 import time
+from functools import partial
 from http import HTTPStatus
-import sys
 
 from dotenv import load_dotenv
-from telebot import TeleBot
 import requests
 
-from exceptions import InvalidResponseCodeError
+import http_client
+import metrics
+from bot_client import TeleBot
+from clock import SYSTEM_CLOCK
+from breaker import CircuitBreaker
+from conditional import ResponseCache
+from dedup import DedupIndex
+from digest import ErrorDigests
+from exceptions import (
+    ApiConnectionError, CircuitOpenError, ErrorPolicy,
+    InvalidResponseCodeError, ResponseKeyError, ResponseTypeError,
+    ServerError, UnknownStatusError, error_for_status, error_policy,
+    is_retriable
+)
+from log_config import setup_logging
+from outbound import OutboundQueue
+from outbox import OutboxDrainer
+from preflight import Preflight, TokenStatus
+from retries import Hedger, LatencyTracker, RetryBudget, RetryPolicy
+from scheduler import PollScheduler, parse_retry_after, spread_offset
+from shutdown import SIGNALS, GracefulShutdown
+from state_store import StateStore
+from streaming import CHUNK_SIZE, iter_homeworks
+from tenants import Tenant, TenantPoller, load_tenants
+from updates import (
+    delivery_plan, latest_statuses, latest_updates, run_plan, status_history
+)
 
 
 load_dotenv()
@@ -17,35 +44,61 @@ load_dotenv()
 PRACTICUM_TOKEN = os.getenv('FIRST_TOKEN')
 TELEGRAM_TOKEN = os.getenv('SECOND_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+TENANTS_FILE = os.getenv('TENANTS_FILE')
+STATE_DB = os.getenv('STATE_DB')
+ONCE_STATE_DB = __file__ + '.db'
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
 
 RETRY_PERIOD = 600
+POLL_SPREAD = float(os.getenv('POLL_SPREAD', RETRY_PERIOD))
+MIN_WAIT = 1
+SHUTDOWN_TIMEOUT = 10
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+USE_HTTP_POOL = os.getenv('USE_HTTP_POOL', '').lower() in ('1', 'true', 'yes')
+API_CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', 3.05))
+API_READ_TIMEOUT = float(os.getenv('API_READ_TIMEOUT', 10))
+API_RETRIES = int(os.getenv('API_RETRIES', 1))
+API_HEDGE_PERCENTILE = float(os.getenv('API_HEDGE_PERCENTILE', 0))
+CIRCUIT_BREAKER = os.getenv('CIRCUIT_BREAKER', '').lower() in (
+    '1', 'true', 'yes'
+)
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', '').lower() in (
+    '1', 'true', 'yes'
+)
+OUTBOX = os.getenv('OUTBOX', '').lower() in ('1', 'true', 'yes')
+ERROR_DIGEST_INTERVAL = float(os.getenv('ERROR_DIGEST_INTERVAL', 0))
+CATCH_UP = os.getenv('CATCH_UP', '').lower() in ('1', 'true', 'yes')
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG').upper()
+LOG_FILE = os.getenv('LOG_FILE', __file__ + '.log')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 5 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN')
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
-
-file_handler = logging.FileHandler(
-    __file__ + '.log', encoding='UTF-8', mode='w'
-)
-stream_handler = logging.StreamHandler(
-    sys.stdout
-)
-
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format=(
-        '%(asctime)s - %(levelname)s - '
-        '%(filename)s:%(lineno)d - %(message)s'
-    ),
-    handlers=[file_handler, stream_handler],
-)
+STATUS_LABELS = {
+    'approved': 'принята',
+    'reviewing': 'на проверке',
+    'rejected': 'есть замечания',
+}
 
 logger = logging.getLogger(__name__)
+retry_policy = RetryPolicy(API_RETRIES)
+retry_budget = RetryBudget()
+api_latency = LatencyTracker()
+api_breaker = CircuitBreaker('api', enabled=CIRCUIT_BREAKER)
+telegram_breaker = CircuitBreaker('telegram', enabled=CIRCUIT_BREAKER)
+response_cache = ResponseCache()
+error_digests = ErrorDigests(ERROR_DIGEST_INTERVAL)
+preflight = Preflight(lambda error: is_rejected_token(error))
+hedger = Hedger(
+    API_HEDGE_PERCENTILE, api_latency, retry_budget
+) if API_HEDGE_PERCENTILE else None
 
 
 def check_tokens():
@@ -69,105 +122,863 @@ def check_tokens():
 
 def send_message(bot, message):
     """Отправляет сообщение в Telegram-чат."""
+    return send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_to_chat(bot, chat_id, message):
+    """Отправляет сообщение в указанный Telegram-чат.
+
+    Очередь отправки сама вызывает Telegram через выключатель, поэтому
+    постановка в неё мимо выключателя: она не говорит о доступности
+    Telegram.
+    """
+    started = time.perf_counter()
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        if isinstance(bot, OutboundQueue):
+            bot.send_message(chat_id, message)
+        else:
+            telegram_breaker.call(
+                bot.send_message, chat_id, message,
+                is_failure=is_telegram_failure
+            )
+    except CircuitOpenError as error:
+        logger.warning(f'Сообщение в Telegram не отправлено: {error}')
+        return False
     except Exception as error:
+        metrics.SEND_FAILURES.inc()
         logger.error(f'Ошибка при отправке сообщения в Telegram: {error}')
         return False
+    finally:
+        metrics.SEND_LATENCY.observe(time.perf_counter() - started)
     logger.debug(f'Бот отправил сообщение: "{message}"')
     return True
 
 
+def is_telegram_failure(error):
+    """Проверяет, говорит ли ошибка отправки о сбое самого Telegram."""
+    error_code = getattr(error, 'error_code', None)
+    return error_code is None or error_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+
+
 def get_api_answer(timestamp):
     """Делает запрос к единственному эндпоинту API-сервиса."""
+    return fetch_homework_statuses(timestamp, HEADERS)
+
+
+def fetch_homework_statuses(timestamp, headers):
+    """Запрашивает статусы работ с заголовками конкретного токена.
+
+    Запрос условный: если прошлый ответ на тот же from_date обработан
+    без ошибок, отправляются его ETag и Last-Modified. На 304
+    возвращается пустой список работ без скачивания тела.
+    """
+    key = headers.get('Authorization')
+    homework_statuses = request_api(timestamp, {
+        **headers,
+        'Accept-Encoding': 'gzip, deflate',
+        **response_cache.conditional_headers(key, timestamp),
+    })
+    if homework_statuses.status_code == HTTPStatus.NOT_MODIFIED:
+        saved = response_cache.record_not_modified(key, timestamp)
+        metrics.API_SKIPPED.labels('not_modified').inc()
+        metrics.API_BYTES_SAVED.labels('not_modified').inc(saved)
+        logger.debug(f'Ответ API не изменился (304), сэкономлено {saved} Б.')
+        return {'homeworks': []}
+    body = getattr(homework_statuses, 'content', None)
+    if isinstance(body, bytes):
+        response_headers = getattr(homework_statuses, 'headers', {})
+        metrics.API_BYTES_SAVED.labels('compression').inc(
+            compression_savings(response_headers, body)
+        )
+        response_cache.stage(key, timestamp, response_headers, len(body))
+    return homework_statuses.json()
+
+
+def compression_savings(headers, body):
+    """Возвращает, на сколько байт сжатие уменьшило тело ответа."""
+    if headers.get('Content-Encoding') not in ('gzip', 'deflate'):
+        return 0
+    try:
+        return max(len(body) - int(headers.get('Content-Length')), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def confirm_response(tenant):
+    """Запоминает обработанный ответ как основу следующего запроса."""
+    response_cache.commit(tenant.headers['Authorization'])
+
+
+def request_api(timestamp, headers, **kwargs):
+    """Выполняет запрос к API через выключатель и проверяет код ответа.
+
+    Пока API недоступно, выключатель отклоняет запросы без обращения
+    к сети исключением CircuitOpenError с паузой до пробного запроса.
+    """
     params = dict(
         url=ENDPOINT,
-        headers=HEADERS,
-        params={"from_date": timestamp}
+        headers=headers,
+        params={"from_date": timestamp},
+        timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT),
+        **kwargs
     )
-    try:
-        homework_statuses = requests.get(**params)
-    except requests.exceptions.RequestException:
-        raise ConnectionError(
-            'Ошибка при запросе к API: {url}, {headers}, {params}.'.format(
-                **params
+    return api_breaker.call(
+        request_with_retries, params, is_failure=is_server_failure
+    )
+
+
+def request_with_retries(params):
+    """Выполняет запрос к API, повторяя его при сбоях сервера.
+
+    Обрыв соединения, таймаут и ответ 5xx без Retry-After повторяются
+    до API_RETRIES раз со случайной паузой, пока не исчерпан общий
+    бюджет повторов. Каждая попытка попадает в метрики.
+    """
+    retry_budget.deposit()
+    attempt = 0
+    while True:
+        try:
+            return send_api_request(params, 'retry' if attempt else 'first')
+        except (ApiConnectionError, InvalidResponseCodeError) as error:
+            if not is_retriable(error) or attempt >= retry_policy.retries or (
+                not retry_budget.withdraw()
+            ):
+                raise
+            attempt += 1
+            delay = retry_policy.delay(attempt)
+            logger.warning(
+                f'Повтор запроса к API через {delay:.2f} с: {error}'
             )
+            time.sleep(delay)
+
+
+def is_server_failure(error):
+    """Проверяет, говорит ли ошибка о сбое API, а не о неверном запросе."""
+    return isinstance(error, (ApiConnectionError, ServerError))
+
+
+def send_api_request(params, kind):
+    """Выполняет попытку запроса, дублируя её при включённом hedging."""
+    metrics.API_ATTEMPTS.labels(kind).inc()
+    if hedger is None:
+        return attempt_api_request(params)
+    response, hedge_won = hedger.call(
+        lambda: attempt_api_request(params),
+        on_hedge=metrics.API_ATTEMPTS.labels('hedge').inc,
+        discard=lambda late: late.close()
+    )
+    if hedge_won:
+        metrics.API_HEDGE_WINS.inc()
+    return response
+
+
+def attempt_api_request(params):
+    """Делает один HTTP-запрос к API и проверяет код ответа."""
+    get = http_client.get_client().get if USE_HTTP_POOL else requests.get
+    started = time.perf_counter()
+    try:
+        homework_statuses = get(**params)
+    except requests.exceptions.RequestException as error:
+        metrics.API_RESPONSES.labels('error').inc()
+        # Без from_date и токена: текст ошибки уходит в Telegram и должен
+        # совпадать между запусками, чтобы повтор не отправлялся.
+        raise ApiConnectionError(
+            f'Ошибка при запросе к API: {params["url"]}, '
+            f'{type(error).__name__}.'
         )
-    if homework_statuses.status_code != HTTPStatus.OK:
-        raise InvalidResponseCodeError(
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.API_LATENCY.observe(elapsed)
+    metrics.API_RESPONSES.labels(homework_statuses.status_code).inc()
+    if homework_statuses.status_code not in (
+        HTTPStatus.OK, HTTPStatus.NOT_MODIFIED
+    ):
+        raise error_for_status(homework_statuses.status_code)(
             f'Stатус не равен 200: {homework_statuses.status_code}. '
             f'{homework_statuses.reason}'
-            f'{homework_statuses.text}'
+            f'{homework_statuses.text}',
+            retry_after=parse_retry_after(
+                homework_statuses.headers.get('Retry-After')
+            ),
+            status_code=homework_statuses.status_code
         )
-    return homework_statuses.json()
+    api_latency.add(elapsed)
+    return homework_statuses
+
+
+def stream_homework_statuses(timestamp, headers):
+    """Читает ответ API потоком и возвращает его и последние изменения.
+
+    Массив homeworks разбирается по одной записи и сразу сворачивается
+    до последнего статуса каждой работы, поэтому память не зависит от
+    длины истории в ответе.
+    """
+    response = {}
+    with request_api(timestamp, headers, stream=True) as homework_statuses:
+        try:
+            homeworks = latest_updates(iter_homeworks(
+                homework_statuses.iter_content(CHUNK_SIZE), response
+            ))
+        except (TypeError, KeyError) as error:
+            metrics.CHECK_FAILURES.labels(
+                'TypeError' if isinstance(error, TypeError) else 'KeyError'
+            ).inc()
+            raise
+    metrics.mark_poll_success()
+    return response, homeworks
 
 
 def check_response(response):
     """Проверяет ответ API на соответствие документации."""
     if not isinstance(response, dict):
-        raise TypeError('Ответ API не является словарем')
+        metrics.CHECK_FAILURES.labels('TypeError').inc()
+        raise ResponseTypeError('Ответ API не является словарем')
 
     if 'homeworks' not in response:
-        raise KeyError('Ключ homeworks отсутствует в ответе API')
+        metrics.CHECK_FAILURES.labels('KeyError').inc()
+        raise ResponseKeyError('Ключ homeworks отсутствует в ответе API')
 
     homeworks = response['homeworks']
 
     if not isinstance(homeworks, list):
-        raise TypeError('Ключ homeworks должен быть списком')
+        metrics.CHECK_FAILURES.labels('TypeError').inc()
+        raise ResponseTypeError('Ключ homeworks должен быть списком')
 
     return homeworks
 
 
 def parse_status(homework):
     """Извлекает из информации о конкретной домашней работе."""
-    if 'homework_name' not in homework:
-        raise KeyError('Нет ключа homework_name в API')
+    if 'homework_name' not in homework or 'status' not in homework:
+        metrics.PARSE_OUTCOMES.labels('invalid').inc()
+        raise ResponseKeyError('Нет ключа homework_name или status в API')
     homework_name = homework['homework_name']
     status = homework['status']
     if status not in HOMEWORK_VERDICTS:
-        raise ValueError('Неожиданный статус домашней работы')
+        metrics.PARSE_OUTCOMES.labels('unknown').inc()
+        raise UnknownStatusError('Неожиданный статус домашней работы')
 
     verdict = HOMEWORK_VERDICTS[status]
+    metrics.PARSE_OUTCOMES.labels(status).inc()
 
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
+def parse_record(record):
+    """Формирует сообщение о статусе по проверенной записи о работе."""
+    metrics.PARSE_OUTCOMES.labels(record.status).inc()
+    return (
+        f'Изменился статус проверки работы "{record.name}". '
+        f'{HOMEWORK_VERDICTS[record.status]}'
+    )
+
+
+def parse_summary(record, statuses):
+    """Описывает одним сообщением все статусы работы за время простоя."""
+    message = parse_record(record)
+    if len(statuses) < 2:
+        return message
+    chain = ' → '.join(
+        STATUS_LABELS.get(status, status) for status in statuses
+    )
+    return f'Пока бот не работал, статус менялся: {chain}. {message}'
+
+
+def deliver_summary(tenant, record, statuses, send):
+    """Отправляет сводку по работе, если о её изменениях ещё не сообщали.
+
+    Сводка отмечается как уведомление о последнем изменении работы.
+    """
+    homework_id, status = record.key, record.status.value
+    if tenant.is_notified(homework_id, status, record.date_updated):
+        logger.debug(f'Статусы работы {homework_id} уже отправлены.')
+        return True
+    message = parse_summary(record, statuses)
+    if not send(message):
+        return False
+    tenant.mark_sent(homework_id, status, message, record.date_updated)
+    return True
+
+
+def catch_up(tenant, send):
+    """Догоняет изменения, пропущенные за время простоя, одним запросом.
+
+    Ответ с сохранённого курсора читается потоком, история каждой
+    работы хранится компактными записями Homework и сворачивается
+    в одно сводное уведомление. Курсор сдвигается, если доставлены
+    все сводки. Возвращает последние статусы работ в виде
+    {идентификатор работы: статус}.
+    """
+    logger.info(f'Догоняем изменения {tenant!r} с {tenant.timestamp}')
+    response = {}
+    with request_api(
+        tenant.timestamp, tenant.headers, stream=True
+    ) as homework_statuses:
+        histories = status_history(iter_homeworks(
+            homework_statuses.iter_content(CHUNK_SIZE), response
+        ))
+    metrics.mark_poll_success()
+    delivered = True
+    for record, statuses in histories:
+        delivered = deliver_summary(
+            tenant, record, statuses, send
+        ) and delivered
+    if delivered:
+        tenant.advance(response.get('current_date', tenant.timestamp))
+    logger.info(
+        f'Догон {tenant!r} завершён, изменённых работ: {len(histories)}'
+    )
+    return {record.key: record.status.value for record, _ in histories}
+
+
+def catch_up_tenant(bot, tenant, outbox=None):
+    """Догоняет получателя с CATCH_UP, если его курсор отстал от часов."""
+    if not CATCH_UP or time.time() - tenant.timestamp <= RETRY_PERIOD:
+        return
+    notify = partial(notify_tenant, bot, tenant)
+    try:
+        catch_up(tenant, tenant_sender(outbox, tenant, notify))
+    except Exception as error:
+        report_error(tenant, error, notify)
+
+
+def deliver_updates(tenant, response, homeworks, send):
+    """Рассылает новые статусы всех работ и сдвигает курсор за пачку.
+
+    Курсор сдвигается, только если все уведомления пачки доставлены,
+    иначе изменения будут запрошены повторно в следующем цикле.
+    """
+    plan = delivery_plan(tenant, response, homeworks, parse_status)
+    if run_plan(plan, send):
+        confirm_response(tenant)
+
+
+def open_state_store():
+    """Открывает хранилище состояния, если задан путь STATE_DB."""
+    return StateStore(STATE_DB) if STATE_DB else None
+
+
+def open_outbound(bot):
+    """Запускает очередь отправки, которая вызывает бота через выключатель."""
+    return OutboundQueue(partial(
+        telegram_breaker.call, bot.send_message,
+        is_failure=is_telegram_failure
+    ))
+
+
+def open_outbox(store, bot):
+    """Запускает доставку из outbox, если она включена и есть хранилище.
+
+    С очередью отправки вместо бота outbox шлёт через её send_now:
+    выключатель и ограничения частоты у них общие.
+    """
+    if not OUTBOX:
+        return None
+    if store is None:
+        logger.warning('OUTBOX работает только с STATE_DB: отправка напрямую.')
+        return None
+    metrics.OUTBOX_DEPTH.set_function(store.outbox_depth)
+    if isinstance(bot, OutboundQueue):
+        return OutboxDrainer(store, bot.send_now)
+    return OutboxDrainer(store, partial(
+        telegram_breaker.call, bot.send_message,
+        is_failure=is_telegram_failure
+    ))
+
+
+def tenant_sender(outbox, tenant, send):
+    """Возвращает отправку уведомлений получателю: в outbox или сразу.
+
+    Сообщения в outbox помечаются текущим курсором получателя, то есть
+    пачкой, из которой они взяты.
+    """
+    if outbox is None:
+        return send
+    return partial(
+        outbox.enqueue, tenant.key, tenant.chat_ids, cursor=tenant.timestamp
+    )
+
+
+def flush_state(store, outbox=None):
+    """Сохраняет изменения цикла и будит доставку из outbox."""
+    if store is not None:
+        store.flush()
+    if outbox is not None:
+        outbox.wake()
+
+
+def close_state(store, outbox=None):
+    """Сохраняет изменения, досылает outbox и закрывает хранилище."""
+    flush_state(store)
+    if outbox is not None and not outbox.close(SHUTDOWN_TIMEOUT):
+        logger.warning(
+            f'Outbox не опустел за {SHUTDOWN_TIMEOUT} с: {outbox.stats()}'
+        )
+    if store is not None:
+        store.close()
+
+
 def main():
     """Основная логика работы бота."""
     check_tokens()
 
     bot = TeleBot(TELEGRAM_TOKEN)
-    timestamp = int(time.time())
+    notify = partial(send_message, bot)
+    store = open_state_store()
+    outbox = open_outbox(store, bot)
+    tenant = Tenant(
+        PRACTICUM_TOKEN, [TELEGRAM_CHAT_ID], int(time.time()), store
+    )
+    try:
+        catch_up_tenant(bot, tenant, outbox)
+
+        with GracefulShutdown() as shutdown:
+            while not shutdown.requested:
+                started = time.perf_counter()
+                try:
+                    if STREAM_RESPONSES:
+                        response, homeworks = stream_homework_statuses(
+                            tenant.timestamp, HEADERS
+                        )
+                    else:
+                        response = get_api_answer(tenant.timestamp)
+                        homeworks = check_response(response)
+                        metrics.mark_poll_success()
+                    report_recovery(tenant, notify)
+                    if USE_HTTP_POOL:
+                        logger.debug(
+                            'Пул соединений: '
+                            f'{http_client.get_client().stats()}'
+                        )
+
+                    if homeworks:
+                        deliver_updates(
+                            tenant, response, homeworks,
+                            tenant_sender(outbox, tenant, notify)
+                        )
+                    else:
+                        logger.debug('Нет новых статусов для отправки.')
+                        confirm_response(tenant)
+
+                except Exception as error:
+                    policy = report_error(tenant, error, notify)
+                    if policy is ErrorPolicy.STOP:
+                        logger.critical(f'Опрос остановлен: {error}')
+                        raise
+
+                finally:
+                    flush_state(store, outbox)
+                    metrics.CYCLE_DURATION.observe(
+                        time.perf_counter() - started
+                    )
+                with shutdown.interruptible():
+                    time.sleep(RETRY_PERIOD)
+    finally:
+        close_state(store, outbox)
+    logger.info('Бот остановлен.')
+
+
+def report_error(tenant, error, send):
+    """Сообщает об ошибке опроса один раз и возвращает политику повтора.
+
+    С ERROR_DIGEST_INTERVAL ошибки копятся в сводку, которая уходит
+    не чаще раза в заданное число секунд.
+    """
+    now = time.time()
+    message = error_digests.notice(tenant, error, now)
+    logger.error(f'Ошибка опроса {tenant!r}: {error}')
+    if message is not None and send(message):
+        error_digests.noticed(tenant, message, now)
+    return error_policy(error)
+
+
+def report_recovery(tenant, send):
+    """Отправляет итоговую сводку ошибок, когда опрос снова прошёл."""
+    message = error_digests.recovered(tenant.key)
+    if message is None or send(message):
+        error_digests.resolved(tenant, message)
+
+
+def notify_tenant(bot, tenant, message):
+    """Рассылает сообщение по всем чатам получателя."""
+    delivered = True
+    for chat_id in tenant.chat_ids:
+        delivered = send_to_chat(bot, chat_id, message) and delivered
+    return delivered
+
+
+def process_tenant(bot, tenant, outbox=None):
+    """Запрашивает статусы получателя, рассылает новый и возвращает их."""
+    if STREAM_RESPONSES:
+        response, homeworks = stream_homework_statuses(
+            tenant.timestamp, tenant.headers
+        )
+    else:
+        response = fetch_homework_statuses(tenant.timestamp, tenant.headers)
+        homeworks = check_response(response)
+        metrics.mark_poll_success()
+    report_recovery(tenant, partial(notify_tenant, bot, tenant))
+    if not homeworks:
+        logger.debug('Нет новых статусов для отправки.')
+        confirm_response(tenant)
+        return {}
+    deliver_updates(
+        tenant, response, homeworks, tenant_sender(
+            outbox, tenant,
+            lambda message: notify_tenant(bot, tenant, message)
+        )
+    )
+    return latest_statuses(homeworks)
 
-    last_message = ''
 
-    while True:
-        try:
-            response = get_api_answer(timestamp)
-            homeworks = check_response(response)
-
-            if not homeworks:
-                logger.debug('Нет новых статусов для отправки.')
-                continue
-            homework = homeworks[0]
-            message = parse_status(homework)
-            if message != last_message and send_message(
-                bot, message
-            ):
-                last_message = message
-                timestamp = response.get('current_date', timestamp)
-
-        except Exception as error:
-            current_message = f'Сбой в работе : {error}'
-            logger.error(f'Ошибка программы: {error}')
-            if current_message != last_message and send_message(
-                bot, current_message
-            ):
-                last_message = current_message
+def poll_tenant(
+    bot, tenant, scheduler=None, clock=SYSTEM_CLOCK, outbox=None
+):
+    """Опрашивает API для одного получателя и планирует следующий опрос."""
+    statuses, failure = None, None
+    try:
+        statuses = process_tenant(bot, tenant, outbox)
+    except Exception as error:
+        failure = error
+        report_error(
+            tenant, error,
+            lambda message: notify_tenant(bot, tenant, message)
+        )
+
+    if scheduler is not None:
+        reschedule(scheduler, tenant, statuses, failure, clock.time())
 
+
+def reschedule(scheduler, tenant, statuses, failure, now):
+    """Назначает следующий опрос получателя по исходу текущего."""
+    if failure is None:
+        next_at = scheduler.record_success(tenant, statuses, now)
+    else:
+        next_at = scheduler.record_error(
+            tenant, now, getattr(failure, 'retry_after', None),
+            error_policy(failure)
+        )
+    if next_at is None:
+        logger.critical(f'Опрос {tenant!r} остановлен: {failure}')
+        return None
+    logger.debug(f'Следующий опрос {tenant!r} через {next_at - now:.0f} с')
+    return next_at
+
+
+def build_tenants(path, store=None, dedup=None, clock=SYSTEM_CLOCK):
+    """Загружает реестр получателей или собирает одного из окружения."""
+    timestamp = int(clock.time())
+    if path:
+        if not TELEGRAM_TOKEN:
+            logger.critical('Отсутствуют переменные окружения: TELEGRAM_TOKEN')
+            raise ValueError('Необходимо установить переменные окружения.')
+        tenants = load_tenants(path, timestamp, store, dedup)
+    else:
+        check_tokens()
+        tenants = [
+            Tenant(
+                PRACTICUM_TOKEN, [TELEGRAM_CHAT_ID], timestamp, store, dedup
+            )
+        ]
+    logger.info(f'Загружено получателей: {len(tenants)}')
+    return tenants
+
+
+def is_rejected_token(error):
+    """Проверяет, отклонён ли токен Практикума или Telegram."""
+    return error_policy(error) is ErrorPolicy.STOP or getattr(
+        error, 'error_code', None
+    ) in (HTTPStatus.UNAUTHORIZED, HTTPStatus.NOT_FOUND)
+
+
+def check_practicum_token(headers):
+    """Проверяет токен Практикума запросом изменений с текущего момента."""
+    request_api(int(time.time()), headers)
+
+
+def preflight_tenants(tenants, bot):
+    """Проверяет токены до начала опроса и возвращает годных получателей.
+
+    Токены Практикума проверяются запросом к ENDPOINT, токен бота —
+    методом getMe, все одновременно. С отклонённым токеном бота опрос
+    не начинается. Получатели с отклонённым токеном Практикума
+    исключаются и получают сообщение об ошибке. Если токен проверить
+    не удалось, получатель остаётся: это решит первый опрос.
+    """
+    report = preflight.check_all({
+        ('telegram', TELEGRAM_TOKEN): bot.get_me,
+        **{
+            ('practicum', tenant.key): partial(
+                check_practicum_token, tenant.headers
+            )
+            for tenant in tenants
+        },
+    })
+    telegram = report[('telegram', TELEGRAM_TOKEN)]
+    if telegram.status is TokenStatus.INVALID:
+        logger.critical(f'Токен бота отклонён Telegram: {telegram.error}')
+        raise telegram.error
+    accepted, counts = [], dict.fromkeys(TokenStatus, 0)
+    for tenant in tenants:
+        result = report[('practicum', tenant.key)]
+        counts[result.status] += 1
+        if result.status is TokenStatus.INVALID:
+            logger.error(f'{tenant!r} исключён из опроса: {result.error}')
+            report_error(
+                tenant, result.error, partial(notify_tenant, bot, tenant)
+            )
+        else:
+            accepted.append(tenant)
+    summary = ', '.join(
+        f'{status.value} {count}' for status, count in counts.items()
+    )
+    logger.info(
+        f'Проверка токенов: {summary}; Telegram: {telegram.status.value}'
+    )
+    return accepted
+
+
+def catch_up_all(tenants, bot, outbox=None):
+    """Догоняет отставших получателей в пуле потоков до начала опроса."""
+    if not CATCH_UP:
+        return
+    poller = TenantPoller(
+        lambda tenant: catch_up_tenant(bot, tenant, outbox)
+    )
+    try:
+        poller.run_cycle(tenants)
+    finally:
+        poller.shutdown()
+
+
+def create_scheduler(
+    tenants, clock=SYSTEM_CLOCK, spread=POLL_SPREAD
+):
+    """Создаёт адаптивное расписание с первым опросом всех получателей.
+
+    Первые опросы разносятся по окну spread секунд (не больше периода):
+    сдвиг получателя зависит только от его токена, поэтому после
+    перезапуска каждый опрашивается в прежней точке окна. Окно сжато
+    до доли (n - 1) / n для n получателей: промежуток между опросами
+    остаётся около spread / n, а единственный получатель опрашивается
+    сразу.
+    """
+    tenants = list(tenants)
+    scheduler = PollScheduler(period=RETRY_PERIOD)
+    window = min(spread, RETRY_PERIOD) * (1 - 1 / max(len(tenants), 1))
+    now = clock.time()
+    for tenant in tenants:
+        scheduler.add(tenant, now, spread_offset(tenant.key, window))
+    return scheduler
+
+
+def run_schedule(
+    scheduler, run_cycle, clock=SYSTEM_CLOCK, until=None, stop=None
+):
+    """Проводит циклы опроса в моменты, назначенные расписанием.
+
+    Время и ожидание берутся из clock, поэтому с виртуальными часами
+    тот же цикл проигрывается без реального ожидания. Если задан until,
+    цикл завершается, когда следующий опрос назначен позже until.
+    Установка события stop прерывает ожидание и завершает цикл после
+    текущей итерации. Возвращает число проведённых циклов.
+    """
+    if stop is None:
+        stop = threading.Event()
+    cycles = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        run_cycle(scheduler.due(clock.time()))
+        metrics.CYCLE_DURATION.observe(time.perf_counter() - started)
+        cycles += 1
+        next_due = scheduler.next_due()
+        if next_due is None:
+            next_due = clock.time() + RETRY_PERIOD
+        if until is not None and next_due > until:
+            break
+        clock.wait(stop, max(next_due - clock.time(), MIN_WAIT))
+    return cycles
+
+
+def run_tenants(path, clock=SYSTEM_CLOCK):
+    """Опрашивает получателей в общем пуле потоков по расписанию.
+
+    Сообщения отправляются через очередь с ограничением частоты, поэтому
+    медленный Telegram не задерживает опрос API.
+    """
+    store = open_state_store()
+    dedup = DedupIndex()
+    bot = TeleBot(TELEGRAM_TOKEN)
+    tenants = preflight_tenants(build_tenants(path, store, dedup, clock), bot)
+    api_breaker.enabled = telegram_breaker.enabled = True
+    outbound = open_outbound(bot)
+    outbox = open_outbox(store, outbound)
+    catch_up_all(tenants, outbound, outbox)
+    scheduler = create_scheduler(tenants, clock)
+    poller = TenantPoller(
+        lambda tenant: poll_tenant(
+            outbound, tenant, scheduler, clock, outbox
+        )
+    )
+
+    def run_cycle(due):
+        poller.run_cycle(due)
+        flush_state(store, outbox)
+        logger.debug(f'Индекс отправленных статусов: {dedup.stats()}')
+        logger.debug(f'Очередь отправки: {outbound.stats()}')
+        if outbox is not None:
+            logger.debug(f'Outbox: {outbox.stats()}')
+        logger.debug(f'Условные запросы: {response_cache.stats()}')
+        logger.debug(
+            f'Выключатели: API {api_breaker.stats()}, '
+            f'Telegram {telegram_breaker.stats()}'
+        )
+
+    with GracefulShutdown() as shutdown:
+        try:
+            run_schedule(scheduler, run_cycle, clock, stop=shutdown.event)
         finally:
-            time.sleep(RETRY_PERIOD)
+            poller.shutdown()
+            if not outbound.close(SHUTDOWN_TIMEOUT):
+                logger.warning(
+                    f'Очередь отправки не опустела за {SHUTDOWN_TIMEOUT} с: '
+                    f'{outbound.stats()}'
+                )
+            close_state(store, outbox)
+    logger.info('Бот остановлен.')
+
+
+def run_once():
+    """Проводит один проход опрос → разбор → отправка и возвращает код выхода.
+
+    Курсор, отправленные статусы и последнее сообщение хранятся в
+    STATE_DB (по умолчанию homework.py.db), поэтому запуски из cron
+    продолжают друг друга и не повторяют уведомления и ошибки.
+    """
+    check_tokens()
+    store = StateStore(STATE_DB or ONCE_STATE_DB)
+    tenant = Tenant(
+        PRACTICUM_TOKEN, [TELEGRAM_CHAT_ID], int(time.time()), store
+    )
+    bot = TeleBot(TELEGRAM_TOKEN)
+    outbox = open_outbox(store, bot)
+    try:
+        process_tenant(bot, tenant, outbox)
+    except Exception as error:
+        report_error(
+            tenant, error, lambda message: notify_tenant(bot, tenant, message)
+        )
+        return 1
+    finally:
+        close_state(store, outbox)
+    return 0
+
+
+def check_async_settings():
+    """Отказывает в запуске asyncio-движка с режимами, которых в нём нет.
+
+    Потоковое чтение, outbox, догон, выключатели и hedging реализованы
+    только в синхронном цикле; молча игнорировать их нельзя.
+    """
+    unsupported = [
+        name for name, enabled in (
+            ('STREAM_RESPONSES', STREAM_RESPONSES),
+            ('OUTBOX', OUTBOX),
+            ('CATCH_UP', CATCH_UP),
+            ('CIRCUIT_BREAKER', CIRCUIT_BREAKER),
+            ('API_HEDGE_PERCENTILE', API_HEDGE_PERCENTILE > 0),
+        ) if enabled
+    ]
+    if unsupported:
+        logger.critical(
+            'Не поддерживаются с --engine=async: ' + ', '.join(unsupported)
+        )
+        raise ValueError('Необходимо отключить эти переменные окружения.')
+
+
+def run_async(path):
+    """Запускает опрос на asyncio-движке."""
+    import asyncio
+
+    from async_engine import AsyncEngine
+
+    check_async_settings()
+    store = open_state_store()
+    tenants = preflight_tenants(
+        build_tenants(path, store, DedupIndex()), TeleBot(TELEGRAM_TOKEN)
+    )
+    engine = AsyncEngine(
+        ENDPOINT, TELEGRAM_TOKEN, check_response, parse_status,
+        digests=error_digests, connect_timeout=API_CONNECT_TIMEOUT,
+        read_timeout=API_READ_TIMEOUT, retry_policy=retry_policy,
+        retry_budget=retry_budget, cache=response_cache
+    )
+    try:
+        asyncio.run(
+            serve_until_signal(engine, create_scheduler(tenants), store)
+        )
+    finally:
+        if store is not None:
+            store.close()
+    logger.info('Бот остановлен.')
+
+
+async def serve_until_signal(engine, scheduler, store=None):
+    """Опрашивает на asyncio-движке до сигнала SIGTERM или SIGINT."""
+    import asyncio
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in SIGNALS:
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        await engine.run_forever(scheduler, store, stop, SHUTDOWN_TIMEOUT)
+    finally:
+        for signum in SIGNALS:
+            loop.remove_signal_handler(signum)
+
+
+def parse_args():
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description='Бот-ассистент Практикума.')
+    parser.add_argument(
+        '--engine', choices=('sync', 'async'), default='sync',
+        help='движок цикла опроса'
+    )
+    parser.add_argument(
+        '--tenants', default=TENANTS_FILE,
+        help='JSON-реестр получателей (по умолчанию TENANTS_FILE)'
+    )
+    parser.add_argument(
+        '--adaptive', action='store_true',
+        help='адаптивное расписание опросов для получателя из окружения'
+    )
+    parser.add_argument(
+        '--once', action='store_true',
+        help='один проход опроса и выход, для запуска из cron'
+    )
+    parser.add_argument(
+        '--metrics-port', type=int, default=METRICS_PORT,
+        help='порт HTTP-эндпоинта /metrics (по умолчанию METRICS_PORT)'
+    )
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    setup_logging(
+        LOG_LEVEL,
+        # Разовому запуску файл лога нужен, только если он задан явно.
+        os.getenv('LOG_FILE') if args.once else LOG_FILE,
+        LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_WHEN
+    )
+    if args.metrics_port:
+        metrics.start_metrics_server(args.metrics_port)
+    if args.once:
+        raise SystemExit(run_once())
+    if args.engine == 'async':
+        run_async(args.tenants)
+    elif args.tenants or args.adaptive:
+        run_tenants(args.tenants)
+    else:
+        main()
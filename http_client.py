@@ -0,0 +1,106 @@
+"""HTTP-клиент с пулом keep-alive соединений для запросов к API."""
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+
+class ApiClient:
+    """Долгоживущий HTTP-клиент поверх requests.Session.
+
+    Соединения берутся из пула адаптера и переиспользуются между
+    запросами, поэтому повторный опрос не платит за DNS, TCP и TLS.
+    Сессия не хранит cookies, так что её можно разделять между потоками:
+    после создания общее состояние меняется только под блокировкой.
+    """
+
+    def __init__(
+        self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE
+    ):
+        """Создаёт сессию с адаптером пула соединений."""
+        self._lock = threading.Lock()
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        self._session = requests.Session()
+        self._session.cookies.set_policy(DefaultCookiePolicy(
+            allowed_domains=[]
+        ))
+        self._session.mount('https://', self._adapter)
+        self._session.mount('http://', self._adapter)
+        self._retired_requests = 0
+        self._retired_connections = 0
+        self._reconnects = 0
+
+    def get(self, url, **kwargs):
+        """Выполняет GET-запрос; после обрыва соединения сбрасывает пул.
+
+        Сам запрос не повторяется: повтор решает RetryPolicy вызывающего
+        кода, чтобы каждая попытка учитывалась в бюджете и метриках.
+        """
+        try:
+            return self._session.get(url, **kwargs)
+        except requests.exceptions.Timeout:
+            raise
+        except requests.exceptions.ConnectionError:
+            # Сервер мог закрыть простаивающее keep-alive соединение:
+            # следующая попытка не должна взять из пула другой такой же.
+            self.reset()
+            raise
+
+    def reset(self):
+        """Закрывает все соединения пула, сохраняя накопленную статистику."""
+        with self._lock:
+            requests_total, connections = self._pool_counters()
+            self._retired_requests += requests_total
+            self._retired_connections += connections
+            self._reconnects += 1
+            self._adapter.poolmanager.clear()
+
+    def close(self):
+        """Закрывает сессию и все её соединения."""
+        self._session.close()
+
+    def stats(self):
+        """Возвращает статистику переиспользования соединений."""
+        with self._lock:
+            requests_total, connections = self._pool_counters()
+            requests_total += self._retired_requests
+            connections += self._retired_connections
+            reconnects = self._reconnects
+        return {
+            'requests': requests_total,
+            'new_connections': connections,
+            'reused_connections': max(requests_total - connections, 0),
+            'reconnects': reconnects,
+        }
+
+    def _pool_counters(self):
+        pools = self._adapter.poolmanager.pools
+        requests_total = connections = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_total += pool.num_requests
+            connections += pool.num_connections
+        return requests_total, connections
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_client():
+    """Возвращает общий для процесса экземпляр ApiClient."""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = ApiClient()
+    return _shared_client
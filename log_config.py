@@ -0,0 +1,120 @@
+"""Неблокирующая запись логов с ротацией и сжатием старых файлов."""
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+import signal
+import sys
+from logging.handlers import (
+    QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+)
+
+LOG_FORMAT = (
+    '%(asctime)s - %(levelname)s - '
+    '%(filename)s:%(lineno)d - %(message)s'
+)
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+SAMPLE_RATE = 10
+SAMPLED_MESSAGES = ('Нет новых статусов для отправки.',)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает одну из rate повторяющихся записей с заданным текстом."""
+
+    def __init__(self, messages=SAMPLED_MESSAGES, rate=SAMPLE_RATE):
+        """Запоминает тексты, которые нужно прореживать."""
+        super().__init__()
+        self.rate = rate
+        self._skipped = dict.fromkeys(messages, 0)
+
+    def filter(self, record):
+        """Решает, попадёт ли запись в лог."""
+        skipped = self._skipped.get(record.msg)
+        if skipped is None:
+            return True
+        if skipped % self.rate:
+            self._skipped[record.msg] = skipped + 1
+            return False
+        self._skipped[record.msg] = 1
+        if skipped:
+            record.msg = f'{record.msg} (пропущено повторов: {skipped - 1})'
+        return True
+
+
+def gzip_namer(name):
+    """Добавляет расширение .gz к имени архивного файла лога."""
+    return f'{name}.gz'
+
+
+def gzip_rotator(source, dest):
+    """Сжимает закрытый файл лога и удаляет исходный."""
+    with open(source, 'rb') as log_file, gzip.open(dest, 'wb') as archive:
+        shutil.copyfileobj(log_file, archive)
+    os.remove(source)
+
+
+def create_file_handler(path, max_bytes, backup_count, when=None):
+    """Создаёт обработчик с ротацией по размеру или по времени."""
+    if when:
+        handler = TimedRotatingFileHandler(
+            path, when=when, backupCount=backup_count, encoding='UTF-8'
+        )
+    else:
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count,
+            encoding='UTF-8'
+        )
+    handler.namer = gzip_namer
+    handler.rotator = gzip_rotator
+    return handler
+
+
+def setup_logging(
+    level=logging.DEBUG, path=None, max_bytes=MAX_BYTES,
+    backup_count=BACKUP_COUNT, when=None
+):
+    """Настраивает логирование через очередь и фоновый поток записи.
+
+    Код опроса только кладёт запись в очередь, а вывод в stdout и в файл
+    выполняет поток QueueListener. Сигнал SIGUSR1 переключает уровень
+    между заданным и DEBUG (или INFO, если задан DEBUG) без перезапуска.
+    """
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if path:
+        handlers.append(
+            create_file_handler(path, max_bytes, backup_count, when)
+        )
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    queue_handler.addFilter(SamplingFilter())
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(
+            signal.SIGUSR1, toggle_level(logging.getLogger().level)
+        )
+    return listener
+
+
+def toggle_level(level):
+    """Возвращает обработчик сигнала, переключающий уровень логирования."""
+    other = logging.INFO if level == logging.DEBUG else logging.DEBUG
+
+    def handler(signum, frame):
+        root = logging.getLogger()
+        root.setLevel(other if root.level == level else level)
+        root.warning(
+            f'Уровень логирования: {logging.getLevelName(root.level)}'
+        )
+    return handler
@@ -0,0 +1,309 @@
+"""Метрики работы бота в текстовом формате Prometheus."""
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CYCLE_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300)
+
+
+def format_labels(labels):
+    """Оборачивает метки в фигурные скобки, если они есть."""
+    return f'{{{labels}}}' if labels else ''
+
+
+class Registry:
+    """Набор метрик, который отдаётся по HTTP."""
+
+    def __init__(self):
+        """Создаёт пустой реестр."""
+        self._metrics = []
+
+    def register(self, metric):
+        """Добавляет метрику в реестр и возвращает её."""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Собирает текст всех метрик в формате экспозиции Prometheus."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """Метрика с заранее созданными сериями для известных меток.
+
+    Серии для ожидаемых значений меток создаются при объявлении метрики,
+    поэтому на горячем пути выполняется только поиск в словаре без
+    выделения памяти. Новое значение метки заводит серию один раз.
+    """
+
+    kind = 'untyped'
+
+    def __init__(
+        self, name, documentation, label=None, values=(), registry=REGISTRY
+    ):
+        """Объявляет метрику с одной необязательной меткой."""
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._lock = threading.Lock()
+        self._series = {}
+        if label is None:
+            self._default = self._create(None)
+        else:
+            for value in values:
+                self._create(value)
+        registry.register(self)
+
+    def labels(self, value):
+        """Возвращает серию для значения метки."""
+        series = self._series.get(value)
+        if series is None:
+            with self._lock:
+                series = self._series.get(value) or self._create(value)
+        return series
+
+    def samples(self):
+        """Возвращает строки с текущими значениями серий."""
+        lines = []
+        for value, series in list(self._series.items()):
+            labels = '' if value is None else f'{self.label}="{value}"'
+            lines.extend(series.samples(self.name, labels))
+        return lines
+
+    def _create(self, value):
+        series = self._series[value] = self.series_class()
+        return series
+
+
+class CounterSeries:
+    """Монотонно растущий счётчик."""
+
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        """Создаёт счётчик с нулевым значением."""
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Увеличивает счётчик."""
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        """Возвращает строку со значением счётчика."""
+        return [f'{name}_total{format_labels(labels)} {self.value}']
+
+
+class GaugeSeries:
+    """Значение, которое может расти и убывать или вычисляться."""
+
+    __slots__ = ('value', 'function')
+
+    def __init__(self):
+        """Создаёт нулевое значение."""
+        self.value = 0
+        self.function = None
+
+    def set(self, value):
+        """Устанавливает значение."""
+        self.value = value
+
+    def set_function(self, function):
+        """Вычисляет значение вызовом function при каждом сборе."""
+        self.function = function
+
+    def samples(self, name, labels):
+        """Возвращает строку с текущим значением."""
+        value = self.value if self.function is None else self.function()
+        return [f'{name}{format_labels(labels)} {value}']
+
+
+class HistogramSeries:
+    """Распределение наблюдений по фиксированным корзинам."""
+
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+
+    def __init__(self, buckets):
+        """Создаёт пустые корзины."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Добавляет наблюдение."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def samples(self, name, labels):
+        """Возвращает накопительные корзины, сумму и количество."""
+        prefix = f'{labels},' if labels else ''
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {total}')
+        total += self.counts[-1]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {total}')
+        lines.append(f'{name}_sum{format_labels(labels)} {self.sum}')
+        lines.append(f'{name}_count{format_labels(labels)} {total}')
+        return lines
+
+
+class Counter(Metric):
+    """Счётчик событий."""
+
+    kind = 'counter'
+    series_class = CounterSeries
+
+    def inc(self, amount=1):
+        """Увеличивает счётчик без метки."""
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    """Текущее значение."""
+
+    kind = 'gauge'
+    series_class = GaugeSeries
+
+    def set(self, value):
+        """Устанавливает значение без метки."""
+        self._default.set(value)
+
+    def set_function(self, function):
+        """Вычисляет значение без метки при каждом сборе."""
+        self._default.set_function(function)
+
+
+class Histogram(Metric):
+    """Распределение длительностей."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS, **kwargs):
+        """Объявляет гистограмму с заданными границами корзин."""
+        self.bucket_bounds = tuple(buckets)
+        super().__init__(name, documentation, **kwargs)
+
+    def series_class(self):
+        """Создаёт серию с корзинами этой гистограммы."""
+        return HistogramSeries(self.bucket_bounds)
+
+    def observe(self, value):
+        """Добавляет наблюдение без метки."""
+        self._default.observe(value)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдаёт метрики реестра по GET /metrics."""
+
+    registry = REGISTRY
+
+    def do_GET(self):
+        """Отвечает текстом метрик или 404."""
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Не пишет каждый запрос метрик в лог."""
+
+
+def start_metrics_server(port, host='127.0.0.1'):
+    """Запускает HTTP-сервер метрик в фоновом потоке."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name='metrics-server', daemon=True
+    ).start()
+    return server
+
+
+API_LATENCY = Histogram(
+    'homework_api_request_seconds', 'Длительность запроса к API Практикума.'
+)
+API_RESPONSES = Counter(
+    'homework_api_responses', 'Ответы API Практикума по коду статуса.',
+    label='code', values=(200, 304, 401, 429, 500, 502, 503, 'error')
+)
+API_ATTEMPTS = Counter(
+    'homework_api_attempts', 'Попытки запроса к API: первые, повторы, дубли.',
+    label='kind', values=('first', 'retry', 'hedge')
+)
+API_HEDGE_WINS = Counter(
+    'homework_api_hedge_wins', 'Запросы, на которые первым ответил дубль.'
+)
+API_SKIPPED = Counter(
+    'homework_api_skipped_responses',
+    'Ответы API, не потребовавшие разбора: 304 Not Modified.',
+    label='reason', values=('not_modified',)
+)
+API_BYTES_SAVED = Counter(
+    'homework_api_bytes_saved',
+    'Байты тела ответа, не переданные благодаря 304 или сжатию.',
+    label='reason', values=('not_modified', 'compression')
+)
+CHECK_FAILURES = Counter(
+    'homework_check_response_failures',
+    'Ответы API, не прошедшие проверку check_response.',
+    label='error', values=('TypeError', 'KeyError')
+)
+PARSE_OUTCOMES = Counter(
+    'homework_parse_status', 'Результаты parse_status по вердикту.',
+    label='verdict',
+    values=('approved', 'reviewing', 'rejected', 'unknown', 'invalid')
+)
+SEND_LATENCY = Histogram(
+    'homework_send_message_seconds', 'Длительность отправки в Telegram.'
+)
+SEND_FAILURES = Counter(
+    'homework_send_message_failures', 'Неудачные отправки в Telegram.'
+)
+OUTBOX_DEPTH = Gauge(
+    'homework_outbox_depth', 'Недоставленные сообщения в outbox.'
+)
+CYCLE_DURATION = Histogram(
+    'homework_loop_cycle_seconds', 'Длительность цикла опроса.',
+    buckets=CYCLE_BUCKETS
+)
+CIRCUIT_STATE = Gauge(
+    'homework_circuit_state',
+    'Состояние выключателя: 0 — closed, 1 — half_open, 2 — open.',
+    label='dependency', values=('api', 'telegram')
+)
+CIRCUIT_REJECTED = Counter(
+    'homework_circuit_rejected', 'Вызовы, пропущенные выключателем.',
+    label='dependency', values=('api', 'telegram')
+)
+LAST_SUCCESS = Gauge(
+    'homework_seconds_since_last_success',
+    'Секунд с последнего успешного опроса API.'
+)
+_last_success = [time.time()]
+LAST_SUCCESS.set_function(lambda: round(time.time() - _last_success[0], 3))
+
+
+def mark_poll_success():
+    """Отмечает время успешного опроса API."""
+    _last_success[0] = time.time()
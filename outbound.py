@@ -0,0 +1,304 @@
+"""Очередь исходящих сообщений Telegram с ограничением частоты."""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+
+GLOBAL_RATE = 30
+CHAT_RATE = 1
+COALESCE_WINDOW = 1.0
+WORKERS = 3
+MAX_RETRIES = 5
+RETRY_BACKOFF = 1.0
+MAX_BACKOFF = 300
+MIN_RETRY_DELAY = 0.5
+MESSAGE_LIMIT = 4096
+SEPARATOR = '\n\n'
+
+logger = logging.getLogger(__name__)
+
+
+def get_retry_after(error):
+    """Достаёт паузу из ответа 429 Telegram Bot API, если она есть."""
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is not None:
+        return retry_after
+    if getattr(error, 'error_code', None) != 429:
+        return None
+    result = getattr(error, 'result_json', None) or {}
+    return result.get('parameters', {}).get('retry_after', 1)
+
+
+def is_permanent(error):
+    """Проверяет, отклонил ли Telegram само сообщение (4xx, кроме 429)."""
+    error_code = getattr(error, 'error_code', None)
+    return (
+        error_code is not None
+        and HTTPStatus.BAD_REQUEST <= error_code
+        < HTTPStatus.INTERNAL_SERVER_ERROR
+        and error_code != HTTPStatus.TOO_MANY_REQUESTS
+    )
+
+
+class TokenBucket:
+    """Ведро токенов: rate событий в секунду с запасом capacity."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity, now):
+        """Создаёт полное ведро."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def reserve(self, now):
+        """Резервирует токен и возвращает, сколько секунд нужно подождать."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.tokens -= 1
+        return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def is_full(self, now):
+        """Проверяет, восстановилось ли ведро полностью."""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class OutboundQueue:
+    """Развязывает опрос API и отправку сообщений в Telegram.
+
+    Сообщения одного чата, поставленные в очередь в пределах
+    coalesce_window, отправляются одним сообщением. Частота отправки
+    ограничена ведрами токенов на каждый чат и на всего бота. Ответ 429
+    откладывает чат на retry_after секунд. Сбои Telegram повторяются
+    с экспоненциальной паузой до max_backoff секунд, пока сообщение не
+    уйдёт: опрос уже сдвинул курсор и повторно статус не запросит.
+    Отбрасываются после max_retries попыток только сообщения, которые
+    Telegram отклонил (4xx), и недоставленные при закрытии очереди.
+    Метод send_message совместим с TeleBot.send_message, поэтому
+    очередь можно передавать вместо бота. Метод send_now отправляет
+    сразу, но в пределах тех же ведер токенов.
+    """
+
+    def __init__(
+        self, send, workers=WORKERS, global_rate=GLOBAL_RATE,
+        chat_rate=CHAT_RATE, coalesce_window=COALESCE_WINDOW,
+        max_retries=MAX_RETRIES, retry_backoff=RETRY_BACKOFF,
+        max_backoff=MAX_BACKOFF, clock=time.monotonic, sleep=time.sleep
+    ):
+        """Запускает потоки отправки; send(chat_id, text) шлёт сообщение."""
+        self._send = send
+        self.chat_rate = chat_rate
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._sleep = sleep
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._ready = []
+        self._order = itertools.count()
+        self._attempts = {}
+        self._buckets = {}
+        self._global_bucket = TokenBucket(global_rate, global_rate, clock())
+        self._closing = False
+        self._depth = 0
+        self._in_flight = 0
+        self._counters = dict.fromkeys(
+            ('queued', 'sent', 'delivered', 'coalesced', 'retries',
+             'throttled', 'dropped'), 0
+        )
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._workers = [
+            threading.Thread(
+                target=self._work, name=f'telegram-sender-{number}',
+                daemon=True
+            )
+            for number in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def send_message(self, chat_id, text):
+        """Ставит сообщение в очередь отправки чата."""
+        now = self._clock()
+        with self._cond:
+            if self._closing:
+                raise RuntimeError('Очередь отправки закрыта')
+            pending = self._pending.setdefault(chat_id, deque())
+            pending.append((text, now))
+            self._depth += 1
+            self._counters['queued'] += 1
+            if chat_id not in self._attempts:
+                self._attempts[chat_id] = 0
+                self._schedule(chat_id, now + self.coalesce_window)
+                self._cond.notify()
+
+    def send_now(self, chat_id, text):
+        """Отправляет сообщение в вызывающем потоке, соблюдая лимиты.
+
+        Ждёт токенов чата и бота наравне с потоками очереди, ошибка
+        отправки достаётся вызывающему коду: повторами управляет он.
+        """
+        with self._cond:
+            delay = self._reserve(chat_id, self._clock())
+        if delay:
+            self._sleep(delay)
+        self._send(chat_id, text)
+
+    def stats(self):
+        """Возвращает глубину очереди, счётчики и задержку доставки."""
+        with self._cond:
+            delivered = self._counters['delivered']
+            return {
+                'depth': self._depth,
+                'in_flight': self._in_flight,
+                **self._counters,
+                'latency_avg': (
+                    self._latency_total / delivered if delivered else 0.0
+                ),
+                'latency_max': self._latency_max,
+            }
+
+    def close(self, timeout=None):
+        """Отправляет накопленные сообщения и останавливает потоки.
+
+        Возвращает True, если очередь опустела до истечения timeout.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join(
+                None if deadline is None
+                else max(deadline - self._clock(), 0)
+            )
+        with self._cond:
+            return self._depth == 0 and self._in_flight == 0
+
+    def _schedule(self, chat_id, due):
+        heapq.heappush(self._ready, (due, next(self._order), chat_id))
+
+    def _next_chat(self):
+        with self._cond:
+            while True:
+                now = self._clock()
+                if self._ready and self._ready[0][0] <= now:
+                    _, _, chat_id = heapq.heappop(self._ready)
+                    batch = self._take_batch(chat_id)
+                    self._in_flight += 1
+                    return chat_id, batch, self._reserve(chat_id, now)
+                if self._closing and not self._ready:
+                    return None
+                self._cond.wait(
+                    self._ready[0][0] - now if self._ready else None
+                )
+
+    def _take_batch(self, chat_id):
+        pending = self._pending[chat_id]
+        batch = [pending.popleft()]
+        size = len(batch[0][0])
+        while pending and (
+            size + len(SEPARATOR) + len(pending[0][0]) <= MESSAGE_LIMIT
+        ):
+            size += len(SEPARATOR) + len(pending[0][0])
+            batch.append(pending.popleft())
+        self._depth -= len(batch)
+        return batch
+
+    def _reserve(self, chat_id, now):
+        if len(self._buckets) > 2 * len(self._pending) + 100:
+            self._buckets = {
+                chat: bucket for chat, bucket in self._buckets.items()
+                if chat in self._pending or not bucket.is_full(now)
+            }
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(
+                self.chat_rate, 1, now
+            )
+        return max(bucket.reserve(now), self._global_bucket.reserve(now))
+
+    def _work(self):
+        while True:
+            task = self._next_chat()
+            if task is None:
+                return
+            chat_id, batch, delay = task
+            if delay:
+                self._sleep(delay)
+            try:
+                self._send(chat_id, SEPARATOR.join(text for text, _ in batch))
+            except Exception as error:
+                self._failed(chat_id, batch, error)
+            else:
+                self._delivered(chat_id, batch)
+
+    def _delivered(self, chat_id, batch):
+        now = self._clock()
+        latency = now - batch[0][1]
+        logger.debug(
+            f'Отправлено сообщений в чат {chat_id}: {len(batch)}, '
+            f'задержка {latency:.2f} с'
+        )
+        with self._cond:
+            self._in_flight -= 1
+            self._counters['sent'] += 1
+            self._counters['delivered'] += len(batch)
+            self._counters['coalesced'] += len(batch) - 1
+            self._latency_total += latency * len(batch)
+            self._latency_max = max(self._latency_max, latency)
+            self._attempts[chat_id] = 0
+            self._finish(chat_id, now + self.coalesce_window)
+
+    def _failed(self, chat_id, batch, error):
+        now = self._clock()
+        retry_after = get_retry_after(error)
+        with self._cond:
+            self._in_flight -= 1
+            attempts = self._attempts[chat_id] = self._attempts[chat_id] + 1
+            if retry_after is None and attempts > self.max_retries and (
+                self._closing or is_permanent(error)
+            ):
+                logger.error(
+                    f'Сообщение в чат {chat_id} не отправлено после '
+                    f'{attempts} попыток: {error}'
+                )
+                self._counters['dropped'] += len(batch)
+                self._attempts[chat_id] = 0
+                self._finish(chat_id, now)
+                return
+            if retry_after is None:
+                delay = min(
+                    self.retry_backoff * 2 ** min(attempts - 1, 16),
+                    self.max_backoff
+                )
+                self._counters['retries'] += 1
+            else:
+                # Полуоткрытый выключатель отклоняет вызов с retry_after=0:
+                # без нижней границы потоки отправки крутились бы впустую.
+                delay = max(retry_after, MIN_RETRY_DELAY)
+                self._counters['throttled'] += 1
+            logger.warning(
+                f'Повтор отправки в чат {chat_id} через {delay} с: {error}'
+            )
+            self._pending[chat_id].extendleft(reversed(batch))
+            self._depth += len(batch)
+            self._schedule(chat_id, now + delay)
+            self._cond.notify()
+
+    def _finish(self, chat_id, due):
+        if self._pending[chat_id]:
+            self._schedule(chat_id, due)
+            self._cond.notify()
+            return
+        del self._pending[chat_id]
+        del self._attempts[chat_id]
@@ -0,0 +1,196 @@
+"""Доставка уведомлений из постоянной исходящей очереди хранилища."""
+import hashlib
+import logging
+import threading
+import time
+
+from outbound import get_retry_after, is_permanent
+
+INTERVAL = 1.0
+BATCH_SIZE = 100
+MAX_RETRIES = 5
+RETRY_BACKOFF = 1.0
+MAX_BACKOFF = 300
+RETENTION = 7 * 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+def idempotency_key(tenant, chat_id, cursor, message):
+    """Возвращает ключ сообщения: получатель, чат, курсор пачки и текст.
+
+    Курсор отличает новое изменение с прежним текстом (повторное
+    «Работа взята на проверку») от повторной записи той же пачки.
+    """
+    return hashlib.blake2b(
+        f'{tenant}\0{chat_id}\0{cursor}\0{message}'.encode(),
+        digest_size=16
+    ).hexdigest()
+
+
+class OutboxDrainer:
+    """Фоновая доставка сообщений из таблицы outbox в Telegram.
+
+    Проход идёт кругами: за круг каждый чат отправляет своё самое
+    раннее сообщение. Поэтому сообщения чата уходят строго по порядку,
+    а чат с длинной очередью или отложенный чат не задерживает другие.
+    Сбой Telegram откладывает чат с экспоненциальной паузой до
+    max_backoff секунд или на retry_after из ответа 429 и повторяется,
+    пока не пройдёт. Сообщение, которое Telegram отклонил (4xx), после
+    max_retries попыток отбрасывается. Доставленные сообщения
+    отмечаются одной транзакцией в конце круга, поэтому после падения
+    процесса повторно уходят не больше batch_size сообщений.
+    """
+
+    def __init__(
+        self, store, send, interval=INTERVAL, batch_size=BATCH_SIZE,
+        max_retries=MAX_RETRIES, retry_backoff=RETRY_BACKOFF,
+        max_backoff=MAX_BACKOFF, retention=RETENTION, clock=time.time,
+        start=True
+    ):
+        """Запоминает хранилище и send(chat_id, text), запускает поток."""
+        self._store = store
+        self._send = send
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.retention = retention
+        self._clock = clock
+        self._attempts = {}
+        self._retry_at = {}
+        self._pruned_at = 0.0
+        self._counters = dict.fromkeys(
+            ('enqueued', 'delivered', 'retries', 'dropped'), 0
+        )
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='outbox-drainer', daemon=True
+        )
+        if start:
+            self._thread.start()
+
+    def enqueue(self, tenant, chat_ids, message, cursor=None):
+        """Записывает сообщение для всех чатов получателя в outbox.
+
+        cursor — курсор, с которого запрошена пачка с этим изменением.
+        Сообщение сохраняется вместе с остальными изменениями
+        ближайшим flush() хранилища. Возвращает True, чтобы
+        использоваться вместо отправки.
+        """
+        now = self._clock()
+        for chat_id in chat_ids:
+            self._store.enqueue_message(
+                idempotency_key(tenant, chat_id, cursor, message), chat_id,
+                message, now
+            )
+        with self._lock:
+            self._counters['enqueued'] += len(chat_ids)
+        return True
+
+    def wake(self):
+        """Запускает проход, не дожидаясь interval."""
+        self._wake.set()
+
+    def drain(self):
+        """Проводит один проход по очереди и возвращает число доставленных.
+
+        Круги повторяются, пока в них что-то доставляется, но за проход
+        уходит не больше batch_size сообщений.
+        """
+        now = self._clock()
+        blocked = {
+            chat_id for chat_id, retry_at in self._retry_at.items()
+            if retry_at > now
+        }
+        delivered = 0
+        while delivered < self.batch_size:
+            sent = self._drain_round(
+                now, blocked, self.batch_size - delivered
+            )
+            if not sent:
+                break
+            delivered += sent
+        with self._lock:
+            self._counters['delivered'] += delivered
+        if now - self._pruned_at >= self.retention / 24:
+            self._store.prune_outbox(now - self.retention)
+            self._pruned_at = now
+        return delivered
+
+    def stats(self):
+        """Возвращает глубину очереди и счётчики доставки."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {'depth': self._store.outbox_depth(), **counters}
+
+    def close(self, timeout=None):
+        """Проводит последний проход и останавливает поток.
+
+        Недоставленные сообщения остаются в хранилище до следующего
+        запуска. Возвращает True, если поток завершился за timeout.
+        """
+        self._closing.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _run(self):
+        while True:
+            closing = self._closing.is_set()
+            try:
+                self.drain()
+            except Exception as error:
+                logger.error(f'Сбой доставки из outbox: {error}')
+            if closing:
+                return
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _drain_round(self, now, blocked, limit):
+        delivered = 0
+        for message_id, chat_id, message in self._store.load_outbox(
+            limit, blocked
+        ):
+            try:
+                self._send(chat_id, message)
+            except Exception as error:
+                blocked.add(chat_id)
+                self._failed(message_id, chat_id, error, now)
+                continue
+            self._store.mark_delivered(message_id, now)
+            self._attempts.pop(message_id, None)
+            self._retry_at.pop(chat_id, None)
+            delivered += 1
+        self._store.flush()
+        return delivered
+
+    def _failed(self, message_id, chat_id, error, now):
+        attempts = self._attempts[message_id] = (
+            self._attempts.get(message_id, 0) + 1
+        )
+        if is_permanent(error) and attempts >= self.max_retries:
+            logger.error(
+                f'Сообщение в чат {chat_id} отброшено после {attempts} '
+                f'попыток: {error}'
+            )
+            self._store.mark_delivered(message_id, now)
+            del self._attempts[message_id]
+            with self._lock:
+                self._counters['dropped'] += 1
+            return
+        delay = get_retry_after(error)
+        if delay is None:
+            delay = min(
+                self.retry_backoff * 2 ** (attempts - 1), self.max_backoff
+            )
+        self._retry_at[chat_id] = now + delay
+        with self._lock:
+            self._counters['retries'] += 1
+        logger.warning(
+            f'Повтор отправки в чат {chat_id} через {delay} с: {error}'
+        )
@@ -0,0 +1,106 @@
+"""Предварительная проверка токенов до начала опроса."""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from enum import Enum
+
+PREFLIGHT_TTL = 60 * 60
+PREFLIGHT_TIMEOUT = 15
+MAX_WORKERS = 16
+
+
+class TokenStatus(Enum):
+    """Итог проверки токена."""
+
+    VALID = 'valid'
+    INVALID = 'invalid'
+    UNKNOWN = 'unknown'
+
+
+class TokenCheck:
+    """Результат проверки одного токена и время, когда он получен."""
+
+    __slots__ = ('status', 'error', 'checked_at')
+
+    def __init__(self, status, error=None, checked_at=0.0):
+        """Запоминает итог проверки и ошибку, если она была."""
+        self.status = status
+        self.error = error
+        self.checked_at = checked_at
+
+    def __repr__(self):
+        """Показывает итог проверки в логах."""
+        return f'TokenCheck({self.status.value}, {self.error!r})'
+
+
+class Preflight:
+    """Параллельная проверка токенов с кэшем результатов на ttl секунд.
+
+    Проверка — вызываемый объект без аргументов: вернул управление —
+    токен действителен, выбросил исключение, для которого is_invalid
+    истинно, — токен отклонён. Остальные ошибки и проверки, не
+    успевшие за timeout, дают UNKNOWN: по сбою сети или сервиса
+    получателя исключать нельзя, и такие итоги не кэшируются.
+    """
+
+    def __init__(
+        self, is_invalid, ttl=PREFLIGHT_TTL, timeout=PREFLIGHT_TIMEOUT,
+        max_workers=MAX_WORKERS, clock=time.monotonic
+    ):
+        """Задаёт признак отклонённого токена, срок кэша и таймаут."""
+        self.is_invalid = is_invalid
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._clock = clock
+        self._cache = {}
+
+    def check_all(self, probes):
+        """Проверяет токены параллельно и возвращает итоги по ключам.
+
+        probes сопоставляет ключу токена его проверку. Свежие итоги
+        берутся из кэша, остальные проверки выполняются одновременно,
+        и все вместе ждут не дольше timeout.
+        """
+        now = self._clock()
+        report, pending = {}, {}
+        for key, probe in probes.items():
+            cached = self._cache.get(key)
+            if cached is not None and now - cached.checked_at < self.ttl:
+                report[key] = cached
+            else:
+                pending[key] = probe
+        if not pending:
+            return report
+        executor = ThreadPoolExecutor(
+            min(self.max_workers, len(pending)),
+            thread_name_prefix='preflight'
+        )
+        futures = {
+            key: executor.submit(self._run, probe)
+            for key, probe in pending.items()
+        }
+        wait(futures.values(), self.timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+        for key, future in futures.items():
+            if future.done() and not future.cancelled():
+                result = future.result()
+            else:
+                result = TokenCheck(
+                    TokenStatus.UNKNOWN,
+                    TimeoutError(f'Проверка не уложилась в {self.timeout} с')
+                )
+            if result.status is not TokenStatus.UNKNOWN:
+                self._cache[key] = result
+            report[key] = result
+        return report
+
+    def _run(self, probe):
+        try:
+            probe()
+        except Exception as error:
+            status = (
+                TokenStatus.INVALID if self.is_invalid(error)
+                else TokenStatus.UNKNOWN
+            )
+            return TokenCheck(status, error, self._clock())
+        return TokenCheck(TokenStatus.VALID, checked_at=self._clock())
@@ -0,0 +1,94 @@
+"""Компактные записи о домашних работах из ответа API."""
+import sys
+from enum import Enum
+
+from exceptions import (
+    ResponseKeyError, ResponseTypeError, UnknownStatusError
+)
+
+
+class Status(str, Enum):
+    """Документированный статус работы.
+
+    Члены перечисления — строки, поэтому ими можно обращаться к словарям
+    со строковыми ключами (HOMEWORK_VERDICTS) и сравнивать со статусами
+    из API. Каждый статус существует в единственном экземпляре.
+    """
+
+    APPROVED = 'approved'
+    REVIEWING = 'reviewing'
+    REJECTED = 'rejected'
+
+    def __str__(self):
+        """Возвращает статус так, как его пишет API."""
+        return self.value
+
+
+STATUSES = {status.value: status for status in Status}
+
+
+class Homework:
+    """Запись о работе: только поля, которые нужны боту.
+
+    Вместо словаря из ответа API со всеми ключами хранит четыре слота,
+    название работы интернируется: его повторы в истории одной работы
+    занимают память один раз.
+    """
+
+    __slots__ = ('id', 'name', 'status', 'date_updated')
+
+    def __init__(self, id, name, status, date_updated=''):
+        """Заполняет поля записи."""
+        self.id = id
+        self.name = name
+        self.status = status
+        self.date_updated = date_updated
+
+    @classmethod
+    def from_dict(cls, homework):
+        """Проверяет работу из ответа API за один проход и строит запись."""
+        if not isinstance(homework, dict):
+            raise ResponseTypeError('Элемент homeworks должен быть словарем')
+        name = homework.get('homework_name')
+        status = homework.get('status')
+        if name is None or status is None:
+            raise ResponseKeyError('Нет ключа homework_name или status в API')
+        status = STATUSES.get(status)
+        if status is None:
+            raise UnknownStatusError('Неожиданный статус домашней работы')
+        return cls(
+            homework.get('id'),
+            sys.intern(name) if type(name) is str else name,
+            status, homework.get('date_updated', '')
+        )
+
+    @property
+    def key(self):
+        """Возвращает идентификатор работы для дедупликации."""
+        return self.name if self.id is None else self.id
+
+    def __eq__(self, other):
+        """Сравнивает записи по всем полям."""
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return (
+            self.id, self.name, self.status, self.date_updated
+        ) == (other.id, other.name, other.status, other.date_updated)
+
+    __hash__ = None
+
+    def __repr__(self):
+        """Показывает запись в логах."""
+        return f'Homework({self.key!r}, {self.status}, {self.date_updated})'
+
+
+def parse_homeworks(homeworks):
+    """Проверяет список homeworks и строит записи за один проход.
+
+    Ошибки совпадают с check_response и parse_status: не список или
+    не словарь в списке — TypeError, нет названия или статуса —
+    KeyError, недокументированный статус — UnknownStatusError.
+    """
+    if not isinstance(homeworks, list):
+        raise ResponseTypeError('Ключ homeworks должен быть списком')
+    return [Homework.from_dict(homework) for homework in homeworks]
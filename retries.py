@@ -0,0 +1,187 @@
+"""Повторы и дублирующие запросы к API в пределах одного цикла опроса."""
+import random
+import threading
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+)
+
+RETRIES = 1
+BACKOFF = 0.5
+MAX_BACKOFF = 5.0
+BUDGET_RATIO = 0.2
+BUDGET_MIN = 10
+LATENCY_WINDOW = 256
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05
+
+
+class RetryPolicy:
+    """Ограниченные повторы с экспоненциальной паузой и полным разбросом.
+
+    Пауза перед n-м повтором выбирается случайно из [0, backoff * 2**(n-1)],
+    но не больше max_backoff, чтобы повторы многих клиентов не совпадали.
+    """
+
+    def __init__(
+        self, retries=RETRIES, backoff=BACKOFF, max_backoff=MAX_BACKOFF,
+        seed=None
+    ):
+        """Задаёт число повторов и параметры паузы."""
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._random = random.Random(seed)
+
+    def delay(self, attempt):
+        """Возвращает паузу перед повтором номер attempt."""
+        ceiling = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return self._random.uniform(0, ceiling)
+
+
+class RetryBudget:
+    """Бюджет повторов: не больше ratio дополнительных запросов на основной.
+
+    Каждый основной запрос пополняет бюджет на ratio, повтор или
+    дублирующий запрос тратит единицу. Когда API недоступен, повторы
+    быстро исчерпывают бюджет и не умножают нагрузку на него.
+    """
+
+    def __init__(self, ratio=BUDGET_RATIO, minimum=BUDGET_MIN):
+        """Создаёт бюджет с начальным запасом minimum."""
+        self.ratio = ratio
+        self.capacity = minimum
+        self._tokens = float(minimum)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """Учитывает основной запрос."""
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.capacity)
+
+    def withdraw(self):
+        """Пытается потратить единицу бюджета на повтор."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class LatencyTracker:
+    """Скользящее окно длительностей успешных запросов."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        """Создаёт окно на window последних замеров."""
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Возвращает число замеров в окне."""
+        return len(self._samples)
+
+    def add(self, seconds):
+        """Добавляет замер."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction):
+        """Возвращает перцентиль окна или None, если замеров нет."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class Hedger:
+    """Дублирует медленный запрос, если он дольше перцентиля задержек.
+
+    Первая попытка запускается сразу. Если за hedge_delay ответа нет,
+    запускается вторая, и используется ответ той, что завершилась
+    раньше. Ответ проигравшей попытки передаётся в discard, чтобы
+    освободить соединение. Первая попытка не ждёт очереди пула: без
+    статистики задержек она выполняется в потоке вызывающего, иначе
+    в собственном потоке, чтобы вызывающий мог забрать ответ дубля.
+    Пул max_workers ограничивает только дубли.
+    """
+
+    def __init__(
+        self, percentile, tracker=None, budget=None, max_workers=4,
+        min_samples=HEDGE_MIN_SAMPLES, min_delay=HEDGE_MIN_DELAY
+    ):
+        """Задаёт перцентиль задержки, после которого запрос дублируется."""
+        self.fraction = percentile
+        self.tracker = tracker or LatencyTracker()
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='api-hedge'
+        )
+
+    def hedge_delay(self):
+        """Возвращает задержку до дублирования или None без статистики."""
+        if len(self.tracker) < self.min_samples:
+            return None
+        return max(self.tracker.percentile(self.fraction), self.min_delay)
+
+    def call(self, attempt, on_hedge=None, discard=None):
+        """Выполняет attempt() и при задержке дублирует его.
+
+        Возвращает результат и признак того, что победил дубль. Если
+        первой завершилась попытка с ошибкой, а вторая ещё идёт,
+        дожидается второй. Исключение пробрасывается, только когда
+        обе попытки завершились ошибкой.
+        """
+        delay = self.hedge_delay()
+        if delay is None:
+            return attempt(), False
+        first = self._start(attempt)
+        done, _ = wait([first], timeout=delay)
+        if done or (self.budget is not None and not self.budget.withdraw()):
+            return first.result(), False
+        if on_hedge is not None:
+            on_hedge()
+        second = self._executor.submit(attempt)
+        pending = {first, second}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [
+                future for future in done if future.exception() is None
+            ]
+            if succeeded or not pending:
+                winner = (succeeded or list(done))[0]
+                self._discard_rest({first, second} - {winner}, discard)
+                return winner.result(), winner is second
+
+    def shutdown(self):
+        """Останавливает потоки дублирующих запросов."""
+        self._executor.shutdown(wait=False)
+
+    @staticmethod
+    def _start(attempt):
+        future = Future()
+
+        def run():
+            future.set_running_or_notify_cancel()
+            try:
+                result = attempt()
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        threading.Thread(target=run, name='api-attempt', daemon=True).start()
+        return future
+
+    @staticmethod
+    def _discard_rest(pending, discard):
+        if discard is None:
+            return
+        for future in pending:
+            future.add_done_callback(
+                lambda late: late.exception() is None and discard(
+                    late.result()
+                )
+            )
@@ -0,0 +1,193 @@
+"""Адаптивное расписание опросов API для каждого получателя."""
+import hashlib
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from exceptions import ErrorPolicy
+from timing_wheel import TimingWheel
+
+POLL_PERIOD = 600
+REVIEWING_PERIOD = 120
+ERROR_PERIOD = 60
+RETRY_SOON_PERIOD = 10
+MAX_PERIOD = 3600
+IDLE_CYCLES = 6
+JITTER = 0.1
+
+
+def parse_retry_after(value, now=None):
+    """Переводит заголовок Retry-After в число секунд ожидания."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at - (time.time() if now is None else now), 0)
+
+
+def spread_offset(name, window):
+    """Возвращает постоянный для name сдвиг первого опроса в [0, window)."""
+    if window <= 0:
+        return 0
+    digest = hashlib.blake2b(str(name).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / 2 ** 64 * window
+
+
+class PollState:
+    """Состояние расписания одного получателя."""
+
+    __slots__ = (
+        'next_at', 'interval', 'idle', 'errors', 'reviewing', 'phase'
+    )
+
+    def __init__(self, next_at, phase=0.5):
+        """Назначает первый опрос на next_at."""
+        self.next_at = next_at
+        self.phase = phase
+        self.interval = 0
+        self.idle = 0
+        self.errors = 0
+        self.reviewing = set()
+
+
+class PollScheduler:
+    """Подбирает интервал опроса по состоянию работ и ошибкам.
+
+    Пока хотя бы одна работа на ревью, API опрашивается чаще; статус
+    каждой работы берётся из её последнего изменения. После серии пустых
+    ответов и при ошибках интервал растёт экспоненциально до MAX_PERIOD,
+    заголовок Retry-After задаёт нижнюю границу ожидания. Сбой сервера
+    повторяется быстрее обычной ошибки, а получатель с отозванным токеном
+    исключается из расписания. Интервал каждого получателя сдвигается
+    на постоянную долю jitter, вычисленную из его ключа так же, как
+    spread_offset, поэтому опросы разных получателей расходятся и не
+    сходятся снова после перезапуска.
+    Сроки хранятся в иерархическом колесе таймеров, поэтому постановка
+    и снятие опроса не зависят от числа получателей.
+    """
+
+    def __init__(
+        self, period=POLL_PERIOD, reviewing_period=REVIEWING_PERIOD,
+        error_period=ERROR_PERIOD, max_period=MAX_PERIOD,
+        idle_cycles=IDLE_CYCLES, jitter=JITTER,
+        retry_soon_period=RETRY_SOON_PERIOD
+    ):
+        """Задаёт базовые интервалы и параметры отступа."""
+        self.period = period
+        self.reviewing_period = reviewing_period
+        self.error_period = error_period
+        self.retry_soon_period = retry_soon_period
+        self.max_period = max_period
+        self.idle_cycles = idle_cycles
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._states = {}
+        self._wheel = TimingWheel()
+
+    def add(self, key, now, delay=0):
+        """Добавляет получателя с первым опросом через delay секунд."""
+        with self._lock:
+            self._wheel.start(now)
+            self._states[key] = PollState(
+                now + delay, spread_offset(getattr(key, 'key', key), 1)
+            )
+            self._wheel.schedule(key, now + delay)
+
+    def remove(self, key):
+        """Исключает получателя из расписания."""
+        with self._lock:
+            self._states.pop(key, None)
+            self._wheel.cancel(key)
+
+    def record_success(self, key, statuses, now):
+        """Учитывает успешный опрос и возвращает время следующего.
+
+        statuses — последние статусы изменившихся работ, словарь
+        {идентификатор работы: статус}. Работа остаётся на ревью, пока
+        не придёт её следующий статус.
+        """
+        with self._lock:
+            state = self._states[key]
+            state.errors = 0
+            if statuses:
+                state.idle = 0
+                for homework_id, status in statuses.items():
+                    if status == 'reviewing':
+                        state.reviewing.add(homework_id)
+                    else:
+                        state.reviewing.discard(homework_id)
+            else:
+                state.idle += 1
+            if state.reviewing:
+                interval = self.reviewing_period
+            else:
+                overdue = max(state.idle - self.idle_cycles, 0)
+                interval = self.period * 2 ** min(overdue, 16)
+            return self._schedule(key, state, interval, now)
+
+    def record_error(
+        self, key, now, retry_after=None, policy=ErrorPolicy.BACKOFF
+    ):
+        """Учитывает ошибку опроса и возвращает время следующего.
+
+        С политикой STOP получатель исключается из расписания, и
+        возвращается None.
+        """
+        with self._lock:
+            if policy is ErrorPolicy.STOP:
+                self._states.pop(key, None)
+                self._wheel.cancel(key)
+                return None
+            state = self._states[key]
+            state.errors += 1
+            base = (
+                self.retry_soon_period if policy is ErrorPolicy.RETRY_SOON
+                else self.error_period
+            )
+            interval = base * 2 ** min(state.errors - 1, 16)
+            return self._schedule(key, state, interval, now, retry_after)
+
+    def due(self, now):
+        """Возвращает получателей, чей опрос наступил к моменту now.
+
+        До вызова record_* им назначается опрос через обычный период,
+        чтобы получатель не выпал из расписания при сбое обработчика.
+        """
+        with self._lock:
+            due = self._wheel.advance(now)
+            for key in due:
+                state = self._states[key]
+                state.next_at = now + self.period
+                self._wheel.schedule(key, state.next_at)
+        return due
+
+    def next_due(self):
+        """Возвращает ближайшее время опроса или None."""
+        with self._lock:
+            return self._wheel.next_expiry()
+
+    def next_poll(self, key):
+        """Возвращает назначенное время следующего опроса получателя."""
+        return self._states[key].next_at
+
+    def snapshot(self):
+        """Возвращает назначенные времена опроса всех получателей."""
+        with self._lock:
+            return {
+                key: state.next_at for key, state in self._states.items()
+            }
+
+    def _schedule(self, key, state, interval, now, retry_after=None):
+        interval = min(interval, self.max_period)
+        interval *= 1 + self.jitter * (2 * state.phase - 1)
+        if retry_after is not None:
+            interval = max(interval, retry_after)
+        state.interval = interval
+        state.next_at = now + interval
+        self._wheel.schedule(key, state.next_at)
+        return state.next_at
@@ -0,0 +1,72 @@
+"""Плавная остановка бота по сигналам SIGTERM и SIGINT."""
+import contextlib
+import logging
+import signal
+import threading
+
+from exceptions import ShutdownRequested
+
+SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+logger = logging.getLogger(__name__)
+
+
+class GracefulShutdown:
+    """Флаг остановки, который взводят сигналы SIGTERM и SIGINT.
+
+    Первый сигнал только взводит флаг: начатый цикл опроса доходит до
+    конца, его сообщения отправляются, а курсоры сохраняются. Ожидание
+    внутри interruptible() сигнал прерывает сразу исключением
+    ShutdownRequested, повторный сигнал прерывает и сам цикл. Выход из
+    блока with по ShutdownRequested считается штатной остановкой.
+    """
+
+    def __init__(self):
+        """Создаёт невзведённый флаг."""
+        self.event = threading.Event()
+        self._sleeping = False
+        self._previous = {}
+
+    def __enter__(self):
+        """Устанавливает обработчики сигналов."""
+        if threading.current_thread() is threading.main_thread():
+            for signum in SIGNALS:
+                self._previous[signum] = signal.signal(signum, self._handle)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Восстанавливает прежние обработчики сигналов."""
+        for signum, handler in self._previous.items():
+            signal.signal(signum, handler)
+        self._previous.clear()
+        return exc_type is not None and issubclass(
+            exc_type, ShutdownRequested
+        )
+
+    @property
+    def requested(self):
+        """Проверяет, запрошена ли остановка."""
+        return self.event.is_set()
+
+    def request(self):
+        """Запрашивает остановку без сигнала."""
+        self.event.set()
+
+    @contextlib.contextmanager
+    def interruptible(self):
+        """Разрешает сигналу остановки прервать ожидание внутри блока."""
+        if self.requested:
+            raise ShutdownRequested('остановка уже запрошена')
+        self._sleeping = True
+        try:
+            yield
+        finally:
+            self._sleeping = False
+
+    def _handle(self, signum, frame):
+        name = signal.Signals(signum).name
+        if self.requested or self._sleeping:
+            self.event.set()
+            raise ShutdownRequested(name)
+        logger.warning(f'Получен {name}, остановка после текущего цикла.')
+        self.event.set()
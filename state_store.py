@@ -0,0 +1,227 @@
+"""Постоянное хранилище курсоров и отправленных уведомлений на SQLite."""
+import sqlite3
+import threading
+
+BATCH_SIZE = 200
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cursors ('
+    ' tenant TEXT PRIMARY KEY,'
+    ' from_date INTEGER NOT NULL'
+    ') WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS notified ('
+    ' tenant TEXT NOT NULL,'
+    ' homework_id TEXT NOT NULL,'
+    ' status TEXT NOT NULL,'
+    ' date_updated TEXT NOT NULL,'
+    ' PRIMARY KEY (tenant, homework_id, status, date_updated)'
+    ') WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS last_messages ('
+    ' tenant TEXT PRIMARY KEY,'
+    ' message TEXT NOT NULL'
+    ') WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS outbox ('
+    ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+    ' idempotency_key TEXT NOT NULL UNIQUE,'
+    ' chat_id NOT NULL,'
+    ' message TEXT NOT NULL,'
+    ' created_at REAL NOT NULL,'
+    ' delivered_at REAL'
+    ')',
+    'CREATE INDEX IF NOT EXISTS outbox_pending'
+    ' ON outbox (chat_id, id) WHERE delivered_at IS NULL',
+)
+
+
+class StateStore:
+    """Курсоры, отправленные статусы и последние сообщения получателей.
+
+    База работает в режиме WAL с synchronous=FULL: каждый commit
+    сбрасывается на диск. Записи копятся в памяти и сохраняются одной
+    транзакцией в flush() или при накоплении batch_size изменений.
+    Горячие пары кэширует DedupIndex, сюда приходят только промахи.
+    Таблица outbox хранит исходящие сообщения: они попадают в ту же
+    транзакцию, что и курсор, поэтому курсор не сохранится без них.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        """Открывает базу и создаёт таблицы при первом запуске."""
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=FULL')
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+        self._cursors = {}
+        self._pending_notified = set()
+        self._messages = {}
+        self._outbox = []
+        self._delivered = {}
+
+    def load_cursor(self, tenant):
+        """Возвращает сохранённый курсор получателя или None."""
+        with self._lock:
+            if tenant in self._cursors:
+                return self._cursors[tenant]
+            row = self._connection.execute(
+                'SELECT from_date FROM cursors WHERE tenant = ?', (tenant,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, tenant, from_date):
+        """Запоминает новый курсор получателя до ближайшего flush()."""
+        with self._lock:
+            self._cursors[tenant] = from_date
+            self._flush_if_full()
+
+    def load_last_message(self, tenant):
+        """Возвращает последнее сообщение получателю или None."""
+        with self._lock:
+            if tenant in self._messages:
+                return self._messages[tenant]
+            row = self._connection.execute(
+                'SELECT message FROM last_messages WHERE tenant = ?',
+                (tenant,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_last_message(self, tenant, message):
+        """Запоминает последнее сообщение получателю до flush()."""
+        with self._lock:
+            self._messages[tenant] = message
+            self._flush_if_full()
+
+    def is_notified(self, tenant, homework_id, status, updated=''):
+        """Проверяет, отправлялось ли уведомление об изменении работы."""
+        row = (tenant, str(homework_id), status, updated)
+        with self._lock:
+            if row in self._pending_notified:
+                return True
+            return self._connection.execute(
+                'SELECT 1 FROM notified WHERE tenant = ? AND homework_id = ?'
+                ' AND status = ? AND date_updated = ?', row
+            ).fetchone() is not None
+
+    def mark_notified(self, tenant, homework_id, status, updated=''):
+        """Запоминает отправленное уведомление до ближайшего flush()."""
+        with self._lock:
+            self._pending_notified.add(
+                (tenant, str(homework_id), status, updated)
+            )
+            self._flush_if_full()
+
+    def enqueue_message(self, key, chat_id, message, created_at):
+        """Ставит сообщение в outbox до ближайшего flush().
+
+        Сообщение с уже известным ключом key не добавляется повторно.
+        """
+        with self._lock:
+            self._outbox.append((key, chat_id, message, created_at))
+            self._flush_if_full()
+
+    def load_outbox(self, limit, skip=()):
+        """Возвращает первые недоставленные сообщения чатов, до limit штук.
+
+        От каждого чата берётся только самое раннее сообщение, чаты из
+        skip пропускаются, поэтому длинная очередь одного чата не
+        заслоняет остальные. Каждое сообщение — кортеж
+        (id, chat_id, message), чаты идут в порядке их первых сообщений.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT id, chat_id, message FROM outbox WHERE id IN ('
+                ' SELECT min(id) FROM outbox WHERE delivered_at IS NULL'
+                ' GROUP BY chat_id'
+                ') ORDER BY id LIMIT ?',
+                (limit + len(skip) + len(self._delivered),)
+            ).fetchall()
+            pending = [
+                row for row in rows
+                if row[0] not in self._delivered and row[1] not in skip
+            ]
+        return pending[:limit]
+
+    def mark_delivered(self, message_id, delivered_at):
+        """Отмечает сообщение доставленным до ближайшего flush()."""
+        with self._lock:
+            self._delivered[message_id] = delivered_at
+            self._flush_if_full()
+
+    def outbox_depth(self):
+        """Возвращает число сохранённых недоставленных сообщений."""
+        with self._lock:
+            return self._connection.execute(
+                'SELECT count(*) FROM outbox WHERE delivered_at IS NULL'
+            ).fetchone()[0] - len(self._delivered)
+
+    def prune_outbox(self, before):
+        """Удаляет сообщения, доставленные раньше момента before."""
+        with self._lock, self._connection:
+            self._connection.execute('BEGIN')
+            self._connection.execute(
+                'DELETE FROM outbox WHERE delivered_at < ?', (before,)
+            )
+
+    def flush(self):
+        """Сохраняет накопленные изменения одной транзакцией."""
+        with self._lock:
+            if not (
+                self._cursors or self._pending_notified or self._messages
+                or self._outbox or self._delivered
+            ):
+                return
+            with self._connection:
+                self._connection.execute('BEGIN')
+                self._connection.executemany(
+                    'INSERT INTO cursors (tenant, from_date) VALUES (?, ?)'
+                    ' ON CONFLICT (tenant) DO UPDATE'
+                    ' SET from_date = excluded.from_date',
+                    self._cursors.items()
+                )
+                self._connection.executemany(
+                    'INSERT OR IGNORE INTO notified'
+                    ' (tenant, homework_id, status, date_updated)'
+                    ' VALUES (?, ?, ?, ?)',
+                    self._pending_notified
+                )
+                self._connection.executemany(
+                    'INSERT INTO last_messages (tenant, message) VALUES (?, ?)'
+                    ' ON CONFLICT (tenant) DO UPDATE'
+                    ' SET message = excluded.message',
+                    self._messages.items()
+                )
+                self._connection.executemany(
+                    'INSERT OR IGNORE INTO outbox'
+                    ' (idempotency_key, chat_id, message, created_at)'
+                    ' VALUES (?, ?, ?, ?)',
+                    self._outbox
+                )
+                self._connection.executemany(
+                    'UPDATE outbox SET delivered_at = ? WHERE id = ?',
+                    [
+                        (delivered_at, message_id)
+                        for message_id, delivered_at in self._delivered.items()
+                    ]
+                )
+            self._cursors.clear()
+            self._pending_notified.clear()
+            self._messages.clear()
+            self._outbox.clear()
+            self._delivered.clear()
+
+    def close(self):
+        """Сохраняет изменения и закрывает базу."""
+        with self._lock:
+            self.flush()
+            self._connection.close()
+
+    def _flush_if_full(self):
+        pending = (
+            len(self._cursors) + len(self._pending_notified)
+            + len(self._messages) + len(self._outbox) + len(self._delivered)
+        )
+        if pending >= self.batch_size:
+            self.flush()
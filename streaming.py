@@ -0,0 +1,132 @@
+"""Потоковый разбор массива homeworks из ответа API."""
+import codecs
+import json
+
+from exceptions import ResponseKeyError, ResponseTypeError
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Буфер JSON-текста, который дочитывается из потока по мере нужды.
+
+    Уже разобранная часть отбрасывается при каждом дочитывании, поэтому
+    в памяти держится не больше одного значения и одного блока данных.
+    """
+
+    def __init__(self, chunks):
+        """Запоминает итератор блоков байтов."""
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        """Дочитывает следующий блок; возвращает False в конце потока."""
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self.buffer += text
+                return True
+        self.buffer += self._utf8.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        """Возвращает следующий значащий символ или '' в конце потока."""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return ''
+
+    def take(self):
+        """Возвращает следующий значащий символ и сдвигает позицию."""
+        char = self.peek()
+        self.position += 1
+        return char
+
+    def value(self):
+        """Разбирает очередное JSON-значение целиком."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # Число на границе блока могло оборваться: дочитываем и
+            # разбираем заново, пока после значения не появится символ.
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.position = end
+            return value
+
+    def error(self, message):
+        """Создаёт ошибку разбора в текущей позиции."""
+        return json.JSONDecodeError(message, self.buffer, self.position)
+
+
+def iter_homeworks(chunks, response):
+    """Выдаёт работы из ответа API по одной, не загружая его целиком.
+
+    Проверки совпадают с check_response: ответ не словарь и homeworks
+    не список приводят к TypeError, отсутствие homeworks — к KeyError.
+    Остальные ключи верхнего уровня (current_date) складываются в
+    словарь response и доступны после того, как генератор исчерпан.
+    """
+    reader = _Reader(chunks)
+    char = reader.peek()
+    if char == '':
+        raise reader.error('Пустой ответ API')
+    if char != '{':
+        raise ResponseTypeError('Ответ API не является словарем')
+    reader.take()
+    found = False
+    while reader.peek() != '}':
+        key = reader.value()
+        if not isinstance(key, str) or reader.take() != ':':
+            raise reader.error('Ожидался ключ объекта')
+        if key == 'homeworks':
+            if reader.peek() != '[':
+                raise ResponseTypeError('Ключ homeworks должен быть списком')
+            yield from _iter_array(reader)
+            found = True
+        else:
+            response[key] = reader.value()
+        if reader.peek() != ',':
+            break
+        reader.take()
+    if reader.take() != '}':
+        raise reader.error('Ожидалась запятая или }')
+    if not found:
+        raise ResponseKeyError('Ключ homeworks отсутствует в ответе API')
+
+
+def _iter_array(reader):
+    reader.take()
+    if reader.peek() == ']':
+        reader.take()
+        return
+    while True:
+        homework = reader.value()
+        if not isinstance(homework, dict):
+            raise ResponseTypeError('Элемент homeworks должен быть словарем')
+        yield homework
+        char = reader.take()
+        if char == ']':
+            return
+        if char != ',':
+            raise reader.error('Ожидалась запятая или ]')
@@ -0,0 +1,153 @@
+"""Реестр получателей и пул опроса для нескольких токенов Практикума."""
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dedup import DedupIndex
+
+MAX_WORKERS = 16
+TENANT_INDEX_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class Tenant:
+    """Получатель уведомлений: токен Практикума, чаты и курсор опроса."""
+
+    __slots__ = (
+        'token', 'key', 'chat_ids', 'headers', 'timestamp', '_last_message',
+        'store', 'dedup'
+    )
+
+    def __init__(
+        self, token, chat_ids, timestamp=0, store=None, dedup=None
+    ):
+        """Создаёт получателя, восстанавливая курсор из хранилища.
+
+        Индекс отправленных статусов можно разделить между получателями,
+        чтобы ограничить общий объём памяти.
+        """
+        self.token = token
+        self.key = hashlib.sha256(token.encode()).hexdigest()[:32]
+        self.chat_ids = tuple(chat_ids)
+        self.headers = {'Authorization': f'OAuth {token}'}
+        self.store = store
+        self.dedup = dedup if dedup is not None else DedupIndex(
+            max_entries=TENANT_INDEX_SIZE
+        )
+        saved = store.load_cursor(self.key) if store is not None else None
+        self.timestamp = timestamp if saved is None else saved
+        self._last_message = (
+            store.load_last_message(self.key) if store is not None else None
+        ) or ''
+
+    @property
+    def last_message(self):
+        """Последнее сообщение получателю; повтор ошибки не отправляется."""
+        return self._last_message
+
+    @last_message.setter
+    def last_message(self, message):
+        """Запоминает последнее сообщение, в том числе в хранилище."""
+        self._last_message = message
+        if self.store is not None:
+            self.store.set_last_message(self.key, message)
+
+    def is_notified(self, homework_id, status, updated=''):
+        """Проверяет, сообщали ли уже получателю об этом изменении работы.
+
+        Изменение задаётся статусом и его date_updated. Сначала
+        проверяется индекс в памяти, при промахе — хранилище; найденная
+        в хранилище запись возвращается в индекс.
+        """
+        if self.dedup.contains(self.key, homework_id, status, updated):
+            return True
+        if self.store is not None and self.store.is_notified(
+            self.key, homework_id, status, updated
+        ):
+            self.dedup.add(self.key, homework_id, status, updated)
+            return True
+        return False
+
+    def mark_sent(self, homework_id, status, message, updated=''):
+        """Фиксирует отправленное уведомление об изменении работы."""
+        self.last_message = message
+        self.dedup.add(self.key, homework_id, status, updated)
+        if self.store is not None:
+            self.store.mark_notified(self.key, homework_id, status, updated)
+
+    def advance(self, current_date):
+        """Сдвигает курсор опроса после обработки пачки изменений."""
+        self.timestamp = current_date
+        if self.store is not None:
+            self.store.set_cursor(self.key, current_date)
+
+    def __repr__(self):
+        """Показывает получателя в логах без полного токена."""
+        return f'Tenant(token=***{self.token[-4:]}, chats={self.chat_ids})'
+
+
+def load_tenants(path, timestamp=0, store=None, dedup=None):
+    """Загружает реестр из JSON-файла вида {токен: чат или [чаты]}."""
+    with open(path, encoding='UTF-8') as file:
+        registry = json.load(file)
+    if not isinstance(registry, dict):
+        raise TypeError('Реестр получателей должен быть словарем')
+    tenants = []
+    for token, chat_ids in registry.items():
+        if not isinstance(chat_ids, list):
+            chat_ids = [chat_ids]
+        if not token or not chat_ids:
+            raise ValueError(f'Неполная запись в реестре получателей: {path}')
+        tenants.append(Tenant(token, chat_ids, timestamp, store, dedup))
+    return tenants
+
+
+class TenantPoller:
+    """Опрашивает получателей в пуле потоков ограниченного размера.
+
+    Одновременно в очереди пула находится не больше max_workers задач,
+    поэтому память не растёт с числом получателей в реестре.
+    """
+
+    def __init__(self, poll, max_workers=MAX_WORKERS):
+        """Запоминает функцию опроса одного получателя."""
+        self._poll = poll
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='tenant-poller'
+        )
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def run_cycle(self, tenants):
+        """Опрашивает всех получателей и ждёт завершения цикла."""
+        pending = 0
+        finished = threading.Condition()
+
+        def done(future):
+            nonlocal pending
+            self._slots.release()
+            with finished:
+                pending -= 1
+                finished.notify()
+
+        for tenant in tenants:
+            self._slots.acquire()
+            with finished:
+                pending += 1
+            self._executor.submit(self._poll_safely, tenant).add_done_callback(
+                done
+            )
+        with finished:
+            finished.wait_for(lambda: pending == 0)
+
+    def shutdown(self):
+        """Останавливает потоки пула."""
+        self._executor.shutdown(wait=True)
+
+    def _poll_safely(self, tenant):
+        try:
+            self._poll(tenant)
+        except Exception as error:
+            logger.error(f'Ошибка опроса {tenant!r}: {error}')
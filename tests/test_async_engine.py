@@ -0,0 +1,189 @@
+import asyncio
+import gzip
+
+import pytest
+
+import homework
+from async_engine import AsyncEngine, read_response
+from benchmarks.stubs import StubServer
+from digest import ErrorDigests
+from exceptions import AuthError
+from retries import RetryPolicy
+from scheduler import PollScheduler
+from tenants import Tenant
+
+
+@pytest.fixture
+def stub_server():
+    with StubServer() as server:
+        yield server
+
+
+class TestAsyncEngine:
+
+    def test_run_cycle_polls_and_sends(self, stub_server):
+        engine = AsyncEngine(
+            f'{stub_server.url}/api/', '1234:stub',
+            homework.check_response, homework.parse_status,
+            poll_limit=5, telegram_api=stub_server.url
+        )
+        tenants = [Tenant(f'token-{number}', [number]) for number in range(20)]
+        asyncio.run(engine.run_cycle(tenants))
+        assert stub_server.counters == {'api': 20, 'telegram': 20}
+        assert all(
+            homework.HOMEWORK_VERDICTS['approved'] in tenant.last_message
+            for tenant in tenants
+        ), 'Каждый получатель должен получить сообщение о статусе.'
+        assert all(tenant.timestamp > 0 for tenant in tenants)
+
+    def test_connections_are_reused(self, stub_server):
+        engine = AsyncEngine(
+            f'{stub_server.url}/api/', '1234:stub',
+            homework.check_response, homework.parse_status,
+            poll_limit=1, send_limit=1, telegram_api=stub_server.url
+        )
+        tenants = [Tenant(f'token-{number}', [number]) for number in range(10)]
+        asyncio.run(engine.run_cycle(tenants))
+        stats = engine._pool.stats()
+        assert stub_server.counters == {'api': 10, 'telegram': 10}
+        assert stats['opened'] <= 4, (
+            'Запросы к одному хосту должны идти по открытым соединениям.'
+        )
+        assert stats['reused'] >= 16
+
+    def test_server_errors_are_retried(self):
+        with StubServer(error_rate=1.0) as server:
+            engine = AsyncEngine(
+                f'{server.url}/api/', '1234:stub',
+                homework.check_response, homework.parse_status,
+                telegram_api=server.url,
+                retry_policy=RetryPolicy(2, backoff=0)
+            )
+            asyncio.run(engine.run_cycle([Tenant('token', [1])]))
+            assert server.counters['api'] == 3, (
+                'Ответ 500 должен повторяться по RetryPolicy.'
+            )
+
+    def test_unchanged_response_is_not_downloaded(self):
+        requests = []
+
+        async def handle(reader, writer):
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                requests.append(head)
+                if b'If-None-Match: "v1"' in head:
+                    writer.write(b'HTTP/1.1 304 Not Modified\r\n\r\n')
+                else:
+                    body = b'{"homeworks": []}'
+                    writer.write(
+                        b'HTTP/1.1 200 OK\r\nETag: "v1"\r\n'
+                        + f'Content-Length: {len(body)}\r\n\r\n'.encode()
+                        + body
+                    )
+                await writer.drain()
+
+        async def poll_twice():
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            engine = AsyncEngine(
+                f'http://127.0.0.1:{port}/api/', '1234:stub',
+                homework.check_response, homework.parse_status
+            )
+            tenant = Tenant('token', [1])
+            for _ in range(2):
+                await engine.run_cycle([tenant])
+            server.close()
+            return engine
+
+        engine = asyncio.run(poll_twice())
+        assert len(requests) == 2
+        assert engine.cache.stats()['not_modified'] == 1, (
+            'Повторный пустой ответ должен приходить как 304.'
+        )
+        assert engine._pool.stats()['reused'] == 1
+
+    def test_unsupported_settings_are_refused(self, monkeypatch):
+        monkeypatch.setattr(homework, 'OUTBOX', True)
+        monkeypatch.setattr(homework, 'CATCH_UP', True)
+
+        def open_state_store():
+            raise AssertionError('Бот не должен запускаться.')
+
+        monkeypatch.setattr(homework, 'open_state_store', open_state_store)
+        with pytest.raises(ValueError):
+            homework.run_async(None)
+
+    def test_unreachable_api_is_reported(self, stub_server):
+        engine = AsyncEngine(
+            'http://127.0.0.1:1/api/', '1234:stub',
+            homework.check_response, homework.parse_status,
+            telegram_api=stub_server.url
+        )
+        tenant = Tenant('token', [1])
+        asyncio.run(engine.run_cycle([tenant]))
+        assert tenant.last_message.startswith('Сбой в работе')
+        assert stub_server.counters['telegram'] == 1
+
+    def test_repeated_errors_go_into_digest(self, stub_server):
+        engine = AsyncEngine(
+            'http://127.0.0.1:1/api/', '1234:stub',
+            homework.check_response, homework.parse_status,
+            telegram_api=stub_server.url, digests=ErrorDigests(3600)
+        )
+        tenant = Tenant('token', [1])
+        for _ in range(3):
+            asyncio.run(engine.run_cycle([tenant]))
+        assert tenant.last_message == (
+            'Сбой в работе : Ошибка при запросе к API: '
+            'http://127.0.0.1:1/api/, ConnectionRefusedError.'
+        )
+        assert stub_server.counters['telegram'] == 1, (
+            'Повторные ошибки должны копиться в сводку.'
+        )
+        engine.endpoint = f'{stub_server.url}/api/'
+        asyncio.run(engine.run_cycle([tenant]))
+        assert stub_server.counters['telegram'] == 3, (
+            'После восстановления уходят итоговая сводка и новый статус.'
+        )
+        assert engine.digests.recovered(tenant.key) is None
+
+    def test_stopped_tenant_leaves_empty_schedule(self, stub_server):
+        engine = AsyncEngine(
+            f'{stub_server.url}/api/', '1234:stub',
+            homework.check_response, homework.parse_status,
+            telegram_api=stub_server.url
+        )
+
+        async def revoked(tenant):
+            raise AuthError('Статус не равен 200: 401.', status_code=401)
+
+        engine.process_tenant = revoked
+        scheduler = PollScheduler()
+        tenant = Tenant('token', [1])
+        scheduler.add(tenant, 0)
+
+        async def serve():
+            stop = asyncio.Event()
+            asyncio.get_running_loop().call_later(0.3, stop.set)
+            await engine.run_forever(scheduler, stop=stop)
+
+        asyncio.run(serve())
+        assert scheduler.next_due() is None, (
+            'Получатель с отозванным токеном исключается из расписания.'
+        )
+
+    def test_gzip_response_is_decompressed(self):
+        payload = b'{"homeworks": []}'
+        compressed = gzip.compress(payload)
+
+        async def read():
+            reader = asyncio.StreamReader()
+            reader.feed_data(
+                b'HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\n'
+                + f'Content-Length: {len(compressed)}\r\n\r\n'.encode()
+                + compressed
+            )
+            reader.feed_eof()
+            return await read_response(reader)
+
+        assert asyncio.run(read()).json() == {'homeworks': []}
@@ -0,0 +1,33 @@
+import pytest
+
+from benchmarks import bench_e2e
+
+
+class TestBenchE2E:
+
+    @pytest.mark.parametrize('engine', ['sync', 'async'])
+    def test_run_reports_throughput(self, engine):
+        result = bench_e2e.run(bench_e2e.parse_args([
+            '--engine', engine, '--tenants', '4', '--cycles', '2',
+            '--latency', '0', '--homeworks', '2'
+        ]))
+        assert result['cycles'] == 2
+        assert result['polls'] == 8
+        assert result['requests'] == {
+            'api': 8, 'telegram': 16, 'errors': 0
+        }, 'Каждый опрос должен отправить сообщение о каждой работе.'
+        assert result['poll_p99_ms'] >= result['poll_p50_ms'] > 0
+        assert 0 < result['rss_kb'] <= result['peak_rss_kb']
+
+    def test_error_rate_and_baseline(self):
+        result = bench_e2e.run(bench_e2e.parse_args([
+            '--tenants', '3', '--cycles', '1', '--latency', '0',
+            '--error-rate', '1'
+        ]))
+        assert result['requests']['errors'] == (
+            result['requests']['api'] + result['requests']['telegram']
+        ), 'При error_rate=1 заглушка должна отвечать только ошибками.'
+        lines = bench_e2e.compare(
+            result, {**result, 'cycles_per_sec': result['cycles_per_sec'] / 2}
+        )
+        assert '+100.0%' in lines[0]
@@ -0,0 +1,136 @@
+import time
+
+import pytest
+import requests
+
+import homework
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from exceptions import CircuitOpenError
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise ConnectionError('нет соединения')
+
+
+class TestCircuitBreaker:
+
+    def test_opens_probes_and_closes(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            'test', failure_threshold=2, reset_timeout=10, clock=clock
+        )
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(fail)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.call(fail)
+        assert error.value.retry_after == 10
+        clock.now = 10
+        assert breaker.allow() and breaker.state == HALF_OPEN
+        assert not breaker.allow(), (
+            'В состоянии half_open пропускается один пробный вызов.'
+        )
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.stats() == {
+            'state': CLOSED, 'failures': 0, 'rejected': 2, 'opened': 1
+        }
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            'test', failure_threshold=1, reset_timeout=5, clock=clock
+        )
+        breaker.record_failure()
+        clock.now = 5
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN and breaker.retry_after() == 5
+
+    def test_client_errors_do_not_open(self):
+        breaker = CircuitBreaker('test', failure_threshold=1)
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                breaker.call(
+                    int, 'x', is_failure=lambda error: False
+                )
+        assert breaker.state == CLOSED
+
+    def test_disabled_passes_everything(self):
+        breaker = CircuitBreaker('test', failure_threshold=1, enabled=False)
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                breaker.call(fail)
+        assert breaker.state == CLOSED
+
+    def test_api_outage_short_circuits_requests(self, monkeypatch):
+        calls = []
+
+        def get(**kwargs):
+            calls.append(kwargs)
+            raise requests.ConnectionError('нет соединения')
+
+        monkeypatch.setattr(requests, 'get', get)
+        monkeypatch.setattr(
+            homework, 'api_breaker', CircuitBreaker('api', failure_threshold=2)
+        )
+        monkeypatch.setattr(homework.retry_policy, 'retries', 0)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                homework.get_api_answer(0)
+        with pytest.raises(CircuitOpenError):
+            homework.get_api_answer(0)
+        assert len(calls) == 2, 'Разомкнутая цепь не должна ходить в сеть.'
+
+    def test_telegram_outage_skips_sends(self, monkeypatch):
+        class Bot:
+            calls = 0
+
+            def send_message(self, chat_id, text):
+                Bot.calls += 1
+                raise ConnectionError('Telegram недоступен')
+
+        monkeypatch.setattr(
+            homework, 'telegram_breaker',
+            CircuitBreaker('telegram', failure_threshold=1)
+        )
+        assert not homework.send_to_chat(Bot(), 1, 'первое')
+        assert not homework.send_to_chat(Bot(), 1, 'второе')
+        assert Bot.calls == 1
+
+    def test_queued_sends_go_through_breaker(self, monkeypatch):
+        class Bot:
+            down = True
+
+            def send_message(self, chat_id, text):
+                if Bot.down:
+                    raise ConnectionError('Telegram недоступен')
+
+        breaker = CircuitBreaker(
+            'telegram', failure_threshold=2, reset_timeout=0.1
+        )
+        monkeypatch.setattr(homework, 'telegram_breaker', breaker)
+        queue = homework.open_outbound(Bot())
+        queue.coalesce_window = queue.retry_backoff = 0.01
+        queue.chat_rate = 100
+        for chat_id in range(5):
+            assert homework.send_to_chat(queue, chat_id, 'статус')
+        deadline = time.monotonic() + 1
+        while not breaker.opened and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert breaker.opened, (
+            'Сбои отправки из очереди должны размыкать выключатель.'
+        )
+        Bot.down = False
+        assert queue.close(timeout=1)
+        assert breaker.state == CLOSED
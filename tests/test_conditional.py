@@ -0,0 +1,115 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+from conditional import ResponseCache
+from tenants import Tenant
+
+
+class Response:
+
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.reason = HTTPStatus(status_code).phrase
+        self.content = body
+        self.text = body.decode()
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def body(homeworks, current_date=100):
+    return json.dumps(
+        {'homeworks': homeworks, 'current_date': current_date}
+    ).encode()
+
+
+HOMEWORK = {'id': 1, 'homework_name': 'hw.zip', 'status': 'approved'}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(homework, 'response_cache', ResponseCache())
+    calls, answers = [], []
+
+    def get(**kwargs):
+        calls.append(kwargs['headers'])
+        return answers.pop(0)
+
+    monkeypatch.setattr(requests, 'get', get)
+    return calls, answers
+
+
+class TestConditional:
+
+    def test_only_committed_response_is_reused(self):
+        cache = ResponseCache()
+        headers = {'ETag': '"v1"', 'Last-Modified': 'Mon'}
+        cache.stage('token', 0, headers, len(body([])))
+        assert cache.conditional_headers('token', 0) == {}, (
+            'Необработанный ответ не должен становиться валидатором.'
+        )
+        cache.commit('token')
+        assert cache.conditional_headers('token', 0) == {
+            'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon'
+        }
+        assert cache.conditional_headers('token', 1) == {}, (
+            'Валидаторы действительны только для того же from_date.'
+        )
+
+    def test_not_modified_skips_parsing(self, api):
+        calls, answers = api
+        payload = body([])
+        answers.append(Response(200, payload, {'ETag': '"v1"'}))
+        answers.append(Response(304))
+        tenant = Tenant('token', [1], 0)
+        homework.process_tenant(None, tenant)
+        assert homework.fetch_homework_statuses(0, tenant.headers) == {
+            'homeworks': []
+        }
+        assert calls[1]['If-None-Match'] == '"v1"'
+        assert calls[0]['Accept-Encoding'] == 'gzip, deflate'
+        assert homework.response_cache.stats() == {
+            'not_modified': 1, 'bytes_saved': len(payload),
+        }
+
+    def test_failed_delivery_is_not_skipped(self, api):
+        calls, answers = api
+        payload = json.dumps({'homeworks': [HOMEWORK]}).encode()
+        answers.extend(
+            Response(200, payload, {'ETag': '"v1"'}) for _ in range(3)
+        )
+        tenant = Tenant('token', [1], 0)
+        outcomes = [False, True]
+        homework.deliver_updates(
+            tenant, homework.fetch_homework_statuses(0, tenant.headers),
+            [HOMEWORK], lambda message: outcomes.pop(0)
+        )
+        answer = homework.fetch_homework_statuses(0, tenant.headers)
+        assert 'If-None-Match' not in calls[1], (
+            'После неудачной доставки ответ нужно запросить и разобрать снова.'
+        )
+        assert answer['homeworks'] == [HOMEWORK]
+        homework.deliver_updates(
+            tenant, answer, answer['homeworks'],
+            lambda message: outcomes.pop(0)
+        )
+        homework.fetch_homework_statuses(0, tenant.headers)
+        assert calls[2]['If-None-Match'] == '"v1"'
+
+    def test_compression_savings(self):
+        payload = body([HOMEWORK] * 50)
+        compressed = gzip.compress(payload)
+        headers = requests.structures.CaseInsensitiveDict({
+            'content-encoding': 'gzip',
+            'content-length': str(len(compressed)),
+        })
+        assert homework.compression_savings(headers, payload) == (
+            len(payload) - len(compressed)
+        )
+        assert homework.compression_savings({}, payload) == 0
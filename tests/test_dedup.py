@@ -0,0 +1,66 @@
+import homework
+from dedup import DedupIndex
+from state_store import StateStore
+from tenants import Tenant
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDedupIndex:
+
+    def test_lru_eviction(self):
+        index = DedupIndex(max_entries=2)
+        index.add('t', 1, 'approved')
+        index.add('t', 2, 'approved')
+        assert index.contains('t', 1, 'approved')
+        index.add('t', 3, 'approved')
+        assert not index.contains('t', 2, 'approved'), (
+            'При переполнении должна вытесняться давно не использованная '
+            'запись.'
+        )
+        assert index.contains('t', 1, 'approved')
+        assert len(index) == 2
+        assert index.stats() == {
+            'size': 2, 'hits': 2, 'misses': 1, 'evictions': 1
+        }
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        index = DedupIndex(ttl=10, clock=clock)
+        index.add('t', 1, 'reviewing')
+        clock.now = 11
+        assert not index.contains('t', 1, 'reviewing')
+        assert index.stats()['evictions'] == 1
+
+    def test_alternating_homeworks_are_not_resent(self):
+        tenant = Tenant('token', [1])
+        tenant.mark_sent(1, 'approved', 'first')
+        tenant.mark_sent(2, 'approved', 'second')
+        assert tenant.is_notified(1, 'approved'), (
+            'Статус первой работы не должен отправляться повторно после '
+            'уведомления о второй.'
+        )
+        assert not tenant.is_notified(1, 'rejected')
+
+    def test_resubmission_cycle_is_sent(self, tmp_path):
+        store = StateStore(str(tmp_path / 'state.db'))
+        tenant = Tenant('token', [1], store=store)
+        sent = []
+        for day, status in enumerate(
+            ('reviewing', 'rejected', 'reviewing', 'rejected', 'rejected'),
+            start=1
+        ):
+            homework.deliver_updates(tenant, {}, [{
+                'id': 1, 'homework_name': 'hw.zip', 'status': status,
+                'date_updated': f'2024-01-{min(day, 4):02d}T10:00:00Z',
+            }], lambda message: sent.append(message) or True)
+        assert len(sent) == 4, (
+            'Повторный статус после новой отправки работы должен приходить.'
+        )
+        store.close()
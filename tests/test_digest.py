@@ -0,0 +1,78 @@
+import pytest
+
+import homework
+from digest import ErrorDigests, error_fingerprint
+from exceptions import ApiConnectionError, ServerError
+from tenants import Tenant
+
+
+def server_error(body):
+    return ServerError(f'Ответ 503: {body}', status_code=503)
+
+
+def sender():
+    sent = []
+
+    def send(message):
+        sent.append(message)
+        return True
+
+    return sent, send
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(homework.time, 'time', lambda: now[0])
+    monkeypatch.setattr(homework, 'error_digests', ErrorDigests(3600))
+    return now
+
+
+class TestErrorDigests:
+
+    def test_fingerprint_ignores_response_body(self):
+        assert error_fingerprint(server_error('a')) == error_fingerprint(
+            server_error('b')
+        ) == 'ServerError 503'
+        assert error_fingerprint(ApiConnectionError()) == 'ApiConnectionError'
+
+    def test_disabled_keeps_message_per_error(self):
+        digests = ErrorDigests(0)
+        assert digests.record('tenant', server_error('a'), 0) == (
+            'Сбой в работе : Ответ 503: a'
+        )
+        assert digests.recovered('tenant') is None
+
+    def test_flapping_api_is_digested(self, clock):
+        tenant, (sent, send) = Tenant('token', [1]), sender()
+        for number in range(10):
+            homework.report_error(tenant, server_error(number), send)
+            clock[0] += 60
+        assert sent == ['Сбой в работе : Ответ 503: 0'], (
+            'Ошибки с разным текстом не должны приходить каждый цикл.'
+        )
+        clock[0] += 3600
+        homework.report_error(tenant, ApiConnectionError('обрыв'), send)
+        assert len(sent) == 2
+        assert sent[1].startswith('Сводка ошибок опроса:')
+        assert '- ServerError 503: 10 раз' in sent[1]
+        assert '- ApiConnectionError: 1 раз' in sent[1]
+
+    def test_recovery_sends_unreported_errors(self, clock):
+        tenant, (sent, send) = Tenant('token', [1]), sender()
+        homework.report_recovery(tenant, send)
+        homework.report_error(tenant, server_error('a'), send)
+        homework.report_recovery(tenant, send)
+        assert len(sent) == 1, (
+            'Если о всех ошибках уже сообщено, сводка не нужна.'
+        )
+        homework.report_error(tenant, server_error('a'), send)
+        homework.report_error(tenant, server_error('b'), send)
+        homework.report_recovery(tenant, lambda message: False)
+        homework.report_recovery(tenant, send)
+        assert sent[1].startswith('Опрос снова работает.'), (
+            'Сводка должна уйти сразу после восстановления опроса.'
+        )
+        assert '2 раз' in sent[1]
+        homework.report_recovery(tenant, send)
+        assert len(sent) == 2
@@ -0,0 +1,111 @@
+import sqlite3
+
+import pytest
+import requests
+import telebot
+
+import homework
+from exceptions import (
+    ApiConnectionError, AuthError, ErrorPolicy, ResponseKeyError,
+    ResponseTypeError, ServerError, ThrottledError, UnknownStatusError,
+    error_policy
+)
+from retries import RetryPolicy
+from tenants import Tenant
+from tests.check_utils import MockResponseGET, MockTelegramBot
+
+
+class Response(MockResponseGET):
+
+    def __init__(self, *args, headers=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.headers = headers or {}
+
+
+def respond(monkeypatch, status, headers=None):
+    monkeypatch.setattr(
+        requests, 'get',
+        lambda **kwargs: Response(http_status=status, headers=headers)
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_retries(monkeypatch):
+    monkeypatch.setattr(homework, 'retry_policy', RetryPolicy(0))
+
+
+class TestErrorTaxonomy:
+
+    @pytest.mark.parametrize('status, error, policy', [
+        (401, AuthError, ErrorPolicy.STOP),
+        (403, AuthError, ErrorPolicy.STOP),
+        (429, ThrottledError, ErrorPolicy.BACKOFF),
+        (503, ServerError, ErrorPolicy.RETRY_SOON),
+    ])
+    def test_status_codes(self, monkeypatch, status, error, policy):
+        respond(monkeypatch, status, {'Retry-After': '30'})
+        with pytest.raises(error) as raised:
+            homework.get_api_answer(0)
+        assert error_policy(raised.value) is policy
+        assert raised.value.status_code == status
+        assert raised.value.retry_after == 30
+
+    def test_connection_error(self, monkeypatch):
+        def get(**kwargs):
+            raise requests.Timeout('таймаут')
+
+        monkeypatch.setattr(requests, 'get', get)
+        with pytest.raises(ApiConnectionError) as raised:
+            homework.get_api_answer(0)
+        assert isinstance(raised.value, ConnectionError)
+        assert error_policy(raised.value) is ErrorPolicy.RETRY_SOON
+
+    def test_payload_errors_keep_builtin_types(self):
+        with pytest.raises(ResponseTypeError) as raised:
+            homework.check_response([])
+        assert isinstance(raised.value, TypeError)
+        with pytest.raises(ResponseKeyError) as raised:
+            homework.check_response({})
+        assert isinstance(raised.value, KeyError)
+        assert str(raised.value) == 'Ключ homeworks отсутствует в ответе API'
+        with pytest.raises(UnknownStatusError):
+            homework.parse_status({'homework_name': 'hw', 'status': 'new'})
+        assert error_policy(RuntimeError()) is ErrorPolicy.BACKOFF
+
+    def test_revoked_token_leaves_schedule(self, monkeypatch):
+        respond(monkeypatch, 401)
+        tenant = Tenant('token', [1])
+        scheduler = homework.create_scheduler([tenant])
+        bot = MockTelegramBot()
+        homework.poll_tenant(bot, tenant, scheduler)
+        assert scheduler.snapshot() == {}, (
+            'Опрос получателя с отозванным токеном должен прекратиться.'
+        )
+        assert 'Сбой в работе' in tenant.last_message
+
+    def test_main_stops_on_auth_error(self, monkeypatch, tmp_path):
+        respond(monkeypatch, 401)
+        monkeypatch.setattr(homework, 'STATE_DB', str(tmp_path / 'state.db'))
+        sent = []
+        monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'token')
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abc')
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '1')
+        monkeypatch.setattr(telebot, 'TeleBot', MockTelegramBot)
+        monkeypatch.setattr(homework, 'TeleBot', MockTelegramBot)
+        monkeypatch.setattr(
+            homework, 'send_message',
+            lambda bot, message: sent.append(message) or True
+        )
+        closed = []
+        monkeypatch.setattr(
+            homework, 'close_state',
+            lambda store, outbox=None: closed.append(store) or store.close()
+        )
+        with pytest.raises(AuthError):
+            homework.main()
+        assert len(sent) == 1, 'О сбое нужно сообщить один раз.'
+        assert len(closed) == 1 and closed[0] is not None, (
+            'После остановки опроса хранилище нужно закрыть.'
+        )
+        with pytest.raises(sqlite3.ProgrammingError):
+            closed[0].load_cursor('token')
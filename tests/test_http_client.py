@@ -0,0 +1,93 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_client import ApiClient
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'homeworks': [], 'current_date': 0}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class DroppingHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests = 0
+
+    def do_GET(self):
+        DroppingHandler.requests += 1
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+class TestApiClient:
+
+    def test_connection_reused(self, server_url):
+        client = ApiClient()
+        for _ in range(5):
+            assert client.get(server_url, timeout=1).json()['homeworks'] == []
+        stats = client.stats()
+        assert stats['requests'] == 5, (
+            'Все запросы должны учитываться в статистике пула.'
+        )
+        assert stats['new_connections'] == 1, (
+            'Keep-alive соединение должно переиспользоваться.'
+        )
+        assert stats['reused_connections'] == 4
+        client.close()
+
+    def test_reset_keeps_stats(self, server_url):
+        client = ApiClient()
+        client.get(server_url, timeout=1)
+        client.reset()
+        client.get(server_url, timeout=1)
+        stats = client.stats()
+        assert stats['requests'] == 2
+        assert stats['new_connections'] == 2
+        assert stats['reconnects'] == 1
+        client.close()
+
+    def test_dropped_connection_not_retried(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), DroppingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        client = ApiClient()
+        try:
+            with pytest.raises(requests.exceptions.ConnectionError):
+                client.get(
+                    f'http://127.0.0.1:{server.server_address[1]}/',
+                    timeout=1
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+            client.close()
+        assert DroppingHandler.requests == 1, (
+            'Повтор запроса решает RetryPolicy, а не клиент.'
+        )
+        assert client.stats()['reconnects'] == 1
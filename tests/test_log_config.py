@@ -0,0 +1,38 @@
+import gzip
+import logging
+
+from log_config import SamplingFilter, create_file_handler
+
+
+def make_record(message):
+    return logging.LogRecord(
+        'homework', logging.DEBUG, __file__, 1, message, None, None
+    )
+
+
+class TestLogConfig:
+
+    def test_sampling_filter(self):
+        sampler = SamplingFilter(messages=('повтор',), rate=3)
+        passed = [
+            record.msg for record in (make_record('повтор') for _ in range(7))
+            if sampler.filter(record)
+        ]
+        assert passed == [
+            'повтор',
+            'повтор (пропущено повторов: 2)',
+            'повтор (пропущено повторов: 2)',
+        ]
+        assert sampler.filter(make_record('другое'))
+
+    def test_rotated_logs_are_compressed(self, tmp_path):
+        path = tmp_path / 'bot.log'
+        handler = create_file_handler(str(path), max_bytes=100, backup_count=2)
+        for number in range(10):
+            handler.emit(make_record(f'строка лога номер {number}'))
+        handler.close()
+        archive = tmp_path / 'bot.log.1.gz'
+        assert archive.exists(), 'Старые файлы лога должны сжиматься.'
+        with gzip.open(archive, 'rt', encoding='UTF-8') as log_file:
+            assert 'строка лога' in log_file.read()
+        assert not (tmp_path / 'bot.log.3.gz').exists()
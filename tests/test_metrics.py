@@ -0,0 +1,65 @@
+import urllib.request
+
+import pytest
+
+import homework
+import metrics
+from metrics import Counter, Gauge, Histogram, Registry, start_metrics_server
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+class TestMetrics:
+
+    def test_render_counter_and_histogram(self, registry):
+        responses = Counter(
+            'api_responses', 'Ответы API.', label='code', values=(200, 500),
+            registry=registry
+        )
+        latency = Histogram(
+            'api_seconds', 'Задержка.', buckets=(0.1, 1), registry=registry
+        )
+        responses.labels(200).inc()
+        responses.labels(200).inc()
+        responses.labels(404).inc()
+        latency.observe(0.1)
+        latency.observe(5)
+        text = registry.render()
+        assert 'api_responses_total{code="200"} 2' in text
+        assert 'api_responses_total{code="500"} 0' in text, (
+            'Заранее объявленные серии должны отдаваться с нулём.'
+        )
+        assert 'api_responses_total{code="404"} 1' in text
+        assert 'api_seconds_bucket{le="0.1"} 1' in text
+        assert 'api_seconds_bucket{le="+Inf"} 2' in text
+        assert 'api_seconds_count 2' in text
+        assert '# TYPE api_seconds histogram' in text
+
+    def test_gauge_function(self, registry):
+        gauge = Gauge('lag_seconds', 'Отставание.', registry=registry)
+        gauge.set_function(lambda: 42)
+        assert 'lag_seconds 42' in registry.render()
+
+    def test_http_endpoint(self):
+        server = start_metrics_server(0)
+        port = server.server_address[1]
+        try:
+            with urllib.request.urlopen(
+                f'http://127.0.0.1:{port}/metrics', timeout=1
+            ) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'homework_api_request_seconds_bucket' in body
+        assert 'homework_seconds_since_last_success' in body
+
+    def test_validation_does_not_mark_poll(self, monkeypatch):
+        monkeypatch.setattr(metrics, '_last_success', [0])
+        assert homework.check_response({'homeworks': []}) == []
+        assert metrics._last_success == [0], (
+            'check_response проверяет ответ и не отмечает успешный опрос.'
+        )
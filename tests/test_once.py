@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+import pytest
+
+import homework
+from benchmarks.bench_e2e import pointed_to
+from benchmarks.stubs import StubServer
+
+
+@pytest.fixture
+def once_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'token')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:stub')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '1')
+    monkeypatch.setattr(homework, 'STATE_DB', str(tmp_path / 'state.db'))
+
+
+class TestOnce:
+
+    def test_runs_continue_each_other(self, once_env):
+        with StubServer() as server, pointed_to(server):
+            assert homework.run_once() == 0
+            assert homework.run_once() == 0
+        assert server.counters == {'api': 2, 'telegram': 1}, (
+            'Повторный запуск не должен повторять уведомление.'
+        )
+
+    def test_error_reported_once_across_runs(self, once_env, monkeypatch):
+        with StubServer() as server, pointed_to(server):
+            monkeypatch.setattr(homework, 'ENDPOINT', 'http://127.0.0.1:1/')
+            assert homework.run_once() == 1
+            assert homework.run_once() == 1
+        assert server.counters['telegram'] == 1, (
+            'Об одной и той же ошибке нужно сообщать один раз.'
+        )
+
+    @pytest.mark.timeout(10)
+    def test_heavy_modules_are_deferred(self):
+        output = subprocess.run(
+            [
+                sys.executable, '-c',
+                'import sys, homework; '
+                'print(sorted({"telebot", "asyncio"} & set(sys.modules)))'
+            ],
+            capture_output=True, text=True, check=True
+        ).stdout
+        assert output.strip() == '[]', (
+            'telebot и asyncio должны импортироваться только при надобности.'
+        )
@@ -0,0 +1,117 @@
+import threading
+import time
+
+from outbound import OutboundQueue, TokenBucket
+
+
+class RecordingSender:
+    def __init__(self, failures=()):
+        self.sent = []
+        self.failures = list(failures)
+        self.done = threading.Event()
+
+    def __call__(self, chat_id, text):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((chat_id, text))
+        self.done.set()
+
+
+class ThrottledError(Exception):
+    retry_after = 0.01
+
+
+class TestOutboundQueue:
+
+    def test_messages_are_coalesced_per_chat(self):
+        sender = RecordingSender()
+        queue = OutboundQueue(sender, coalesce_window=0.05)
+        queue.send_message(1, 'первое')
+        queue.send_message(1, 'второе')
+        queue.send_message(2, 'третье')
+        assert queue.close(timeout=1)
+        assert sorted(sender.sent) == [
+            (1, 'первое\n\nвторое'), (2, 'третье')
+        ], 'Сообщения одного чата должны объединяться в одно.'
+        stats = queue.stats()
+        assert stats['sent'] == 2
+        assert stats['delivered'] == 3
+        assert stats['coalesced'] == 1
+        assert stats['depth'] == 0
+
+    def test_retry_after_is_honoured(self):
+        sender = RecordingSender(failures=[ThrottledError('429')])
+        queue = OutboundQueue(sender, coalesce_window=0, chat_rate=100)
+        queue.send_message(1, 'текст')
+        assert sender.done.wait(1)
+        assert queue.close(timeout=1)
+        assert sender.sent == [(1, 'текст')]
+        assert queue.stats()['throttled'] == 1
+
+    def test_message_dropped_after_retries(self):
+        sender = RecordingSender(failures=[ValueError('сбой')] * 2)
+        queue = OutboundQueue(
+            sender, coalesce_window=0, chat_rate=100, max_retries=1,
+            retry_backoff=0.01
+        )
+        queue.send_message(1, 'текст')
+        queue.close(timeout=3)
+        assert sender.sent == []
+        assert queue.stats()['dropped'] == 1
+
+    def test_outage_longer_than_retries_is_survived(self):
+        sender = RecordingSender(failures=[ConnectionError('сбой')] * 4)
+        queue = OutboundQueue(
+            sender, coalesce_window=0, chat_rate=100, max_retries=1,
+            retry_backoff=0.01, max_backoff=0.02
+        )
+        queue.send_message(1, 'текст')
+        assert sender.done.wait(1), (
+            'Сбой Telegram должен повторяться, пока сообщение не уйдёт.'
+        )
+        assert queue.close(timeout=1)
+        assert sender.sent == [(1, 'текст')]
+        assert queue.stats()['dropped'] == 0
+
+    def test_rejected_message_dropped(self):
+        rejected = ValueError('400')
+        rejected.error_code = 400
+        sender = RecordingSender(failures=[rejected] * 2)
+        queue = OutboundQueue(
+            sender, coalesce_window=0, chat_rate=100, max_retries=1,
+            retry_backoff=0.01
+        )
+        queue.send_message(1, 'не дойдёт')
+        deadline = time.monotonic() + 1
+        while not queue.stats()['dropped'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert queue.stats()['dropped'] == 1, (
+            'Отклонённое Telegram сообщение не должно повторяться вечно.'
+        )
+        assert queue.close(timeout=1)
+
+    def test_send_now_shares_rate_limits(self):
+        sender, waits = RecordingSender(), []
+        queue = OutboundQueue(
+            sender, workers=0, chat_rate=1, clock=lambda: 0,
+            sleep=waits.append
+        )
+        queue.send_now(1, 'первое')
+        queue.send_now(1, 'второе')
+        queue.send_now(2, 'третье')
+        assert sender.sent == [(1, 'первое'), (1, 'второе'), (2, 'третье')]
+        assert waits == [1], (
+            'Прямая отправка должна ждать токена чата, как очередь.'
+        )
+        assert queue.close(timeout=1)
+
+
+class TestTokenBucket:
+
+    def test_reserve_returns_wait(self):
+        bucket = TokenBucket(rate=1, capacity=2, now=0)
+        assert bucket.reserve(0) == 0
+        assert bucket.reserve(0) == 0
+        assert bucket.reserve(0) == 1
+        assert bucket.reserve(0) == 2
+        assert bucket.reserve(10) == 0
@@ -0,0 +1,192 @@
+import json
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+from conditional import ResponseCache
+from outbound import OutboundQueue
+from outbox import OutboxDrainer
+from state_store import StateStore
+from tenants import Tenant
+from tests.test_conditional import HOMEWORK, Response
+
+
+class TelegramError(Exception):
+
+    def __init__(self, error_code=None):
+        super().__init__(f'Telegram {error_code}')
+        self.error_code = error_code
+
+
+class Telegram:
+
+    def __init__(self):
+        self.down = set()
+        self.down_code = None
+        self.sent = []
+
+    def send(self, chat_id, message):
+        if chat_id in self.down:
+            raise TelegramError(self.down_code)
+        self.sent.append((chat_id, message))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    yield store
+    store.close()
+
+
+def drainer(store, telegram, **kwargs):
+    now = [1000.0]
+    outbox = OutboxDrainer(
+        store, telegram.send, clock=lambda: now[0], start=False, **kwargs
+    )
+    return outbox, now
+
+
+class TestOutbox:
+
+    def test_chat_order_and_retry(self, store):
+        telegram = Telegram()
+        outbox, now = drainer(store, telegram)
+        outbox.enqueue('tenant', [1, 2], 'первое')
+        outbox.enqueue('tenant', [1], 'второе')
+        store.flush()
+        telegram.down.add(1)
+        assert outbox.drain() == 1
+        assert telegram.sent == [(2, 'первое')], (
+            'Сбой одного чата не должен задерживать другие.'
+        )
+        telegram.down.clear()
+        assert outbox.drain() == 0, 'Повтор должен ждать паузы.'
+        now[0] += 1
+        assert outbox.drain() == 2
+        assert telegram.sent[1:] == [(1, 'первое'), (1, 'второе')], (
+            'Сообщения чата должны доставляться по порядку.'
+        )
+        assert outbox.stats() == {
+            'depth': 0, 'enqueued': 3, 'delivered': 3, 'retries': 1,
+            'dropped': 0,
+        }
+
+    def test_backlogged_chat_does_not_starve_others(self, store):
+        telegram = Telegram()
+        telegram.down.add(1)
+        telegram.down_code = HTTPStatus.TOO_MANY_REQUESTS
+        outbox, now = drainer(store, telegram)
+        for number in range(150):
+            outbox.enqueue('tenant', [1], f'сообщение {number}')
+        outbox.enqueue('tenant', [2], 'другому чату')
+        outbox.enqueue('tenant', [3], 'третьему чату')
+        store.flush()
+        assert outbox.drain() == 2
+        assert telegram.sent == [(2, 'другому чату'), (3, 'третьему чату')], (
+            'Отложенный чат с длинной очередью не должен задерживать другие.'
+        )
+        outbox.enqueue('tenant', [2], 'ещё одно')
+        store.flush()
+        assert outbox.drain() == 1, 'Отложенный чат ждёт своей паузы.'
+        telegram.down.clear()
+        now[0] += 10
+        assert outbox.drain() == outbox.batch_size
+        assert telegram.sent[3:5] == [(1, 'сообщение 0'), (1, 'сообщение 1')]
+        assert store.outbox_depth() == 150 - outbox.batch_size
+
+    def test_outbox_sends_through_outbound_limits(self, monkeypatch, store):
+        monkeypatch.setattr(homework, 'OUTBOX', True)
+        telegram, waits = Telegram(), []
+        queue = OutboundQueue(
+            telegram.send, workers=0, clock=lambda: 0, sleep=waits.append
+        )
+        outbox = homework.open_outbox(store, queue)
+        outbox.enqueue('tenant', [1], 'первое')
+        outbox.enqueue('tenant', [1], 'второе')
+        store.flush()
+        assert outbox.close(timeout=1)
+        assert telegram.sent == [(1, 'первое'), (1, 'второе')]
+        assert waits == [1], 'Outbox должен соблюдать лимиты очереди.'
+
+    def test_replay_after_restart(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        store = StateStore(path)
+        telegram = Telegram()
+        outbox, _ = drainer(store, telegram)
+        outbox.enqueue('tenant', [1], 'статус')
+        store.close()
+
+        store = StateStore(path)
+        outbox, _ = drainer(store, telegram)
+        outbox.enqueue('tenant', [1], 'статус')
+        store.flush()
+        assert store.outbox_depth() == 1, (
+            'Повторно записанное сообщение не должно дублироваться.'
+        )
+        assert outbox.drain() == 1
+        assert telegram.sent == [(1, 'статус')]
+        store.close()
+
+    def test_rejected_message_dropped(self, store):
+        telegram = Telegram()
+        telegram.down.add(1)
+        telegram.down_code = HTTPStatus.BAD_REQUEST
+        outbox, now = drainer(store, telegram, max_retries=2)
+        outbox.enqueue('tenant', [1], 'не дойдёт')
+        outbox.enqueue('tenant', [1], 'дойдёт')
+        store.flush()
+        outbox.drain()
+        now[0] += 10
+        outbox.drain()
+        telegram.down.clear()
+        now[0] += 10
+        assert outbox.drain() == 1
+        assert telegram.sent == [(1, 'дойдёт')]
+        assert outbox.stats()['dropped'] == 1
+
+    def test_cursor_advances_while_telegram_down(
+        self, monkeypatch, store
+    ):
+        monkeypatch.setattr(homework, 'response_cache', ResponseCache())
+        payload = json.dumps(
+            {'homeworks': [HOMEWORK], 'current_date': 500}
+        ).encode()
+        monkeypatch.setattr(
+            requests, 'get', lambda **kwargs: Response(200, payload)
+        )
+        telegram = Telegram()
+        telegram.down.add(1)
+        outbox, _ = drainer(store, telegram)
+        tenant = Tenant('token', [1], 0, store)
+        homework.process_tenant(None, tenant, outbox)
+        homework.flush_state(store, outbox)
+        assert tenant.timestamp == 500, (
+            'Курсор должен сдвигаться, не дожидаясь Telegram.'
+        )
+        assert outbox.drain() == 0
+        assert store.outbox_depth() == 1
+
+    def test_repeated_text_of_new_change_is_kept(self, monkeypatch, store):
+        monkeypatch.setattr(homework, 'response_cache', ResponseCache())
+        outbox, _ = drainer(store, Telegram())
+        tenant = Tenant('token', [1], 0, store)
+        for current_date, status in enumerate(
+            ('reviewing', 'rejected', 'reviewing'), start=500
+        ):
+            payload = json.dumps({
+                'homeworks': [dict(
+                    HOMEWORK, status=status, date_updated=str(current_date)
+                )],
+                'current_date': current_date,
+            }).encode()
+            monkeypatch.setattr(
+                requests, 'get',
+                lambda payload=payload, **kwargs: Response(200, payload)
+            )
+            homework.process_tenant(None, tenant, outbox)
+            homework.flush_state(store, outbox)
+        assert store.outbox_depth() == 3, (
+            'Новое изменение с прежним текстом не должно отбрасываться.'
+        )
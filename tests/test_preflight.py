@@ -0,0 +1,125 @@
+import time
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+from exceptions import AuthError
+from preflight import Preflight, TokenStatus
+from tenants import Tenant
+from tests.check_utils import MockResponseGET
+
+
+class Response(MockResponseGET):
+    headers = {}
+
+
+class Bot:
+
+    def __init__(self, error=None):
+        self.error = error
+        self.sent = []
+
+    def get_me(self):
+        if self.error is not None:
+            raise self.error
+
+    def send_message(self, chat_id, message):
+        self.sent.append((chat_id, message))
+
+
+class TelegramError(Exception):
+    error_code = HTTPStatus.UNAUTHORIZED
+
+
+def is_auth_error(error):
+    return isinstance(error, AuthError)
+
+
+@pytest.fixture
+def fresh_preflight(monkeypatch):
+    monkeypatch.setattr(
+        homework, 'preflight', Preflight(homework.is_rejected_token)
+    )
+
+
+class TestPreflight:
+
+    def test_checks_run_concurrently(self):
+        def probe():
+            time.sleep(0.2)
+
+        started = time.perf_counter()
+        report = Preflight(is_auth_error).check_all(
+            {key: probe for key in range(5)}
+        )
+        assert time.perf_counter() - started < 0.6, (
+            'Токены должны проверяться одновременно.'
+        )
+        assert {result.status for result in report.values()} == {
+            TokenStatus.VALID
+        }
+
+    def test_results_cached_until_ttl(self):
+        now = [0.0]
+        calls = []
+
+        def probe(error=None):
+            calls.append(error)
+            if error is not None:
+                raise error
+
+        preflight = Preflight(is_auth_error, ttl=60, clock=lambda: now[0])
+        probes = {
+            'valid': probe,
+            'invalid': lambda: probe(AuthError('401')),
+            'unknown': lambda: probe(ConnectionError('обрыв')),
+        }
+        report = preflight.check_all(probes)
+        assert {key: result.status for key, result in report.items()} == {
+            'valid': TokenStatus.VALID,
+            'invalid': TokenStatus.INVALID,
+            'unknown': TokenStatus.UNKNOWN,
+        }
+        preflight.check_all(probes)
+        assert len(calls) == 4, (
+            'Повторно проверяется только токен с неизвестным итогом.'
+        )
+        now[0] = 61
+        preflight.check_all(probes)
+        assert len(calls) == 7
+
+    def test_slow_check_is_unknown(self):
+        started = time.perf_counter()
+        report = Preflight(is_auth_error, timeout=0.1).check_all(
+            {'slow': lambda: time.sleep(0.5)}
+        )
+        assert time.perf_counter() - started < 0.3
+        assert report['slow'].status is TokenStatus.UNKNOWN
+
+    def test_invalid_tenants_excluded(self, monkeypatch, fresh_preflight):
+        def get(**kwargs):
+            bad = kwargs['headers']['Authorization'] == 'OAuth bad'
+            return Response(
+                http_status=HTTPStatus.UNAUTHORIZED if bad else HTTPStatus.OK
+            )
+
+        monkeypatch.setattr(requests, 'get', get)
+        good, bad = Tenant('good', [1]), Tenant('bad', [2])
+        bot = Bot()
+        assert homework.preflight_tenants([good, bad], bot) == [good]
+        assert [chat_id for chat_id, _ in bot.sent] == [2], (
+            'Получатель с отклонённым токеном должен узнать о причине.'
+        )
+
+    def test_rejected_bot_token_stops_start(
+        self, monkeypatch, fresh_preflight
+    ):
+        monkeypatch.setattr(
+            requests, 'get', lambda **kwargs: Response(http_status=200)
+        )
+        with pytest.raises(TelegramError):
+            homework.preflight_tenants(
+                [Tenant('good', [1])], Bot(TelegramError('Unauthorized'))
+            )
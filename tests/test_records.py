@@ -0,0 +1,46 @@
+import sys
+
+import pytest
+
+import homework
+from exceptions import ResponseKeyError, ResponseTypeError, UnknownStatusError
+from records import Homework, Status, parse_homeworks
+
+
+class TestRecords:
+
+    def test_record_maps_onto_verdicts(self):
+        first, second = parse_homeworks([
+            {'id': 1, 'homework_name': 'hw.zip', 'status': 'approved',
+             'reviewer_comment': 'Отлично', 'date_updated': '2024-01-01'},
+            {'homework_name': ''.join(['hw', '.zip']), 'status': 'approved'},
+        ])
+        assert first == Homework(1, 'hw.zip', Status.APPROVED, '2024-01-01')
+        assert first.status is second.status is Status.APPROVED, (
+            'Статус записи должен быть членом перечисления Status.'
+        )
+        assert first.name is second.name, 'Название работы интернируется.'
+        assert (first.key, second.key) == (1, 'hw.zip')
+        assert not hasattr(first, '__dict__')
+        assert sys.getsizeof(first) < sys.getsizeof({
+            'id': 1, 'homework_name': 'hw.zip', 'status': 'approved',
+            'date_updated': '2024-01-01',
+        })
+        assert homework.parse_record(first) == homework.parse_status({
+            'homework_name': 'hw.zip', 'status': 'approved'
+        }) == (
+            'Изменился статус проверки работы "hw.zip". '
+            + homework.HOMEWORK_VERDICTS['approved']
+        )
+        assert f'{Status.REJECTED}' == 'rejected'
+
+    @pytest.mark.parametrize('homeworks, error', [
+        ({'homeworks': []}, ResponseTypeError),
+        (['hw.zip'], ResponseTypeError),
+        ([{'homework_name': 'hw.zip'}], ResponseKeyError),
+        ([{'status': 'approved'}], ResponseKeyError),
+        ([{'homework_name': 'hw.zip', 'status': 'new'}], UnknownStatusError),
+    ])
+    def test_invalid_homeworks(self, homeworks, error):
+        with pytest.raises(error):
+            parse_homeworks(homeworks)
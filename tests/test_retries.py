@@ -0,0 +1,134 @@
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+from retries import Hedger, LatencyTracker, RetryBudget, RetryPolicy
+from tests.check_utils import MockResponseGET
+
+
+class Response(MockResponseGET):
+    headers = {}
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(homework, 'retry_policy', RetryPolicy(2, backoff=0))
+    monkeypatch.setattr(homework, 'retry_budget', RetryBudget())
+
+
+def warmed_hedger(latency, samples=20):
+    tracker = LatencyTracker()
+    for _ in range(samples):
+        tracker.add(latency)
+    return Hedger(0.9, tracker)
+
+
+class TestRetries:
+
+    def test_policy_and_budget(self):
+        policy = RetryPolicy(backoff=1, max_backoff=3, seed=1)
+        assert all(0 <= policy.delay(5) <= 3 for _ in range(100))
+        budget = RetryBudget(ratio=0.5, minimum=2)
+        assert budget.withdraw() and budget.withdraw()
+        assert not budget.withdraw(), 'Бюджет повторов должен кончаться.'
+        budget.deposit()
+        budget.deposit()
+        assert budget.withdraw()
+
+    def test_request_api_retries_server_errors(self, monkeypatch, no_backoff):
+        calls = []
+
+        def get(**kwargs):
+            calls.append(kwargs)
+            status = HTTPStatus.OK if len(calls) == 3 else 502
+            return Response(http_status=status)
+
+        monkeypatch.setattr(requests, 'get', get)
+        assert homework.get_api_answer(0) == {
+            'homeworks': [], 'current_date': None
+        }
+        assert len(calls) == 3
+        assert calls[0]['timeout'] == (
+            homework.API_CONNECT_TIMEOUT, homework.API_READ_TIMEOUT
+        ), 'Запрос к API должен идти с таймаутами.'
+
+    @pytest.mark.parametrize('status', [401, 404, 429])
+    def test_client_errors_not_retried(self, monkeypatch, no_backoff, status):
+        calls = []
+
+        def get(**kwargs):
+            calls.append(kwargs)
+            return Response(http_status=status)
+
+        monkeypatch.setattr(requests, 'get', get)
+        with pytest.raises(homework.InvalidResponseCodeError):
+            homework.get_api_answer(0)
+        assert len(calls) == 1
+
+    def test_hedge_wins_over_stalled_attempt(self):
+        hedger = warmed_hedger(0.01)
+        calls, discarded = [], []
+        release = threading.Event()
+
+        def attempt():
+            calls.append(None)
+            if len(calls) == 1:
+                release.wait(1)
+                return 'slow'
+            return 'fast'
+
+        started = time.perf_counter()
+        result = hedger.call(attempt, discard=discarded.append)
+        assert result == ('fast', True)
+        assert time.perf_counter() - started < 0.5
+        release.set()
+        hedger.shutdown()
+        time.sleep(0.05)
+        assert discarded == ['slow'], (
+            'Ответ проигравшей попытки должен освобождаться.'
+        )
+
+    def test_hedge_waits_for_second_after_failure(self):
+        hedger = warmed_hedger(0.01)
+        calls = []
+
+        def attempt():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                raise ConnectionError('обрыв')
+            time.sleep(0.2)
+            return 'ok'
+
+        assert hedger.call(attempt) == ('ok', True)
+        hedger.shutdown()
+
+    def test_first_attempts_not_limited_by_hedge_pool(self):
+        tracker = LatencyTracker()
+        for _ in range(20):
+            tracker.add(0.05)
+        hedger = Hedger(0.9, tracker, RetryBudget(), max_workers=1)
+        threads = [
+            threading.Thread(
+                target=hedger.call, args=(lambda: time.sleep(0.1),)
+            )
+            for _ in range(8)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert time.perf_counter() - started < 0.5, (
+            'Первые попытки не должны ждать очереди пула дублей.'
+        )
+        hedger.shutdown()
+
+    def test_no_hedge_without_samples(self):
+        hedger = Hedger(0.9)
+        assert hedger.call(lambda: 'ok') == ('ok', False)
+        hedger.shutdown()
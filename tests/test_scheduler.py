@@ -0,0 +1,136 @@
+import pytest
+
+import homework
+from clock import VirtualClock
+from exceptions import ErrorPolicy
+from scheduler import PollScheduler, parse_retry_after, spread_offset
+from tenants import Tenant
+from updates import latest_statuses
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = PollScheduler(
+        period=600, reviewing_period=120, error_period=60,
+        max_period=3600, idle_cycles=2, jitter=0
+    )
+    scheduler.add('tenant', 0)
+    return scheduler
+
+
+class TestPollScheduler:
+
+    def test_first_poll_is_due_immediately(self, scheduler):
+        assert scheduler.due(0) == ['tenant']
+        assert scheduler.due(0) == [], (
+            'Получатель не должен опрашиваться дважды за один момент.'
+        )
+
+    def test_reviewing_polls_faster(self, scheduler):
+        assert scheduler.record_success('tenant', {1: 'reviewing'}, 0) == 120
+        assert scheduler.record_success('tenant', {}, 120) == 240, (
+            'Пока работа на ревью, опрос должен оставаться частым.'
+        )
+        assert scheduler.record_success(
+            'tenant', {2: 'approved'}, 240
+        ) == 360, 'Изменение другой работы не снимает первую с ревью.'
+        assert scheduler.record_success('tenant', {1: 'approved'}, 360) == 960
+
+    def test_review_follows_latest_status(self, scheduler):
+        statuses = latest_statuses([
+            {'id': 1, 'status': 'reviewing', 'date_updated': '2024-01-01'},
+            {'id': 1, 'status': 'approved', 'date_updated': '2024-01-02'},
+        ])
+        assert statuses == {1: 'approved'}
+        assert scheduler.record_success('tenant', statuses, 0) == 600, (
+            'Работа, принятая в том же окне, не должна держать частый опрос.'
+        )
+
+    def test_idle_backoff(self, scheduler):
+        intervals = []
+        now = 0
+        for _ in range(6):
+            next_at = scheduler.record_success('tenant', [], now)
+            intervals.append(next_at - now)
+            now = next_at
+        assert intervals == [600, 600, 1200, 2400, 3600, 3600]
+
+    def test_error_backoff_and_retry_after(self, scheduler):
+        assert scheduler.record_error('tenant', 0) == 60
+        assert scheduler.record_error('tenant', 0) == 120
+        assert scheduler.record_error('tenant', 0, retry_after=900) == 900
+        assert scheduler.record_success('tenant', [], 0) == 600
+
+    def test_snapshot_and_next_due(self, scheduler):
+        scheduler.add('other', 50)
+        scheduler.due(0)
+        scheduler.record_success('tenant', [], 0)
+        assert scheduler.snapshot() == {'tenant': 600, 'other': 50}
+        assert scheduler.next_due() == 50
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('120') == 120
+        assert parse_retry_after(
+            'Wed, 21 Oct 2015 07:28:00 GMT', now=1445412470
+        ) == 10
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None
+
+    def test_error_policies(self, scheduler):
+        scheduler.add('other', 0)
+        assert scheduler.record_error(
+            'tenant', 0, policy=ErrorPolicy.RETRY_SOON
+        ) == 10, 'Сбой сервера должен повторяться быстрее обычной ошибки.'
+        assert scheduler.record_error('other', 0) == 60
+        assert scheduler.record_error(
+            'tenant', 0, policy=ErrorPolicy.STOP
+        ) is None
+        assert scheduler.due(10_000) == ['other'], (
+            'Получатель с отозванным токеном не должен опрашиваться.'
+        )
+
+    def test_jitter_is_constant_per_tenant(self):
+        first, second = PollScheduler(jitter=0.1), PollScheduler(jitter=0.1)
+        intervals = []
+        for scheduler in (first, second):
+            for key in ('a', 'b', 'c'):
+                scheduler.add(key, 0)
+            intervals.append([
+                scheduler.record_success(key, {}, 0) for key in 'abc'
+            ])
+        assert intervals[0] == intervals[1], (
+            'Разброс интервала получателя не должен меняться между запусками.'
+        )
+        assert len(set(intervals[0])) == 3
+        assert all(540 <= interval <= 660 for interval in intervals[0])
+
+    def test_spread_offset(self):
+        offsets = [spread_offset(key, 600) for key in range(1000)]
+        assert offsets == [spread_offset(key, 600) for key in range(1000)], (
+            'Сдвиг получателя должен быть постоянным между запусками.'
+        )
+        assert all(0 <= offset < 600 for offset in offsets)
+        assert sum(offset < 60 for offset in offsets) < 150, (
+            'Первые опросы должны распределяться по всему окну.'
+        )
+        assert spread_offset('tenant', 0) == 0
+
+    def test_spread_scales_with_tenants(self):
+        clock = VirtualClock(1000)
+        single = homework.create_scheduler(
+            [Tenant('token', [1], 0)], clock, spread=600
+        )
+        assert single.due(1000), (
+            'Единственный получатель опрашивается сразу после старта.'
+        )
+        tenants = [Tenant(f'token-{number}', [1], 0) for number in range(50)]
+        many = homework.create_scheduler(tenants, clock, spread=600)
+        firsts = [many.snapshot()[tenant] for tenant in tenants]
+        assert all(1000 <= first < 1000 + 600 * 49 / 50 for first in firsts)
+        assert len(many.due(1000 + 60)) < 25
+
+    def test_first_poll_delay(self, scheduler):
+        scheduler.add('late', 0, delay=30)
+        assert scheduler.due(29) == ['tenant']
+        assert scheduler.next_due() == 30
+        assert scheduler.due(30) == ['late']
@@ -0,0 +1,114 @@
+import asyncio
+import inspect
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+import homework
+from async_engine import AsyncEngine
+from clock import VirtualClock
+from exceptions import ShutdownRequested
+from scheduler import PollScheduler
+from shutdown import GracefulShutdown
+
+
+def send_signal_later(signum=signal.SIGTERM, delay=0.1):
+    timer = threading.Timer(delay, os.kill, (os.getpid(), signum))
+    timer.start()
+    return timer
+
+
+class TestShutdown:
+
+    def test_signal_interrupts_sleep(self):
+        previous = signal.getsignal(signal.SIGTERM)
+        started = time.perf_counter()
+        with GracefulShutdown() as shutdown:
+            send_signal_later()
+            with shutdown.interruptible():
+                time.sleep(5)
+        assert time.perf_counter() - started < 1, (
+            'Сигнал должен прерывать ожидание сразу.'
+        )
+        assert shutdown.requested
+        assert signal.getsignal(signal.SIGTERM) is previous, (
+            'После остановки прежний обработчик должен вернуться.'
+        )
+
+    def test_signal_waits_for_cycle_end(self):
+        with GracefulShutdown() as shutdown:
+            os.kill(os.getpid(), signal.SIGTERM)
+            assert shutdown.requested, 'Первый сигнал только взводит флаг.'
+            with pytest.raises(ShutdownRequested):
+                os.kill(os.getpid(), signal.SIGTERM)
+
+    def test_run_schedule_stops_on_event(self):
+        clock = VirtualClock(0)
+        scheduler = PollScheduler()
+        scheduler.add('tenant', 0)
+        stop = threading.Event()
+        cycles = []
+
+        def run_cycle(due):
+            cycles.append(due)
+            for key in due:
+                scheduler.record_success(key, [], clock.time())
+            if len(cycles) == 2:
+                stop.set()
+
+        assert homework.run_schedule(
+            scheduler, run_cycle, clock, stop=stop
+        ) == 2
+
+    def test_main_exits_on_sigterm(self, monkeypatch):
+        closed = []
+
+        class Store:
+            def load_cursor(self, key):
+                return None
+
+            def load_last_message(self, key):
+                return None
+
+            def flush(self):
+                pass
+
+            def close(self):
+                closed.append(True)
+
+        monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'token')
+        monkeypatch.setattr(homework, 'check_tokens', lambda: None)
+        monkeypatch.setattr(homework, 'TeleBot', lambda token: None)
+        monkeypatch.setattr(homework, 'open_state_store', Store)
+        monkeypatch.setattr(
+            homework, 'get_api_answer', lambda timestamp: {'homeworks': []}
+        )
+        timer = send_signal_later()
+        try:
+            # Проверки бота оборачивают main таймаутом в одну секунду.
+            inspect.unwrap(homework.main)()
+        finally:
+            timer.cancel()
+        assert closed, 'Хранилище должно закрываться при остановке.'
+
+    def test_async_cycle_cancelled_after_timeout(self):
+        engine = AsyncEngine('http://127.0.0.1:1/', '1234:stub', None, None)
+
+        async def slow_cycle(tenants, scheduler=None):
+            await asyncio.sleep(10)
+
+        engine.run_cycle = slow_cycle
+
+        async def run():
+            stop = asyncio.Event()
+            asyncio.get_running_loop().call_later(0.05, stop.set)
+            await engine.run_cycle_until([], None, stop, timeout=0.1)
+
+        started = time.perf_counter()
+        asyncio.run(run())
+        assert time.perf_counter() - started < 1, (
+            'Цикл должен отменяться через timeout после остановки.'
+        )
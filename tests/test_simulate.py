@@ -0,0 +1,76 @@
+import pytest
+
+import homework
+from benchmarks.simulate import (
+    DAY, HOUR, START, ScriptedApi, Simulation, simulate
+)
+from clock import VirtualClock
+from tenants import Tenant
+
+WALL_FIELDS = ('wall_seconds', 'polls_per_wall_second')
+
+
+class TestVirtualClock:
+
+    def test_sleep_advances_instantly(self):
+        clock = VirtualClock(100)
+        clock.sleep(600)
+        clock.advance(50)
+        assert clock.time() == 700
+        with pytest.raises(ValueError):
+            clock.sleep(-1)
+
+    def test_run_schedule_waits_on_virtual_clock(self):
+        clock = VirtualClock(START)
+        tenants = [Tenant('token', [1], START)]
+        scheduler = homework.create_scheduler(tenants, clock, spread=0)
+        polled = []
+        cycles = homework.run_schedule(
+            scheduler,
+            lambda due: [
+                homework.reschedule(scheduler, tenant, [], None, clock.time())
+                for tenant in due if not polled.append(clock.time())
+            ],
+            clock, until=START + DAY
+        )
+        assert cycles == len(polled) > 1
+        assert START + DAY - homework.RETRY_PERIOD * 64 < polled[-1] <= (
+            START + DAY
+        ), 'Цикл должен идти по виртуальному времени до until.'
+
+
+class TestSimulation:
+
+    def test_deterministic(self):
+        first, second = simulate(20, 1, seed=3), simulate(20, 1, seed=3)
+        for field in WALL_FIELDS:
+            first.pop(field), second.pop(field)
+        assert first == second, 'Симуляция с одним seed должна совпадать.'
+        assert first['notifications'] > 0
+
+    def test_every_event_is_notified(self):
+        timelines = {
+            'token': [
+                (START + HOUR, 1, 'reviewing'),
+                (START + 2 * HOUR, 1, 'approved'),
+                (START + 5 * HOUR, 2, 'reviewing'),
+            ]
+        }
+        clock = VirtualClock(START)
+        simulation = Simulation(
+            ScriptedApi(timelines), [Tenant('token', [1], START)], clock
+        )
+        result = simulation.run(DAY)
+        assert result['notifications'] == 3
+        assert result['latency_max_s'] <= (
+            simulation.scheduler.max_period * 1.1
+        ), 'Статус должен приходить не позже максимального интервала.'
+
+    def test_outage_respects_retry_after(self):
+        outage = (START, START + HOUR, 1200)
+        api = ScriptedApi({'token': []}, [outage])
+        clock = VirtualClock(START)
+        Simulation(api, [Tenant('token', [1], START)], clock).run(HOUR)
+        assert api.errors == 3, (
+            'Во время сбоя опросы должны идти не чаще retry_after.'
+        )
@@ -0,0 +1,54 @@
+
+import pytest
+
+from state_store import StateStore
+from tenants import Tenant
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'state.db')
+
+
+class TestStateStore:
+
+    def test_state_survives_restart(self, db_path):
+        store = StateStore(db_path)
+        tenant = Tenant('token', [1], timestamp=100, store=store)
+        tenant.mark_sent(777, 'approved', 'message')
+        tenant.advance(200)
+        store.close()
+
+        store = StateStore(db_path)
+        restored = Tenant('token', [1], timestamp=300, store=store)
+        assert restored.timestamp == 200, (
+            'После перезапуска курсор должен восстанавливаться из базы.'
+        )
+        assert restored.is_notified(777, 'approved')
+        assert restored.last_message == 'message', (
+            'Последнее сообщение нужно, чтобы не повторять ошибку.'
+        )
+        assert not restored.is_notified(777, 'rejected')
+        assert not Tenant('other', [2], store=store).is_notified(
+            777, 'approved'
+        )
+        store.close()
+
+    def test_writes_are_batched(self, db_path):
+        store = StateStore(db_path, batch_size=3)
+        reader = StateStore(db_path)
+        store.set_cursor('tenant', 1)
+        store.mark_notified('tenant', 1, 'reviewing')
+        assert reader.load_cursor('tenant') is None, (
+            'До flush() изменения не должны попадать в базу.'
+        )
+        store.mark_notified('tenant', 1, 'approved')
+        assert reader.load_cursor('tenant') == 1
+        store.close()
+        reader.close()
+
+    def test_wal_mode(self, db_path):
+        store = StateStore(db_path)
+        mode = store._connection.execute('PRAGMA journal_mode').fetchone()
+        assert mode == ('wal',)
+        store.close()
@@ -0,0 +1,119 @@
+import json
+import tracemalloc
+
+import pytest
+import requests
+
+import homework
+from streaming import iter_homeworks
+
+
+def split(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+def stream(payload, size=7):
+    response = {}
+    homeworks = list(iter_homeworks(
+        split(json.dumps(payload, ensure_ascii=False).encode(), size),
+        response
+    ))
+    return response, homeworks
+
+
+class TestStreaming:
+
+    @pytest.mark.parametrize('size', [1, 3, 64])
+    def test_matches_json_loads(self, size):
+        payload = {
+            'current_date': 1700000000,
+            'homeworks': [
+                {'id': 1, 'homework_name': 'работа.zip', 'status': 'approved'},
+                {'id': 12345, 'status': 'reviewing', 'nested': [1.5, None]},
+            ],
+            'extra': {'key': 'значение'},
+        }
+        response, homeworks = stream(payload, size)
+        assert homeworks == payload['homeworks'], (
+            'Потоковый разбор должен давать те же записи, что json.loads.'
+        )
+        assert response == {
+            'current_date': 1700000000, 'extra': {'key': 'значение'}
+        }
+
+    @pytest.mark.parametrize('payload, error', [
+        ([], TypeError),
+        ({'current_date': 1}, KeyError),
+        ({'homeworks': {}}, TypeError),
+        ({'homeworks': [1]}, TypeError),
+    ])
+    def test_check_response_semantics(self, payload, error):
+        with pytest.raises(error):
+            stream(payload)
+
+    def test_malformed_json(self):
+        with pytest.raises(ValueError):
+            list(iter_homeworks([b'{"homeworks": [{"id": 1}'], {}))
+
+    def test_reads_lazily_with_flat_memory(self):
+        record = json.dumps(
+            {'id': 0, 'homework_name': 'hw.zip', 'status': 'approved',
+             'reviewer_comment': 'x' * 200}
+        ).encode()
+        count = 20000
+        consumed = [0]
+
+        def chunks():
+            yield b'{"homeworks": ['
+            for number in range(count):
+                consumed[0] += 1
+                yield record + (b',' if number < count - 1 else b'')
+            yield b'], "current_date": 1}'
+
+        tracemalloc.start()
+        try:
+            homeworks = iter_homeworks(chunks(), {})
+            next(homeworks)
+            assert consumed[0] < 3, 'Поток должен читаться по мере разбора.'
+            for _ in homeworks:
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak < len(record) * count / 20, (
+            'Пиковая память не должна расти с размером ответа.'
+        )
+
+    def test_stream_homework_statuses(self, monkeypatch):
+        body = json.dumps({
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw', 'status': 'reviewing',
+                 'date_updated': '2024-01-01T00:00:00Z'},
+                {'id': 1, 'homework_name': 'hw', 'status': 'approved',
+                 'date_updated': '2024-01-02T00:00:00Z'},
+            ],
+            'current_date': 200,
+        }).encode()
+
+        class StreamedResponse:
+            status_code = 200
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def iter_content(self, chunk_size):
+                return split(body, 5)
+
+        def get(**kwargs):
+            assert kwargs.get('stream') is True
+            return StreamedResponse()
+
+        monkeypatch.setattr(requests, 'get', get)
+        response, homeworks = homework.stream_homework_statuses(0, {})
+        assert response == {'current_date': 200}
+        assert [item['status'] for item in homeworks] == ['approved'], (
+            'Изменения одной работы должны сворачиваться до последнего.'
+        )
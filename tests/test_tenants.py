@@ -0,0 +1,61 @@
+import json
+import threading
+import time
+
+import pytest
+
+from tenants import TenantPoller, load_tenants
+
+
+@pytest.fixture
+def tenants_file(tmp_path):
+    path = tmp_path / 'tenants.json'
+    path.write_text(json.dumps({
+        'token-1': 111,
+        'token-2': [222, 333],
+    }))
+    return path
+
+
+class TestTenants:
+
+    def test_load_tenants(self, tenants_file):
+        tenants = load_tenants(tenants_file, timestamp=42)
+        assert [tenant.chat_ids for tenant in tenants] == [
+            (111,), (222, 333)
+        ]
+        assert tenants[1].headers == {'Authorization': 'OAuth token-2'}
+        assert all(tenant.timestamp == 42 for tenant in tenants), (
+            'Курсор каждого получателя должен начинаться с timestamp.'
+        )
+
+    def test_load_tenants_rejects_list(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text('[]')
+        with pytest.raises(TypeError):
+            load_tenants(path)
+
+    def test_poller_is_bounded(self):
+        lock = threading.Lock()
+        active = peak = 0
+        polled = []
+
+        def poll(tenant):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.001)
+            with lock:
+                active -= 1
+                polled.append(tenant)
+            if tenant % 7 == 0:
+                raise RuntimeError('API недоступен')
+
+        poller = TenantPoller(poll, max_workers=4)
+        poller.run_cycle(range(200))
+        poller.shutdown()
+        assert sorted(polled) == list(range(200)), (
+            'Ошибка одного получателя не должна прерывать цикл опроса.'
+        )
+        assert peak <= 4
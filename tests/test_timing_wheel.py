@@ -0,0 +1,74 @@
+import random
+
+from timing_wheel import TimingWheel
+
+
+class TestTimingWheel:
+
+    def test_fires_exactly_on_time(self):
+        wheel = TimingWheel()
+        wheel.schedule('a', 10.5)
+        wheel.schedule('b', 3)
+        assert wheel.advance(10.4) == ['b']
+        assert wheel.advance(10.4) == [], (
+            'Таймер не должен срабатывать раньше своего срока.'
+        )
+        assert wheel.advance(10.5) == ['a']
+        assert len(wheel) == 0
+
+    def test_cancel_and_reschedule(self):
+        wheel = TimingWheel()
+        wheel.schedule('a', 5)
+        wheel.schedule('b', 5)
+        wheel.cancel('b')
+        wheel.schedule('a', 50)
+        assert 'b' not in wheel
+        assert wheel.advance(49) == [], (
+            'Повторная постановка должна заменять прежний срок.'
+        )
+        assert wheel.advance(50) == ['a']
+
+    def test_long_timers_cascade(self):
+        wheel = TimingWheel(wheel_size=4, levels=2)
+        wheel.schedule('near', 3)
+        wheel.schedule('far', 1000)
+        assert wheel.next_expiry() == 3
+        assert wheel.advance(999) == ['near']
+        assert wheel.next_expiry() == 1000, (
+            'Таймер за пределами колеса должен сохранять точный срок.'
+        )
+        assert wheel.advance(1000) == ['far']
+
+    def test_next_expiry_across_levels(self):
+        wheel = TimingWheel(wheel_size=4)
+        wheel.schedule('start', 2)
+        wheel.schedule('upper', 6.5)
+        wheel.advance(3)
+        wheel.schedule('lower', 6.9)
+        assert wheel.next_expiry() == 6.5, (
+            'Таймер верхнего уровня может сработать раньше нижнего.'
+        )
+        wheel.cancel('upper')
+        assert wheel.next_expiry() == 6.9
+
+    def test_matches_reference(self):
+        rng = random.Random(0)
+        wheel = TimingWheel(tick=0.5, wheel_size=8, levels=3)
+        timers = {}
+        now = 0.0
+        for _ in range(3000):
+            if rng.random() < 0.6:
+                key = rng.randrange(100)
+                timers[key] = now + rng.choice((
+                    rng.uniform(-1, 5), rng.uniform(0, 100),
+                    rng.uniform(0, 2000)
+                ))
+                wheel.schedule(key, timers[key])
+                continue
+            expected = min(timers.values(), default=None)
+            assert wheel.next_expiry() == expected
+            now += rng.choice((rng.uniform(0, 2), rng.uniform(0, 500)))
+            due = sorted(key for key, at in timers.items() if at <= now)
+            assert sorted(wheel.advance(now)) == due
+            for key in due:
+                del timers[key]
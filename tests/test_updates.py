@@ -0,0 +1,150 @@
+import json
+import time
+
+import requests
+
+import homework
+from records import Status
+from tenants import Tenant
+from tests.test_streaming import split
+from updates import latest_updates, status_history
+
+
+def make_homework(homework_id, status, date_updated):
+    return {
+        'id': homework_id,
+        'homework_name': f'hw{homework_id}.zip',
+        'status': status,
+        'date_updated': date_updated,
+    }
+
+
+class TestUpdates:
+
+    def test_latest_updates_collapse_and_order(self):
+        homeworks = [
+            make_homework(2, 'approved', '2024-01-03T10:00:00Z'),
+            make_homework(1, 'reviewing', '2024-01-01T10:00:00Z'),
+            make_homework(2, 'reviewing', '2024-01-02T10:00:00Z'),
+            make_homework(1, 'rejected', '2024-01-02T12:00:00Z'),
+        ]
+        assert [
+            (update['id'], update['status'])
+            for update in latest_updates(homeworks)
+        ] == [(1, 'rejected'), (2, 'approved')], (
+            'Для каждой работы должен остаться последний статус, '
+            'упорядоченный по date_updated.'
+        )
+
+    def test_deliver_updates_sends_whole_batch(self):
+        tenant = Tenant('token', [1], timestamp=100)
+        sent = []
+        homework.deliver_updates(
+            tenant,
+            {'current_date': 200},
+            [
+                make_homework(1, 'approved', '2024-01-02T10:00:00Z'),
+                make_homework(2, 'reviewing', '2024-01-01T10:00:00Z'),
+            ],
+            lambda message: sent.append(message) or True
+        )
+        assert len(sent) == 2
+        assert sent[0].startswith('Изменился статус проверки работы "hw2')
+        assert tenant.timestamp == 200
+
+    def test_cursor_kept_when_send_fails(self):
+        tenant = Tenant('token', [1], timestamp=100)
+        homework.deliver_updates(
+            tenant,
+            {'current_date': 200},
+            [make_homework(1, 'approved', '2024-01-02T10:00:00Z')],
+            lambda message: False
+        )
+        assert tenant.timestamp == 100, (
+            'Курсор не должен сдвигаться, пока пачка не доставлена.'
+        )
+
+    def test_status_history_bounded_chain(self):
+        homeworks = [
+            make_homework(1, 'approved', '2024-01-04T10:00:00Z'),
+            make_homework(1, 'reviewing', '2024-01-01T10:00:00Z'),
+            make_homework(1, 'rejected', '2024-01-02T10:00:00Z'),
+            make_homework(1, 'reviewing', '2024-01-03T10:00:00Z'),
+            make_homework(2, 'reviewing', '2024-01-01T12:00:00Z'),
+            make_homework(2, 'reviewing', '2024-01-01T13:00:00Z'),
+        ]
+        assert [
+            (update.id, statuses)
+            for update, statuses in status_history(homeworks)
+        ] == [
+            (2, ['reviewing']),
+            (1, ['reviewing', 'rejected', 'reviewing', 'approved']),
+        ]
+        assert status_history(homeworks, limit=2)[1][1] == [
+            'reviewing', 'approved'
+        ], 'Хранятся только последние limit изменений работы.'
+
+    def test_status_history_same_date_keeps_order(self):
+        homeworks = [
+            make_homework(1, 'reviewing', '2024-01-01T10:00:00Z'),
+            make_homework(1, 'rejected', '2024-01-01T10:00:00Z'),
+        ]
+        (update, statuses), = status_history(homeworks)
+        assert update.status is Status.REJECTED
+        assert statuses == ['reviewing', 'rejected'], (
+            'Изменения с одной датой идут в порядке ответа.'
+        )
+
+    def test_catch_up_sends_one_summary(self, monkeypatch):
+        body = json.dumps({
+            'homeworks': [
+                make_homework(1, status, f'2024-01-0{day}T10:00:00Z')
+                for day, status in enumerate(
+                    ('reviewing', 'rejected', 'reviewing', 'approved'), 1
+                )
+            ],
+            'current_date': int(time.time()),
+        }).encode()
+        requests_made = []
+
+        class StreamedResponse:
+            status_code = 200
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def iter_content(self, chunk_size):
+                return split(body, 16)
+
+        def get(**kwargs):
+            requests_made.append(kwargs['params'])
+            return StreamedResponse()
+
+        monkeypatch.setattr(requests, 'get', get)
+        monkeypatch.setattr(homework, 'CATCH_UP', True)
+        tenant = Tenant('token', [1], timestamp=100)
+        sent = []
+        homework.catch_up_tenant(None, tenant)
+        assert tenant.timestamp == 100, (
+            'Курсор не должен сдвигаться, пока сводки не доставлены.'
+        )
+        monkeypatch.setattr(
+            homework, 'notify_tenant',
+            lambda bot, tenant, message: sent.append(message) or True
+        )
+        homework.catch_up_tenant(None, tenant)
+        assert requests_made == [{'from_date': 100}] * 2, (
+            'Догон должен занимать один запрос с сохранённого курсора.'
+        )
+        assert sent == [
+            'Пока бот не работал, статус менялся: на проверке → '
+            'есть замечания → на проверке → принята. '
+            'Изменился статус проверки работы "hw1.zip". '
+            + homework.HOMEWORK_VERDICTS['approved']
+        ]
+        assert tenant.timestamp > 100
+        homework.catch_up_tenant(None, tenant)
+        assert len(requests_made) == 2, 'Свежему курсору догон не нужен.'
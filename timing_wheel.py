@@ -0,0 +1,161 @@
+"""Иерархическое колесо таймеров для расписания опросов."""
+from bisect import bisect_right
+
+TICK = 1.0
+WHEEL_SIZE = 64
+LEVELS = 4
+
+
+class TimingWheel:
+    """Таймеры с постановкой и отменой за O(1).
+
+    Уровень 0 делит ближайшие WHEEL_SIZE тиков на ячейки по одному
+    тику, каждый следующий уровень — в WHEEL_SIZE раз крупнее. Таймер
+    кладётся на уровень, который покрывает его срок, а когда время
+    доходит до границы крупной ячейки, её таймеры спускаются ниже.
+    Четырёх уровней по 64 ячейки с тиком в секунду хватает на 194 дня,
+    более далёкие таймеры ждут в отдельном словаре и раскладываются
+    заново на каждой границе верхнего уровня.
+
+    Срабатывание точное: таймер со сроком внутри текущего тика не
+    сработает раньше своего времени.
+    """
+
+    def __init__(self, tick=TICK, wheel_size=WHEEL_SIZE, levels=LEVELS):
+        """Создаёт пустое колесо с тиком tick секунд."""
+        self.tick = tick
+        self.size = wheel_size
+        self.levels = levels
+        self._spans = [wheel_size ** level for level in range(levels + 1)]
+        self._wheels = [
+            [{} for _ in range(wheel_size)] for _ in range(levels)
+        ]
+        self._counts = [0] * levels
+        self._overflow = {}
+        self._where = {}
+        self._current = None
+
+    def __len__(self):
+        """Возвращает число поставленных таймеров."""
+        return len(self._where)
+
+    def __contains__(self, key):
+        """Проверяет, стоит ли таймер key."""
+        return key in self._where
+
+    def start(self, now):
+        """Начинает отсчёт с момента now, если колесо ещё не запущено.
+
+        Без этого отсчёт начнётся со срока первого таймера, и более
+        ранние таймеры соберутся в одной ячейке.
+        """
+        if self._current is None:
+            self._current = int(now // self.tick)
+
+    def schedule(self, key, at):
+        """Ставит таймер key на момент at, заменяя прежний."""
+        self.cancel(key)
+        self.start(at)
+        self._place(key, at)
+
+    def cancel(self, key):
+        """Снимает таймер key, если он стоит."""
+        where = self._where.pop(key, None)
+        if where is None:
+            return
+        level, slot = where
+        if level == self.levels:
+            del self._overflow[key]
+            return
+        del self._wheels[level][slot][key]
+        self._counts[level] -= 1
+
+    def advance(self, now):
+        """Сдвигает колесо к моменту now и возвращает сработавшие ключи."""
+        expired = []
+        self.start(now)
+        target = int(now // self.tick)
+        while True:
+            self._expire(now, expired)
+            if self._current >= target:
+                return expired
+            self._current = min(target, self._next_event())
+            self._cascade()
+
+    def next_expiry(self):
+        """Возвращает ближайший срок таймера или None."""
+        best = min(self._overflow.values(), default=None)
+        for level in range(self.levels):
+            if not self._counts[level]:
+                continue
+            span = self._spans[level]
+            base = self._current // span
+            for block in range(base + (level > 0), base + self.size + 1):
+                bucket = self._wheels[level][block % self.size]
+                if not bucket:
+                    continue
+                # Ячейка целиком позже найденного срока — min не нужен.
+                if best is None or block * span * self.tick < best:
+                    earliest = min(bucket.values())
+                    best = earliest if best is None else min(best, earliest)
+                break
+        return best
+
+    def _next_event(self):
+        """Возвращает тик, на котором колесу снова есть что делать.
+
+        Пока нижние уровни пусты, тики до ближайшей границы ячейки
+        первого непустого уровня пропускаются разом.
+        """
+        for level in range(self.levels):
+            if self._counts[level]:
+                span = self._spans[level]
+                return (self._current // span + 1) * span
+        if self._overflow:
+            span = self._spans[self.levels - 1]
+            return (self._current // span + 1) * span
+        return float('inf')
+
+    def _place(self, key, at):
+        tick = max(int(at // self.tick), self._current)
+        delta = tick - self._current
+        if delta >= self._spans[self.levels]:
+            self._overflow[key] = at
+            self._where[key] = (self.levels, None)
+            return
+        level = bisect_right(self._spans, delta, 1, self.levels) - 1
+        slot = tick // self._spans[level] % self.size
+        self._wheels[level][slot][key] = at
+        self._counts[level] += 1
+        self._where[key] = (level, slot)
+
+    def _expire(self, now, expired):
+        slot = self._current % self.size
+        bucket = self._wheels[0][slot]
+        if not bucket:
+            return
+        for key, at in list(bucket.items()):
+            if at <= now:
+                del bucket[key]
+                del self._where[key]
+                self._counts[0] -= 1
+                expired.append(key)
+
+    def _cascade(self):
+        top = self._spans[self.levels - 1]
+        if self._overflow and not self._current % top:
+            overflow, self._overflow = self._overflow, {}
+            for key, at in overflow.items():
+                del self._where[key]
+                self._place(key, at)
+        for level in range(self.levels - 1, 0, -1):
+            span = self._spans[level]
+            if self._current % span or not self._counts[level]:
+                continue
+            slot = (self._current // span) % self.size
+            bucket = self._wheels[level][slot]
+            self._wheels[level][slot] = {}
+            self._counts[level] -= len(bucket)
+            for key, at in bucket.items():
+                del self._where[key]
+                self._place(key, at)
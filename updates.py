@@ -0,0 +1,113 @@
+"""Отбор изменений статусов из ответа API."""
+import logging
+from bisect import insort
+
+from records import Homework
+
+HISTORY_LIMIT = 10
+
+logger = logging.getLogger(__name__)
+
+
+def homework_key(homework):
+    """Возвращает идентификатор работы для дедупликации."""
+    return homework.get('id', homework.get('homework_name'))
+
+
+def latest_updates(homeworks):
+    """Сворачивает изменения до последнего статуса каждой работы.
+
+    Если за окно опроса статус одной работы менялся несколько раз,
+    остаётся только самое свежее изменение. Результат упорядочен по
+    date_updated, чтобы уведомления приходили в хронологическом порядке.
+    """
+    latest = {}
+    for homework in homeworks:
+        key = homework_key(homework)
+        known = latest.get(key)
+        if known is None or (
+            homework.get('date_updated', '') >= known.get('date_updated', '')
+        ):
+            latest[key] = homework
+    return sorted(
+        latest.values(), key=lambda homework: homework.get('date_updated', '')
+    )
+
+
+def latest_statuses(homeworks):
+    """Возвращает последний статус каждой изменившейся работы.
+
+    Результат — словарь {идентификатор работы: статус} для расписания
+    опросов.
+    """
+    return {
+        homework_key(homework): homework.get('status')
+        for homework in latest_updates(homeworks)
+    }
+
+
+def delivery_plan(tenant, response, homeworks, parse):
+    """Ведёт доставку новых статусов пачки, не выполняя отправку сам.
+
+    Генератор выдаёт текст каждого уведомления, о котором получателю
+    ещё не сообщали, и ждёт через send() результат отправки: так один
+    и тот же порядок, дедупликацию и сдвиг курсора используют и
+    синхронный цикл, и asyncio-движок. Курсор сдвигается, только если
+    доставлены все уведомления пачки, иначе изменения будут запрошены
+    повторно. Возвращает, доставлена ли пачка целиком.
+    """
+    delivered = True
+    for homework in latest_updates(homeworks):
+        homework_id, status = homework_key(homework), homework.get('status')
+        updated = homework.get('date_updated', '')
+        if tenant.is_notified(homework_id, status, updated):
+            logger.debug(
+                f'Статус {status} работы {homework_id} уже отправлен.'
+            )
+            continue
+        message = parse(homework)
+        if (yield message):
+            tenant.mark_sent(homework_id, status, message, updated)
+        else:
+            delivered = False
+    if delivered:
+        tenant.advance(response.get('current_date', tenant.timestamp))
+    return delivered
+
+
+def run_plan(plan, send):
+    """Проводит план доставки, отправляя сообщения функцией send."""
+    try:
+        message = next(plan)
+        while True:
+            message = plan.send(send(message))
+    except StopIteration as stop:
+        return stop.value
+
+
+def status_history(homeworks, limit=HISTORY_LIMIT):
+    """Сворачивает изменения в последний статус и цепочку статусов работы.
+
+    Каждое изменение проверяется и хранится записью Homework. Возвращает
+    пары (запись о последнем изменении, статусы по порядку) в порядке
+    date_updated. Повторы статуса подряд схлопываются. У каждой работы
+    хранится не больше limit последних изменений, поэтому память
+    зависит от числа работ, а не от длины истории в ответе.
+    """
+    changes = {}
+    for number, homework in enumerate(homeworks):
+        record = Homework.from_dict(homework)
+        known = changes.setdefault(record.key, [])
+        # Номер в ответе разводит равные даты в порядке поступления,
+        # и до сравнения самих записей дело не доходит.
+        insort(known, (record.date_updated, number, record))
+        if len(known) > limit:
+            del known[0]
+    histories = []
+    for known in changes.values():
+        statuses = []
+        for _, _, record in known:
+            if not statuses or statuses[-1] != record.status:
+                statuses.append(record.status.value)
+        histories.append((known[-1][2], statuses))
+    return sorted(histories, key=lambda item: item[0].date_updated)